@@ -1,16 +1,25 @@
 # -*- coding: utf-8 -*-
 import os
 
-from flask import Flask, render_template, request, jsonify, session, redirect, url_for
+from flask import Flask, Response, render_template, request, jsonify, session, redirect, url_for
 
 # tmdb_helpers에서 얼굴 인식에 필요한 함수를 가져옵니다.
 from tmdb_helpers import * # search_actor에서 검색 로직과 상세 페이지 로직을 가져옵니다.
-from search_actor import process_actor_search, get_actor_details
+from search_actor import process_actor_search, get_actor_details, start_person_index_refresh
 from recommend_movie import *
+from recommend_movie import start_catalog_refresh
 from game_helpers import *
-
-# ★★★ 수정된 부분: 함수 이름을 'get_film_festivals_with_selenium'으로 변경 ★★★
-from festival_crawler import get_film_festivals_with_selenium 
+from game_movie_pool import start_game_pool_refresh
+from game_state import game_states
+
+# 영화제 목록은 백그라운드 크롤링으로 채워지는 캐시에서 가져옵니다.
+from festival_cache import festival_cache, start_festival_refresh
+# 뉴스 검색에 쓰는 headless Chrome 풀
+from webdriver_pool import driver_pool
+# 줄인 크기로 캐시해 두는 TMDB 이미지 프록시
+from image_proxy import serve_tmdb_image
+# 외부 호출 지표 (/metrics, Server-Timing)
+from metrics import start_request, server_timing_header, upstream_metrics
 
 if not os.path.exists("static"):
     os.mkdir("static")
@@ -20,6 +29,21 @@ BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 app = Flask(__name__, template_folder=os.path.join(BASE_DIR, "templates"))
 app.secret_key = 'your-very-secret-key'
 
+# 응답마다 외부 서비스별 호출 시간을 Server-Timing 헤더로 붙입니다.
+@app.before_request
+def begin_server_timing():
+    start_request()
+
+@app.after_request
+def add_server_timing(response):
+    # 스트리밍 응답은 본문을 만들기 전에 헤더가 나가므로 외부 호출 시간이 빠진 값이 됩니다. 붙이지 않습니다.
+    if response.is_streamed:
+        return response
+    header = server_timing_header()
+    if header:
+        response.headers["Server-Timing"] = header
+    return response
+
 @app.route("/")
 def index():
     return render_template("pj_prac.html")
@@ -62,16 +86,23 @@ def get_person_game_movies():
 
 @app.route("/results")
 def show_results():
-    basic_answers = session.pop('correct_answers', [])
+    basic_answers = game_states.pop(session.pop('game_id', None)) or []
     detailed_answers = get_detailed_movie_list(basic_answers)
     return render_template('game_result.html', movies=detailed_answers)
 
+# ---------------- TMDB IMAGE PROXY ----------------
+# 템플릿이 요청한 크기로 줄인 WebP/JPEG 포스터 (디스크 캐시, 긴 브라우저 캐시 헤더)
+@app.route("/img/<size>/<path:filename>")
+def tmdb_image(size, filename):
+    return serve_tmdb_image(size, filename)
+
 # ---------------- MOVIE Festival Information SERVICE ----------------
-# 모든 영화제 데이터를 가져와 처리 함수에 넘겨 분류된 결과를 받아 템플릿에 전달
+# 메모리에 캐시된 영화제 목록을 바로 렌더링 (오래됐으면 백그라운드에서 다시 크롤링)
 @app.route("/festivals")
 def festivals_page():
-    all_festivals = get_film_festivals_with_selenium()
-    return render_template("festivals.html", all_festivals=all_festivals)
+    all_festivals = festival_cache.get()
+    return render_template("festivals.html", all_festivals=all_festivals,
+                           refreshing=festival_cache.is_stale())
 
 
 # ---------------- MOVIE RECOMMENDATION SERVICE ----------------
@@ -89,5 +120,27 @@ def get_result():
         return redirect(url_for("recommend_mv_survey"))
 
 
+# ---------------- METRICS ----------------
+# Prometheus 텍스트 형식의 외부 호출 지표
+@app.route("/metrics")
+def metrics_page():
+    return Response(upstream_metrics.render(), mimetype="text/plain; version=0.0.4")
+
+
+# ---------------- BACKGROUND JOBS ----------------
+# 주기적으로 갱신되는 로컬 캐시들 (BACKGROUND_JOBS=0 이면 끔)
+def start_background_jobs():
+    start_catalog_refresh()
+    start_person_index_refresh()
+    start_festival_refresh()
+    start_game_pool_refresh()
+    driver_pool.warm()
+
+# debug 모드의 reloader 부모 프로세스에서는 시작하지 않습니다.
+if os.getenv("BACKGROUND_JOBS", "1") != "0" and (
+        __name__ != '__main__' or os.environ.get("WERKZEUG_RUN_MAIN") == "true"):
+    start_background_jobs()
+
+
 if __name__ == '__main__':
     app.run(host="0.0.0.0", port=5000, debug=True)
\ No newline at end of file
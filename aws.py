@@ -9,15 +9,98 @@ from bs4 import BeautifulSoup
 from selenium.webdriver.common.keys import Keys
 # -------------------------
 
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.common.exceptions import WebDriverException, InvalidSessionIdException, TimeoutException, NoSuchElementException
-import time
+import copy
+import json
+import os
+import threading
+
+from cache_store import DiskCache, LRUCache, TieredCache
+from webdriver_pool import driver_pool
+from news_lookup import NewsLookup
+from metrics import observe, track
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+WIKIDATA_API_URL = os.getenv("WIKIDATA_API_URL", "https://www.wikidata.org/w/api.php")
+WIKIDATA_TIMEOUT = 5
+WIKIDATA_BATCH_SIZE = 50  # wbgetentities가 한 번에 받는 최대 id 수
+# Wikidata id -> 이미지 URL 캐시 (이미지는 거의 바뀌지 않으므로 길게 보관)
+WIKIDATA_CACHE_PATH = os.getenv("WIKIDATA_CACHE_PATH", os.path.join(BASE_DIR, ".cache", "wikidata_images.sqlite"))
+WIKIDATA_IMAGE_TTL = 30 * 24 * 60 * 60
+WIKIDATA_MISSING_TTL = 24 * 60 * 60  # 이미지가 없는 인물은 하루 뒤 다시 확인
+
+_wikidata_cache = None
+_wikidata_cache_lock = threading.Lock()
+
+
+def get_wikidata_cache():
+    global _wikidata_cache
+    if _wikidata_cache is None:
+        with _wikidata_cache_lock:
+            if _wikidata_cache is None:
+                _wikidata_cache = TieredCache(LRUCache(maxsize=1024, default_ttl=WIKIDATA_IMAGE_TTL),
+                                              DiskCache(WIKIDATA_CACHE_PATH))
+    return _wikidata_cache
+
+
+def _commons_image_url(image_filename):
+    image_filename = image_filename.replace(' ', '_')
+    md5_hash = hashlib.md5(image_filename.encode('utf-8')).hexdigest()
+    # 고화질 이미지를 위해 썸네일 크기(200px) 부분을 제거할 수 있습니다.
+    return f"https://upload.wikimedia.org/wikipedia/commons/{md5_hash[0]}/{md5_hash[0:2]}/{image_filename}"
+
+
+def get_wikidata_images(wikidata_ids):
+    """
+    여러 Wikidata ID의 인물 이미지 URL을 {id: url 또는 None}으로 가져오는 함수.
+    캐시에 없는 id만 모아 wbgetentities 한 번(50개씩)으로 요청합니다.
+    """
+    cache = get_wikidata_cache()
+    images = {}
+    missing = []
+    for wikidata_id in dict.fromkeys(i for i in wikidata_ids if i):
+        cached = cache.get(wikidata_id)
+        if cached is None:
+            missing.append(wikidata_id)
+        else:
+            observe("wikidata", "wbgetentities", 0.0, "cached", cache="hit")
+            images[wikidata_id] = cached or None  # ""는 이미지가 없다고 확인된 id
+
+    for start in range(0, len(missing), WIKIDATA_BATCH_SIZE):
+        batch = missing[start:start + WIKIDATA_BATCH_SIZE]
+        params = {
+            "action": "wbgetentities",
+            "ids": "|".join(batch),
+            "props": "claims",
+            "format": "json",
+        }
+        try:
+            with track("wikidata", "wbgetentities", cache="miss") as call:
+                response = requests.get(WIKIDATA_API_URL, params=params, timeout=WIKIDATA_TIMEOUT)
+                call.status = response.status_code
+                response.raise_for_status()
+            entities = response.json().get('entities', {})
+        except (requests.exceptions.RequestException, ValueError) as e:
+            # 실패한 id는 캐시하지 않고 이번 응답에서만 None으로 둡니다.
+            print(f"Error fetching image from Wikidata: {e}")
+            images.update(dict.fromkeys(batch))
+            continue
+
+        for wikidata_id in batch:
+            claims = entities.get(wikidata_id, {}).get('claims', {})
+            try:
+                image_url = _commons_image_url(claims['P18'][0]['mainsnak']['datavalue']['value'])
+            except (KeyError, IndexError, TypeError):
+                print(f"No image or claims found for Wikidata ID: {wikidata_id}")
+                image_url = None
+            cache.set(wikidata_id, image_url or "",
+                      WIKIDATA_IMAGE_TTL if image_url else WIKIDATA_MISSING_TTL)
+            images[wikidata_id] = image_url
+    return images
 
 
 def get_wikidata_image(wikidata_id):
@@ -26,86 +109,35 @@ def get_wikidata_image(wikidata_id):
     """
     if not wikidata_id:
         return None
-    
-    url = "https://www.wikidata.org/w/api.php"
-    params = {
-        "action": "wbgetentities",
-        "ids": wikidata_id,
-        "props": "claims",
-        "format": "json",
-    }
-    
-    try:
-        response = requests.get(url, params=params)
-        response.raise_for_status()
-        data = response.json()
-        
-        claims = data['entities'][wikidata_id]['claims']
-        if 'P18' in claims:
-            image_filename = claims['P18'][0]['mainsnak']['datavalue']['value']
-            image_filename = image_filename.replace(' ', '_')
-            
-            md5_hash = hashlib.md5(image_filename.encode('utf-8')).hexdigest()
-            
-            # 고화질 이미지를 위해 썸네일 크기(200px) 부분을 제거할 수 있습니다.
-            return f"https://upload.wikimedia.org/wikipedia/commons/{md5_hash[0]}/{md5_hash[0:2]}/{image_filename}"
-            
-    except requests.exceptions.RequestException as e:
-        print(f"Error fetching image from Wikidata: {e}")
-        return None
-    except KeyError:
-        print(f"No image or claims found for Wikidata ID: {wikidata_id}")
-        return None
+    return get_wikidata_images([wikidata_id]).get(wikidata_id)
 
-def build_chrome_options():
-    """Chrome 옵션을 설정하는 함수"""
-    options = Options()
-    options.add_argument("--headless=new")  # 새로운 headless 모드 사용
-    options.add_argument("--no-sandbox")
-    options.add_argument("--disable-dev-shm-usage")
-    options.add_argument("--remote-debugging-port=0")
-    options.add_argument("--user-data-dir=/tmp/selenium_profile")
-    options.add_argument("--window-size=1200,800")
-    options.add_argument("--disable-gpu")  # GPU 가속 비활성화
-    return options
-
-def build_webdriver():
-    """WebDriver를 설정하는 함수"""
-    options = build_chrome_options()
-    try:
-        driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
-        return driver
-    except WebDriverException as e:
-        print(f"WebDriver 초기화 실패: {e}")
-        return None
-    
 # ----- 기존 naver_news_search 함수를 아래 nate_news_search 함수로 대체합니다 -----
 
 def nate_news_search(query):
     """
     Selenium과 BeautifulSoup을 이용해 네이트 뉴스 검색 결과를 크롤링하는 함수
     """
-    driver = None
+    news_articles = []
     try:
-        driver = webdriver.Chrome(options=build_chrome_options())
-    
-        news_articles = []
-        driver.get("https://news.nate.com/")
-        
-        # 검색창에 키워드 입력 및 검색 실행
-        search_box = WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.ID, "input_search"))
-        )
-        search_box.send_keys(query)
-        search_box.send_keys(Keys.ENTER)
-
-        # 검색 결과 페이지 로딩 대기
-        WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.CLASS_NAME, "search-result"))
-        )
-        
-        # 현재 페이지의 HTML 소스 가져오기
-        html = driver.page_source
+        # 브라우저는 매번 새로 띄우지 않고 공용 풀에서 빌려 씁니다. (드라이버를 기다린 시간도 호출 시간에 포함)
+        with track("nate", "/search", cache="miss"), driver_pool.lease() as driver:
+            driver.get("https://news.nate.com/")
+
+            # 검색창에 키워드 입력 및 검색 실행
+            search_box = WebDriverWait(driver, 10).until(
+                EC.presence_of_element_located((By.ID, "input_search"))
+            )
+            search_box.send_keys(query)
+            search_box.send_keys(Keys.ENTER)
+
+            # 검색 결과 페이지 로딩 대기
+            WebDriverWait(driver, 10).until(
+                EC.presence_of_element_located((By.CLASS_NAME, "search-result"))
+            )
+
+            # 현재 페이지의 HTML 소스 가져오기 (파싱은 드라이버를 돌려준 뒤에 합니다)
+            html = driver.page_source
+
         soup = BeautifulSoup(html, 'html.parser')
 
         # 기사 목록 선택
@@ -137,20 +169,76 @@ def nate_news_search(query):
 
     except Exception as e:
         print(f"네이트 뉴스 크롤링 중 오류 발생: {e}")
-    finally:
-        if driver:
-            driver.quit()
-        
+
     return news_articles
 
-def recognize_celebrities(photo):
-    client = boto3.client('rekognition')
-    
-    try:
-        with open(photo, 'rb') as image:
-            response = client.recognize_celebrities(Image={'Bytes': image.read()})
-    except FileNotFoundError:
-        return {"error": "파일을 찾을 수 없습니다."}
+def wikidata_id_from_urls(urls):
+    for url in urls:
+        if "wikidata.org/wiki/" in url:
+            return url.split('/')[-1]
+    return None
+
+# 정확한 검색을 위해 이름에 따옴표를 추가합니다.
+news_lookup = NewsLookup(lambda name: nate_news_search(f'"{name}"'))
+
+# "aws"(기본) 또는 "stub". stub은 AWS 호출 없이 REKOGNITION_STUB_PATH의 JSON 응답을 돌려줍니다.
+REKOGNITION_BACKEND = os.getenv("REKOGNITION_BACKEND", "aws")
+REKOGNITION_STUB_PATH = os.getenv("REKOGNITION_STUB_PATH")
+
+_rekognition_client = None
+_rekognition_lock = threading.Lock()
+
+
+class StubRekognitionClient:
+    """
+    오프라인 테스트용 Rekognition 대체 클라이언트.
+    fixture JSON은 RecognizeCelebrities 응답 하나이거나,
+    {"<이미지 sha256>": 응답, ..., "default": 응답} 형태의 매핑입니다.
+    """
+
+    def __init__(self, path=None):
+        self.responses = {"default": {"CelebrityFaces": [], "UnrecognizedFaces": []}}
+        if path:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            if "CelebrityFaces" in data:
+                data = {"default": data}
+            self.responses.update(data)
+
+    def recognize_celebrities(self, Image):
+        digest = hashlib.sha256(Image['Bytes']).hexdigest()
+        return copy.deepcopy(self.responses.get(digest, self.responses["default"]))
+
+
+def get_rekognition_client():
+    """프로세스 전체에서 재사용하는 Rekognition 클라이언트 (boto3 클라이언트는 스레드 간 공유 가능)"""
+    global _rekognition_client
+    if _rekognition_client is None:
+        with _rekognition_lock:
+            if _rekognition_client is None:
+                if REKOGNITION_BACKEND == "stub":
+                    _rekognition_client = StubRekognitionClient(REKOGNITION_STUB_PATH)
+                else:
+                    _rekognition_client = boto3.client('rekognition')
+    return _rekognition_client
+
+
+def detect_celebrities(photo):
+    """
+    Rekognition 호출만 하고 인물의 이름/성별/관련 URL을 돌려주는 함수 (이미지/뉴스 없음).
+    photo: 이미지 바이트 (또는 이미지 파일 경로)
+    """
+    if isinstance(photo, (bytes, bytearray)):
+        image_bytes = bytes(photo)
+    else:
+        try:
+            with open(photo, 'rb') as image:
+                image_bytes = image.read()
+        except FileNotFoundError:
+            return {"error": "파일을 찾을 수 없습니다."}
+
+    with track("rekognition", "RecognizeCelebrities", cache="miss"):
+        response = get_rekognition_client().recognize_celebrities(Image={'Bytes': image_bytes})
 
     if not response['CelebrityFaces']:
         return {"result": "감지된 유명인이 없습니다."}
@@ -162,27 +250,29 @@ def recognize_celebrities(photo):
             "gender": celebrity.get('KnownGender', {}).get('Type', '알 수 없음'),
             "urls": celebrity.get('Urls', [])
         }
-        
-        name = celeb_info['name']
-        
-        wikidata_id = None
-        for url in celeb_info['urls']:
-            if "wikidata.org/wiki/" in url:
-                wikidata_id = url.split('/')[-1]
-                break
-        
-        if wikidata_id:
-            image_url = get_wikidata_image(wikidata_id)
-            celeb_info['image_url'] = image_url
-        else:
-            celeb_info['image_url'] = None
-        
-        # 정확한 검색을 위해 따옴표를 추가합니다.
-        exact_query = f'"{name}"'
-        
-        # --- 중요: nate_news_search 함수를 호출하도록 변경 ---
-        celeb_info['news'] = nate_news_search(exact_query)
-        
         celebrity_list.append(celeb_info)
-            
-    return {"result": "success", "celebrities": celebrity_list}
\ No newline at end of file
+
+    return {"result": "success", "celebrities": celebrity_list}
+
+
+def attach_images_and_news(celebrity_list):
+    """detect_celebrities 결과의 인물들에 Wikidata 이미지(image_url)와 뉴스(news)를 채웁니다."""
+    # 사진 속 모든 인물의 Wikidata 이미지는 한 번의 요청으로 가져옵니다. (캐시된 id는 요청하지 않음)
+    wikidata_ids = [wikidata_id_from_urls(celeb['urls']) for celeb in celebrity_list]
+    images = get_wikidata_images(wikidata_ids)
+    for celeb_info, wikidata_id in zip(celebrity_list, wikidata_ids):
+        celeb_info['image_url'] = images.get(wikidata_id) if wikidata_id else None
+
+    # 뉴스는 모든 인물을 동시에 검색하고, 시간 안에 끝나지 않으면 캐시된 결과(또는 빈 목록)를 사용합니다.
+    news_results = news_lookup.lookup_many([celeb['name'] for celeb in celebrity_list])
+    for celeb_info, news in zip(celebrity_list, news_results):
+        celeb_info['news'] = news
+    return celebrity_list
+
+
+def recognize_celebrities(photo):
+    """photo: 이미지 바이트 (또는 이미지 파일 경로)"""
+    celeb_info = detect_celebrities(photo)
+    if celeb_info.get("result") == "success":
+        attach_images_and_news(celeb_info["celebrities"])
+    return celeb_info
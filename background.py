@@ -0,0 +1,23 @@
+# background.py
+import threading
+
+
+def start_periodic(name, func, interval, initial_delay=0.0):
+    """
+    func를 interval초마다 실행하는 데몬 스레드를 시작합니다.
+    예외는 출력만 하고 다음 주기에 다시 시도합니다. 반환된 Event를 set()하면 멈춥니다.
+    """
+    stop = threading.Event()
+
+    def loop():
+        if initial_delay and stop.wait(initial_delay):
+            return
+        while not stop.is_set():
+            try:
+                func()
+            except Exception as e:
+                print(f"[{name}] 백그라운드 작업 실패: {e}")
+            stop.wait(interval)
+
+    threading.Thread(target=loop, name=name, daemon=True).start()
+    return stop
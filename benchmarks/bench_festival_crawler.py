@@ -0,0 +1,326 @@
+# benchmarks/bench_festival_crawler.py
+"""
+영화제 크롤러 엔진 비교 벤치마크 (http vs selenium).
+
+로컬 스텁 서버가 KOBIS 목록 페이지를 대신 응답합니다. 실제 사이트처럼 1페이지 GET 응답에서 세션 쿠키를
+내려주고, 다음 페이지 POST(curPage=N)는 그 쿠키와 1페이지 검색 폼의 CSRFToken이 있어야 응답합니다.
+기본으로 fixtures/kobis의 page1.html, page2.html ...을 쓰고 (없는 페이지는 빈 목록),
+--synthetic을 주면 같은 구조의 합성 페이지를 원하는 페이지 수만큼 만듭니다.
+
+측정과 함께 다음을 검증하고, 하나라도 어긋나면 종료 코드 1로 끝납니다.
+  - 페이지마다 parse_festival_rows 결과가 expected.json(합성 페이지는 생성한 행)과 같음
+  - http 엔진이 1페이지는 GET, 나머지 페이지는 curPage POST로 한 번씩 요청하고, 모든 페이지의 행을 순서대로 돌려줌
+  - selenium 엔진(실행된 경우)이 http 엔진과 같은 행을 돌려줌
+
+    python benchmarks/bench_festival_crawler.py [--pages 2] [--repeat 3] [--fixtures DIR | --synthetic]
+                                                [--engines http,selenium]
+
+실제 KOBIS 페이지를 fixture로 저장하려면 (1페이지 GET + curPage POST, 결과 확인 후 커밋):
+
+    python benchmarks/bench_festival_crawler.py --capture benchmarks/fixtures/kobis [--pages 2]
+
+메모리는 두 엔진 모두 같은 방식으로 잽니다. 실행하는 동안 이 프로세스와 모든 자식 프로세스
+(selenium이면 chromedriver/Chrome)의 RSS 합을 psutil로 주기적으로 읽어, 최댓값(peak)과
+실행 직전 값에서 늘어난 양(+peak)을 MB로 보여줍니다.
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import psutil
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "kobis")
+SESSION_COOKIE = "JSESSIONID=bench"
+# 마지막 페이지 다음을 요청했을 때 KOBIS가 돌려주는 것과 같은 빈 목록
+EMPTY_PAGE = (
+    "<html><body><form id='searchForm' method='post'><input type='hidden' name='curPage' value='1'></form>"
+    "<table class='tbl_comm'><tbody><tr><td colspan='9'>검색된 결과가 없습니다.</td></tr></tbody></table>"
+    "</body></html>"
+)
+
+
+def synthetic_rows(page_num, rows=10):
+    """합성 페이지에 들어가는 행 (parse_festival_rows의 기대값)"""
+    return [
+        {
+            "title": f"영화제 {page_num}-{i}",
+            "location": "부산",
+            "period": f"2025.10.0{i % 9 + 1} ~ 2025.10.1{i % 9}",
+            "website": f"http://festival{page_num}{i}.kr",
+        }
+        for i in range(rows)
+    ]
+
+
+def synthetic_page(page_num, rows=10):
+    body = "".join(
+        f"<tr><td>{row['title']}</td><td>국제</td><td>장편</td><td>{row['location']}</td>"
+        f"<td>{row['period']}</td><td>-</td><td>-</td>"
+        f"<td><a href='{row['website']}'>바로가기</a></td><td>-</td></tr>"
+        for row in synthetic_rows(page_num, rows)
+    )
+    links = "".join(f"<a href='?curPage={n}'>{n}</a> " for n in range(1, 11))
+    return (
+        "<html><head><title>KOBIS</title></head><body>"
+        "<form id='searchForm' method='post'><input type='hidden' name='CSRFToken' value='bench'>"
+        "<input type='hidden' name='curPage' value='1'></form>"
+        "<table class='tbl_comm'><thead><tr><th>영화제명</th></tr></thead>"
+        f"<tbody>{body}</tbody></table><div class='pagination'>{links}</div></body></html>"
+    )
+
+
+def csrf_token(html):
+    match = re.search(r"""name=["']CSRFToken["'][^>]*value=["']([^"']*)["']""", html)
+    return match.group(1) if match else None
+
+
+def make_handler(pages, log):
+    """
+    pages(page_num) -> HTML. 받은 요청은 log에 (method, curPage, 응답 상태)로 남깁니다.
+    POST는 1페이지에서 내려준 세션 쿠키와 CSRFToken이 없으면 403으로 응답합니다.
+    """
+    token = csrf_token(pages(1))
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _send(self, method, page_num, status=200):
+            log.append((method, page_num, status))
+            html = (pages(page_num) if status == 200 else "forbidden").encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(html)))
+            if method == "GET":
+                self.send_header("Set-Cookie", f"{SESSION_COOKIE}; Path=/")
+            self.end_headers()
+            self.wfile.write(html)
+
+        def do_GET(self):
+            query = parse_qs(urlparse(self.path).query)
+            self._send("GET", int(query.get("curPage", ["1"])[0]))
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            form = parse_qs(self.rfile.read(length).decode("utf-8"))
+            page_num = int(form.get("curPage", ["1"])[0])
+            has_session = SESSION_COOKIE in self.headers.get("Cookie", "")
+            has_token = token is None or form.get("CSRFToken", [None])[0] == token
+            self._send("POST", page_num, 200 if has_session and has_token else 403)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+def load_pages(fixtures_dir):
+    """fixtures_dir의 page{N}.html과 expected.json을 읽습니다. 파일이 없는 페이지는 빈 목록입니다."""
+    cache = {}
+
+    def pages(page_num):
+        if page_num not in cache:
+            path = os.path.join(fixtures_dir, f"page{page_num}.html")
+            try:
+                with open(path, encoding="utf-8") as f:
+                    cache[page_num] = f.read()
+            except FileNotFoundError:
+                cache[page_num] = EMPTY_PAGE
+        return cache[page_num]
+
+    with open(os.path.join(fixtures_dir, "expected.json"), encoding="utf-8") as f:
+        expected = {int(page_num): rows for page_num, rows in json.load(f).items()}
+    return pages, expected
+
+
+def capture(fixtures_dir, max_pages):
+    """실제 KOBIS 목록을 크롤러와 같은 방식(1페이지 GET, 나머지 curPage POST)으로 받아 fixture로 저장합니다."""
+    import requests
+    import festival_crawler
+
+    session = requests.Session()
+    session.headers.update({"User-Agent": "Mozilla/5.0 (compatible; MyCinema/1.0)"})
+    first = session.get(festival_crawler.KOBIS_FESTIVAL_URL, timeout=30)
+    first.raise_for_status()
+    form = festival_crawler._search_form_fields(first.text)
+    htmls = [first.text]
+    for page_num in range(2, max_pages + 1):
+        r = session.post(festival_crawler.KOBIS_FESTIVAL_URL, data=dict(form, curPage=page_num), timeout=30)
+        r.raise_for_status()
+        htmls.append(r.text)
+
+    os.makedirs(fixtures_dir, exist_ok=True)
+    expected = {}
+    for page_num, html in enumerate(htmls, start=1):
+        with open(os.path.join(fixtures_dir, f"page{page_num}.html"), "w", encoding="utf-8") as f:
+            f.write(html)
+        expected[str(page_num)] = festival_crawler.parse_festival_rows(html)
+        print(f"page{page_num}.html: {len(expected[str(page_num)])}행")
+    # 기대값은 현재 파서 결과로 채우므로, 페이지를 직접 열어 행이 맞는지 확인한 뒤 커밋하세요.
+    with open(os.path.join(fixtures_dir, "expected.json"), "w", encoding="utf-8") as f:
+        json.dump(expected, f, ensure_ascii=False, indent=2)
+        f.write("\n")
+
+
+def tree_rss(process):
+    """process와 그 자식 프로세스 전체의 RSS 합 (바이트). 도중에 끝난 프로세스는 건너뜁니다."""
+    total = 0
+    for proc in [process, *process.children(recursive=True)]:
+        try:
+            total += proc.memory_info().rss
+        except psutil.Error:
+            pass
+    return total
+
+
+class RssSampler:
+    """with 블록 동안 프로세스 트리의 RSS 합을 interval초마다 읽어 최댓값을 기록합니다."""
+
+    def __init__(self, interval=0.01):
+        self.interval = interval
+        self.process = psutil.Process()
+        self.baseline = self.peak = 0
+        self._stop = threading.Event()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, tree_rss(self.process))
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self.baseline = self.peak = tree_rss(self.process)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, tree_rss(self.process))
+
+
+def run_engine(crawl, pages, repeat):
+    """crawl(pages)를 repeat번 실행해 (최소 시간, RssSampler, 마지막 결과)를 돌려줍니다."""
+    times, rows = [], []
+    with RssSampler() as rss:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            rows = crawl(pages)
+            times.append(time.perf_counter() - start)
+    return min(times), rss, rows
+
+
+def bench_http(crawler, pages, repeat):
+    return run_engine(crawler.get_film_festivals_with_requests, pages, repeat)
+
+
+def bench_selenium(crawler, pages, repeat):
+    return run_engine(crawler.get_film_festivals_with_selenium, pages, repeat)
+
+
+def check_parse(crawler, pages, expected, max_pages):
+    failures = []
+    for page_num in range(1, max_pages + 1):
+        rows = crawler.parse_festival_rows(pages(page_num))
+        if rows != expected.get(page_num, []):
+            failures.append(f"parse_festival_rows: page {page_num} 결과가 기대값과 다름 "
+                            f"({len(rows)}행, 기대 {len(expected.get(page_num, []))}행)")
+    return failures
+
+
+def check_pagination(log, max_pages):
+    """http 엔진 한 번 실행 동안의 요청: 1페이지 GET 한 번, 2..max_pages 페이지 POST 한 번씩, 모두 200"""
+    gets = [(page_num, status) for method, page_num, status in log if method == "GET"]
+    posts = sorted((page_num, status) for method, page_num, status in log if method == "POST")
+    failures = []
+    if gets != [(1, 200)]:
+        failures.append(f"http 엔진: 1페이지 GET 한 번이어야 하는데 {gets}")
+    if posts != [(page_num, 200) for page_num in range(2, max_pages + 1)]:
+        failures.append(f"http 엔진: curPage POST 요청이 예상과 다름 {posts}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=2)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--fixtures", default=FIXTURES_DIR,
+                        help="page1.html, page2.html ..., expected.json이 들어 있는 디렉터리")
+    parser.add_argument("--synthetic", action="store_true", help="fixture 대신 합성 페이지 사용")
+    parser.add_argument("--engines", default="http,selenium")
+    parser.add_argument("--capture", metavar="DIR", help="실제 KOBIS 페이지를 DIR에 저장하고 끝냄")
+    args = parser.parse_args()
+
+    if args.capture:
+        capture(args.capture, args.pages)
+        return
+
+    if args.synthetic:
+        pages = synthetic_page
+        expected = {page_num: synthetic_rows(page_num) for page_num in range(1, args.pages + 1)}
+    else:
+        pages, expected = load_pages(args.fixtures)
+    want = [row for page_num in range(1, args.pages + 1) for row in expected.get(page_num, [])]
+
+    log = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(pages, log))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    os.environ["KOBIS_FESTIVAL_URL"] = f"http://127.0.0.1:{server.server_port}/searchUserFestInfoList.do"
+
+    import festival_crawler  # KOBIS_FESTIVAL_URL 설정 후 import
+
+    failures = check_parse(festival_crawler, pages, expected, args.pages)
+
+    benches = {"http": bench_http, "selenium": bench_selenium}
+    results = {}
+    print(f"{'engine':>9} {'pages':>5} {'rows':>5} {'total (ms)':>11} {'ms/page':>8} "
+          f"{'peak RSS (MB)':>14} {'+peak (MB)':>11}")
+    for engine in args.engines.split(","):
+        del log[:]
+        try:
+            total, rss, rows = benches[engine](festival_crawler, args.pages, 1)
+            if engine == "http":
+                failures += check_pagination(log, args.pages)
+            if args.repeat > 1:
+                total, rss, rows = benches[engine](festival_crawler, args.pages, args.repeat)
+        except Exception as e:
+            print(f"{engine:>9}  실행 실패: {e}")
+            continue
+        if not rows:
+            print(f"{engine:>9}  결과 없음 (드라이버 설치 여부나 페이지 구조를 확인하세요)")
+            continue
+        results[engine] = rows
+        print(f"{engine:>9} {args.pages:>5} {len(rows):>5} {total * 1000:>11.1f} "
+              f"{total * 1000 / args.pages:>8.1f} {rss.peak / 2**20:>14.1f} "
+              f"{(rss.peak - rss.baseline) / 2**20:>11.1f}")
+
+    server.shutdown()
+
+    if "http" in results and results["http"] != want:
+        failures.append(f"http 엔진: 모든 페이지의 행과 다름 ({len(results['http'])}행, 기대 {len(want)}행)")
+    elif "http" in args.engines.split(",") and "http" not in results:
+        failures.append("http 엔진: 결과 없음")
+    if "selenium" in results and "http" in results and results["selenium"] != results["http"]:
+        failures.append(f"selenium 엔진: http 엔진과 결과가 다름 "
+                        f"({len(results['selenium'])}행, http {len(results['http'])}행)")
+    if "selenium" in args.engines.split(",") and "selenium" not in results:
+        print("selenium 엔진을 실행하지 못해 http 엔진과의 결과 비교를 건너뛰었습니다.")
+
+    if failures:
+        print("\n검증 실패:")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    print(f"\n검증 통과: {args.pages}페이지 {len(want)}행")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+# benchmarks/bench_get_data.py
+"""
+recommend_movie.get_data 마이크로 벤치마크.
+
+기존 행 단위(apply + iterrows) 구현과 컬럼 연산 구현의 출력이 완전히 같은지 확인하고,
+21행(추천 샘플)부터 카탈로그 크기(10k+ 행)까지 처리 시간을 비교합니다.
+
+    python benchmarks/bench_get_data.py [--sizes 21,1000,10000,100000] [--repeat 5]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from recommend_movie import get_data, GENRE_DICT, IMG_BASE_URL  # noqa: E402
+
+
+def get_data_rowwise(df: pd.DataFrame) -> list:
+    """비교 기준: 벡터화 이전의 get_data 구현"""
+    col_list = ['backdrop_path', 'genre_ids', 'original_language', 'overview', 'poster_path',
+                'release_date', 'title', 'vote_average', 'vote_count', 'id']
+    df = df.drop(columns=[col for col in df.columns if col not in col_list])
+    base_url = IMG_BASE_URL
+    df['backdrop_path'] = df['backdrop_path'].apply(lambda x: base_url + x if x else "/no_image.png")
+    df['genre_ids'] = df['genre_ids'].apply(
+        lambda lst: [GENRE_DICT.get(str(gid)) for gid in lst if str(gid) in GENRE_DICT]
+    )
+    lang_map = {'ko': '한국어', 'en': '영어', 'ja': '일본어'}
+    df['original_language'] = df['original_language'].fillna("N/A").map(lang_map)
+    df['overview'] = (df['overview'].replace("", "줄거리가 없습니다.").fillna("줄거리가 없습니다.")
+                      .apply(lambda x: x[:200] + "..." if len(x) > 200 else x))
+    df['poster_path'] = df['poster_path'].apply(lambda x: base_url + x if x else "/no_image.png")
+    df['release_date'] = df['release_date'].fillna("N/A")
+    df['title'] = df['title'].replace("", "제목이 없습니다.").fillna("제목이 없습니다.")
+    df['vote_average'] = df['vote_average'].apply(lambda x: f"{float(x):.2f}" if x else "N/A")
+    df['vote_count'] = df['vote_count'].apply(lambda x: int(x) if x else "N/A")
+    df['id'] = 'https://www.themoviedb.org/movie/' + df['id'].astype(str)
+    movies = []
+    for _, row in df.iterrows():
+        movies.append({
+            "id": row['id'],
+            "title": row['title'],
+            "genre": ", ".join(row['genre_ids']),
+            "rating": row['vote_average'],
+            "language": row['original_language'],
+            "poster_url": row['poster_path'],
+            "overview": row['overview'],
+        })
+    return movies
+
+
+def make_frame(n, seed=0) -> pd.DataFrame:
+    """
+    discover 결과와 같은 모양의 합성 DataFrame (빈 값/긴 줄거리/미지원 장르 포함).
+    기존 구현은 경로 컬럼의 NaN(null과 문자열이 섞인 경우)에서 TypeError가 나므로
+    이미지 경로의 빈 값은 ""로만 만듭니다.
+    """
+    rng = random.Random(seed)
+    genre_ids = [int(g) for g in GENRE_DICT] + [10770]
+    rows = []
+    for i in range(n):
+        rows.append({
+            "adult": False,
+            "backdrop_path": rng.choice(["", f"/b{i}.jpg"]),
+            "genre_ids": rng.sample(genre_ids, rng.randint(0, 4)),
+            "id": 1000 + i,
+            "original_language": rng.choice(["ko", "en", "ja", "fr", None]),
+            "original_title": f"orig {i}",
+            "overview": rng.choice(["", None, "짧은 줄거리", "긴 줄거리 " * rng.randint(10, 60)]),
+            "popularity": rng.random() * 100,
+            "poster_path": rng.choice(["", f"/p{i}.jpg", f"/p{i}.jpg"]),
+            "release_date": rng.choice([None, "", "2001-05-04"]),
+            "title": rng.choice(["", None, f"영화 {i}"]),
+            "video": False,
+            "vote_average": rng.choice([0, 0.0, 7, 6.4567, rng.random() * 10]),
+            "vote_count": rng.choice([0, 12, 3456]),
+        })
+    return pd.DataFrame(rows)
+
+
+def canonical(records) -> str:
+    return json.dumps(records, ensure_ascii=False, default=str)
+
+
+def best_of(func, df, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(df.copy())
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="21,1000,10000,100000")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'rows':>8} {'rowwise (ms)':>14} {'vectorized (ms)':>16} {'speedup':>8}  identical")
+    for n in [int(x) for x in args.sizes.split(",")]:
+        df = make_frame(n, seed=n)
+        identical = canonical(get_data_rowwise(df.copy())) == canonical(get_data(df.copy()))
+        old = best_of(get_data_rowwise, df, args.repeat)
+        new = best_of(get_data, df, args.repeat)
+        print(f"{n:>8} {old * 1000:>14.2f} {new * 1000:>16.2f} {old / new:>7.1f}x  {identical}")
+        if not identical:
+            sys.exit(f"출력이 다릅니다: rows={n}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,581 @@
+# benchmarks/bench_routes.py
+"""
+Flask 라우트별 지연 시간/외부 호출 수 벤치마크.
+
+로컬 스텁 서버가 TMDB, KOBIS, 네이트 뉴스, Wikidata를 대신 응답하고, Rekognition은 stub 백엔드
+(fixtures/routes/rekognition.json)를 씁니다. 네이트 뉴스는 앱 코드(aws.nate_news_search)를 그대로 두고
+브라우저 풀만 스텁 드라이버로 바꿔, 검색창 입력 후 보이는 검색 결과 페이지를 스텁 서버에서 받아옵니다.
+스텁 서버는 --fixtures 디렉터리에 녹화된 응답이 있으면 그 응답을, 없으면 같은 모양의 합성 응답을
+돌려주고, 끝에 서비스별 녹화/합성 응답 수를 출력합니다. --record를 주면 실제 서비스로 요청을 넘기고
+응답을 --fixtures 디렉터리에 저장합니다. (TMDB_API_KEY 필요, 녹화한 파일은 fixtures/routes에 커밋)
+
+앱의 백그라운드 작업(카탈로그/게임 풀/영화제)을 먼저 한 번 채운 뒤, 라우트마다 cold와 warm을 따로 잽니다.
+cold는 요청마다 앞서 요청이 채운 캐시(TMDB 응답, movie_store, person_index, 뉴스, Wikidata, 얼굴 캐시)를
+비우고 --repeat번, warm은 캐시를 그대로 두고 --repeat번 요청해 p50/p95/p99 지연 시간과 요청당 외부 호출 수를
+출력합니다. 외부 호출 수는 요청이 시작한 백그라운드 호출이 끝날 때까지 셉니다.
+warm p95나 (cold/warm 중) 요청당 최대 외부 호출 수가 ROUTES의 예산을 넘으면 종료 코드 1로 끝납니다.
+예산은 녹화된 응답으로만 검사하므로, 합성 응답을 하나라도 쓰면 종료 코드 1로 끝납니다.
+--allow-synthetic을 주면 합성 응답으로 끝까지 실행하고 예산 초과는 참고용으로만 출력합니다.
+
+    python benchmarks/bench_routes.py [--repeat 20] [--routes search-actors,results] [--latency 20]
+                                      [--fixtures DIR] [--record] [--allow-synthetic]
+"""
+import argparse
+import hashlib
+import json
+import math
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import zlib
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+from contextlib import contextmanager
+from urllib.parse import parse_qsl, urlencode, urlparse
+from urllib.request import urlopen
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from bench_festival_crawler import synthetic_page  # noqa: E402
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "routes")
+# --record 시 요청을 넘길 실제 서비스 주소
+UPSTREAMS = {
+    "tmdb": "https://api.themoviedb.org/3",
+    "wikidata": "https://www.wikidata.org/w/api.php",
+    "nate": "https://news.nate.com/search",
+    "kobis": "https://www.kobis.or.kr/kobis/business/mast/fest/searchUserFestInfoList.do",
+}
+GENRES = (28, 12, 18, 35, 53, 10749)
+
+
+# ---------------- 합성 응답 ----------------
+
+def _movie(movie_id, language="ko"):
+    return {
+        "id": movie_id,
+        "title": f"영화 {movie_id}",
+        "original_language": language,
+        "overview": f"영화 {movie_id}의 줄거리입니다. " * 6,
+        "poster_path": f"/m{movie_id}.jpg",
+        "backdrop_path": f"/b{movie_id}.jpg",
+        "release_date": f"{1980 + movie_id % 45}-{1 + movie_id % 12:02d}-{1 + movie_id % 28:02d}",
+        "genre_ids": [GENRES[movie_id % len(GENRES)], GENRES[(movie_id + 2) % len(GENRES)]],
+        "vote_average": round(5 + (movie_id % 50) / 10, 1),
+        "vote_count": 100 + movie_id % 900,
+        "popularity": 100 - movie_id % 100,
+    }
+
+
+def _person(person_id, name=None):
+    return {
+        "id": person_id,
+        "name": name or f"배우 {person_id}",
+        "gender": 1 + person_id % 2,
+        "known_for_department": "Acting",
+        "profile_path": f"/p{person_id}.jpg",
+        "popularity": 50 - person_id % 50,
+    }
+
+
+def _credits(person_id, count=30):
+    return [dict(_movie(person_id * 100 + i), character=f"역할 {i}") for i in range(count)]
+
+
+def synthetic_tmdb(path, query):
+    parts = path.strip("/").split("/")
+    if parts == ["search", "person"]:
+        seed = zlib.crc32(query.get("query", "").encode("utf-8")) % 1000
+        return {"page": 1, "total_pages": 1, "results": [
+            _person(10000 + seed * 10 + i, f"{query.get('query')} {i}" if i else query.get("query")) for i in range(10)
+        ]}
+    if parts == ["discover", "movie"]:
+        filters = urlencode(sorted((k, v) for k, v in query.items() if k not in ("page", "api_key")))
+        base = 100000 + zlib.crc32(filters.encode("utf-8")) % 5000 * 1000
+        page = int(query.get("page", 1))
+        language = query.get("with_original_language", "ko").split("|")[0].split(",")[0]
+        return {"page": page, "total_pages": 10, "total_results": 200,
+                "results": [_movie(base + page * 20 + i, language) for i in range(20)]}
+    if len(parts) >= 2 and parts[0] == "movie" and parts[1].isdigit():
+        movie_id = int(parts[1])
+        cast = [dict(_person(movie_id % 997 * 10 + i), character=f"역할 {i}", order=i) for i in range(10)]
+        if parts[2:] == ["credits"]:
+            return {"id": movie_id, "cast": cast, "crew": []}
+        movie = _movie(movie_id)
+        movie.update({
+            "runtime": 90 + movie_id % 60,
+            "production_countries": [{"iso_3166_1": "KR", "name": "South Korea"}],
+            "genres": [{"id": g, "name": str(g)} for g in movie["genre_ids"]],
+            "credits": {"cast": cast, "crew": [{"name": f"감독 {movie_id}", "job": "Director"}]},
+        })
+        return movie
+    if len(parts) >= 2 and parts[0] == "person" and parts[1].isdigit():
+        person_id = int(parts[1])
+        cast = _credits(person_id)
+        appended = {
+            "external_ids": {"imdb_id": f"nm{person_id:07d}", "instagram_id": None, "twitter_id": None},
+            "movie_credits": {"cast": cast, "crew": []},
+            "tv_credits": {"cast": [], "crew": []},
+            "combined_credits": {"cast": cast, "crew": []},
+        }
+        if len(parts) == 3:
+            return appended.get(parts[2])
+        person = _person(person_id)
+        person.update({
+            "birthday": f"{1950 + person_id % 55}-{1 + person_id % 12:02d}-{1 + person_id % 28:02d}",
+            "place_of_birth": "Seoul, South Korea",
+            "biography": f"배우 {person_id}의 소개입니다.",
+        })
+        for part in query.get("append_to_response", "").split(","):
+            if part in appended:
+                person[part] = appended[part]
+        return person
+    return None
+
+
+def synthetic_wikidata(query):
+    ids = [i for i in query.get("ids", "").split("|") if i]
+    return {"entities": {
+        i: {"id": i, "claims": {"P18": [{"mainsnak": {"datavalue": {"value": f"{i} portrait.jpg"}}}]}}
+        for i in ids
+    }}
+
+
+def synthetic_nate(query):
+    items = "".join(
+        f"<li class='items'><a href='https://news.nate.com/view/{zlib.crc32(query.encode('utf-8'))}{i}'>"
+        f"<h2 class='tit'>{query} 관련 기사 {i}</h2><span class='time'>언론사 {i} 2025.10.0{i % 9 + 1}</span></a></li>"
+        for i in range(11)
+    )
+    return (f"<html><body><div class='search-result'><ul class='search-list'>{items}</ul></div>"
+            "</body></html>")
+
+
+# ---------------- 스텁 서버 ----------------
+
+class Upstream:
+    """스텁 서버: 서비스별 호출 수를 세고, 녹화된 fixture 또는 합성 응답을 돌려줍니다."""
+
+    def __init__(self, fixtures_dir, record=False, latency=0.0):
+        self.fixtures_dir = fixtures_dir
+        self.record = record
+        self.latency = latency
+        self.counts = Counter()
+        self.sources = Counter()  # (서비스, "recorded" 또는 "synthetic") -> 응답 수
+        self.active = 0
+        self.last_activity = 0.0
+        self._lock = threading.Lock()
+        self._session = None
+        if record:
+            import requests
+            self._session = requests.Session()
+            self._session.headers["User-Agent"] = "Mozilla/5.0 (compatible; MyCinema/1.0)"
+
+    def snapshot(self) -> Counter:
+        with self._lock:
+            return Counter(self.counts)
+
+    def hit(self, service):
+        with self._lock:
+            self.counts[service] += 1
+            self.last_activity = time.monotonic()
+
+    def wait_idle(self, quiet=0.05, timeout=30):
+        """진행 중인 요청이 없고 quiet초 동안 새 요청이 없을 때까지 기다립니다. (백그라운드 prefetch 포함)"""
+        start = time.monotonic()
+        deadline = start + timeout
+        while time.monotonic() < deadline:
+            with self._lock:
+                idle = self.active == 0 and time.monotonic() - max(self.last_activity, start) >= quiet
+            if idle:
+                return True
+            time.sleep(quiet / 5)
+        return False
+
+    @staticmethod
+    def request_key(service, path, query):
+        if service == "kobis":
+            return f"kobis curPage={query.get('curPage', '1')}"
+        items = sorted((k, v) for k, v in query.items() if k != "api_key")
+        return f"{service} {path}?{urlencode(items)}"
+
+    def _fixture_path(self, key):
+        service = key.split(" ", 1)[0]
+        return os.path.join(self.fixtures_dir, service, hashlib.sha1(key.encode("utf-8")).hexdigest() + ".json")
+
+    def _load(self, key):
+        try:
+            with open(self._fixture_path(key), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _forward(self, service, method, path, query, key):
+        url = UPSTREAMS[service] + (path if service == "tmdb" else "")
+        if method == "POST":
+            r = self._session.post(url, data=query, timeout=30)
+        else:
+            r = self._session.get(url, params=query, timeout=30)
+        fixture = {"request": key, "status": r.status_code,
+                   "content_type": r.headers.get("Content-Type", "application/octet-stream"), "body": r.text}
+        os.makedirs(os.path.dirname(self._fixture_path(key)), exist_ok=True)
+        with open(self._fixture_path(key), "w", encoding="utf-8") as f:
+            json.dump(fixture, f, ensure_ascii=False)
+        return fixture
+
+    def _synthetic(self, service, path, query):
+        if service == "tmdb":
+            data = synthetic_tmdb(path, query)
+            if data is None:
+                return {"status": 404, "content_type": "application/json",
+                        "body": json.dumps({"status_code": 34, "status_message": "not found"})}
+            return {"status": 200, "content_type": "application/json", "body": json.dumps(data, ensure_ascii=False)}
+        if service == "wikidata":
+            return {"status": 200, "content_type": "application/json", "body": json.dumps(synthetic_wikidata(query))}
+        if service == "nate":
+            return {"status": 200, "content_type": "text/html; charset=utf-8", "body": synthetic_nate(query.get("q", ""))}
+        return {"status": 200, "content_type": "text/html; charset=utf-8",
+                "body": synthetic_page(int(query.get("curPage", "1")))}
+
+    def respond(self, method, raw_path, body):
+        url = urlparse(raw_path)
+        service, _, path = url.path.lstrip("/").partition("/")
+        if service not in UPSTREAMS:
+            return {"status": 404, "content_type": "text/plain", "body": "unknown upstream"}
+        path = "/" + path if path else ""
+        query = dict(parse_qsl(url.query))
+        if method == "POST":
+            query.update(parse_qsl(body))
+        self.hit(service)
+        key = self.request_key(service, path, query)
+        if self.record:
+            fixture = self._forward(service, method, path, query, key)
+            source = "recorded"
+        else:
+            if self.latency:
+                time.sleep(self.latency)
+            fixture = self._load(key)
+            source = "recorded" if fixture else "synthetic"
+            fixture = fixture or self._synthetic(service, path, query)
+        with self._lock:
+            self.sources[(service, source)] += 1
+        return fixture
+
+    def handler(self):
+        upstream = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _send(self, method):
+                length = int(self.headers.get("Content-Length", 0))
+                body = self.rfile.read(length).decode("utf-8") if length else ""
+                with upstream._lock:
+                    upstream.active += 1
+                try:
+                    fixture = upstream.respond(method, self.path, body)
+                except Exception as e:
+                    fixture = {"status": 502, "content_type": "text/plain", "body": f"stub error: {e}"}
+                finally:
+                    with upstream._lock:
+                        upstream.active -= 1
+                        upstream.last_activity = time.monotonic()
+                data = fixture["body"].encode("utf-8")
+                self.send_response(fixture["status"])
+                self.send_header("Content-Type", fixture["content_type"])
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                self._send("GET")
+
+            def do_POST(self):
+                self._send("POST")
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+# ---------------- 스텁 브라우저 ----------------
+
+class StubElement:
+    def __init__(self, driver):
+        self.driver = driver
+
+    def send_keys(self, text):
+        from selenium.webdriver.common.keys import Keys
+        if text == Keys.ENTER:
+            self.driver.submit()
+        else:
+            self.driver.typed += text
+
+
+class StubNateDriver:
+    """
+    aws.nate_news_search가 쓰는 만큼만 흉내 낸 WebDriver. 검색창(input_search)에 입력하고 ENTER를 보내면
+    스텁 서버의 /nate?q=...(실제 네이트 검색 결과 페이지와 같은 녹화 키)를 받아 page_source로 둡니다.
+    """
+
+    def __init__(self, base_url):
+        self.base_url = base_url
+        self.typed = ""
+        self.page_source = "<html></html>"
+        self.searched = False
+
+    def get(self, url):
+        self.typed, self.searched = "", False
+
+    def submit(self):
+        with urlopen(f"{self.base_url}/nate?{urlencode({'q': self.typed})}", timeout=30) as response:
+            self.page_source = response.read().decode("utf-8")
+        self.searched = True
+
+    def find_element(self, by, value):
+        from selenium.common.exceptions import NoSuchElementException
+        if value == "input_search" or (value == "search-result" and self.searched):
+            return StubElement(self)
+        raise NoSuchElementException(value)
+
+
+class StubDriverPool:
+    """webdriver_pool.DriverPool 대신 쓰는 풀 (브라우저 없이 StubNateDriver를 빌려줌)"""
+
+    def __init__(self, base_url):
+        self.base_url = base_url
+
+    @contextmanager
+    def lease(self):
+        yield StubNateDriver(self.base_url)
+
+
+def configure_env(base_url, cache_dir, fixtures_dir, record):
+    """앱 모듈을 import하기 전에 외부 서비스 주소와 캐시 경로를 스텁/임시 디렉터리로 바꿉니다."""
+    env = {
+        "BACKGROUND_JOBS": "0",
+        "TMDB_API_BASE": f"{base_url}/tmdb",
+        "WIKIDATA_API_URL": f"{base_url}/wikidata",
+        "KOBIS_FESTIVAL_URL": f"{base_url}/kobis",
+        "FESTIVAL_CRAWLER_ENGINE": "http",
+        "REKOGNITION_BACKEND": "stub",
+        "REKOGNITION_STUB_PATH": os.path.join(fixtures_dir, "rekognition.json"),
+        "GAME_STATE_BACKEND": "memory",
+        "MOVIE_STORE_PATH": os.path.join(cache_dir, "movie_store.sqlite"),
+        "PERSON_INDEX_PATH": os.path.join(cache_dir, "person_index.sqlite"),
+        "MOVIE_CATALOG_PATH": os.path.join(cache_dir, "movie_catalog.npz"),
+        "FESTIVAL_CACHE_PATH": os.path.join(cache_dir, "festivals.json"),
+        "FACE_CACHE_PATH": os.path.join(cache_dir, "face_cache.sqlite"),
+        "WIKIDATA_CACHE_PATH": os.path.join(cache_dir, "wikidata_images.sqlite"),
+        "POSTER_CACHE_DIR": os.path.join(cache_dir, "posters"),
+        "IMAGE_VARIANT_CACHE_DIR": os.path.join(cache_dir, "image_variants"),
+    }
+    os.environ.update(env)
+    os.environ.pop("TMDB_CACHE_PATH", None)
+    if not record:
+        os.environ["TMDB_API_KEY"] = "bench"
+
+
+# ---------------- 라우트 ----------------
+
+def face_upload():
+    # 매번 다른 사진(캐시 미스)을 올립니다.
+    image = BytesIO()
+    from PIL import Image
+    Image.effect_noise((640, 480), 64).convert("RGB").save(image, "JPEG", quality=85)
+    image.seek(0)
+    return {"data": {"file1": (image, "face.jpg")}, "content_type": "multipart/form-data"}
+
+
+def start_game(client):
+    client.get("/api/game-movies")
+
+
+# name, method, url, 요청 인자 함수, 측정 전에 실행할 준비 함수, (p95 예산 ms, 요청당 최대 외부 호출 수)
+# 외부 호출 수에는 요청이 시작한 백그라운드 호출(예: 결과 화면용 movie_store.prefetch)도 포함됩니다.
+ROUTES = [
+    ("search-actors", "GET", "/api/search-actors?name=송강호&age=40s", None, None, (1000, 12)),
+    ("actor", "GET", "/actor/10001", None, None, (300, 2)),
+    ("find-celeb-face", "POST", "/find_celeb_face", face_upload, None, (1500, 10)),
+    ("recommend", "POST", "/recommend_mv",
+     lambda: {"data": {"genres": ["28"], "runtime": "1", "release_year_range": ["0"],
+                       "min_rating": "5", "languages": ["ko"]}}, None, (500, 4)),
+    ("game-movies", "GET", "/api/game-movies", None, None, (100, 9)),
+    ("game-movies-person", "GET", "/api/game-movies-person?name=송강호", None, None, (500, 12)),
+    ("results", "GET", "/results", None, start_game, (500, 9)),
+    ("festivals", "GET", "/festivals", None, None, (100, 0)),
+]
+
+
+def percentile(values, q):
+    """nearest-rank 백분위수"""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)]
+
+
+def warm_up(upstream):
+    """start_background_jobs가 하는 일을 기다리면서 한 번 실행합니다. (브라우저 풀 제외)"""
+    import recommend_movie
+    from festival_cache import festival_cache
+    from game_movie_pool import movie_pool, GAME_POOL_COUNTRIES
+
+    before = upstream.snapshot()
+    start = time.perf_counter()
+    recommend_movie.refresh_catalog()
+    for country_code in (None, *GAME_POOL_COUNTRIES):
+        movie_pool.refresh(country_code, wait=True)
+    festival_cache.refresh()
+    calls = upstream.snapshot() - before
+    print(f"warm-up: {(time.perf_counter() - start) * 1000:.0f} ms, "
+          f"upstream {dict(calls)}, catalog {len(recommend_movie.catalog)}, game pool {len(movie_pool)}, "
+          f"festivals {len(festival_cache.festivals)}")
+
+
+def clear_caches():
+    """요청이 채우는 캐시를 모두 비웁니다. (백그라운드 작업이 만든 카탈로그/게임 풀/영화제 목록은 유지)"""
+    import aws
+    import tmdb_client
+    from face_cache import face_cache
+    from movie_store import movie_store
+    from person_index import person_index
+
+    tmdb_client.invalidate_cache()
+    movie_store.clear()
+    person_index.clear()
+    aws.news_lookup.cache.clear()
+    aws.get_wikidata_cache().clear()
+    if face_cache is not None:
+        face_cache.invalidate()
+
+
+def bench_route(client, upstream, route, repeat, cold):
+    """cold면 요청마다 캐시를 비운 뒤 잽니다."""
+    name, method, url, make_kwargs, setup, _ = route
+    latencies, calls, by_service = [], [], Counter()
+    for _ in range(repeat):
+        if setup:
+            setup(client)
+        kwargs = make_kwargs() if make_kwargs else {}
+        # 앞 요청이 시작한 백그라운드 호출이 끝난 뒤에 재고, 이 요청이 시작한 백그라운드 호출까지 셉니다.
+        upstream.wait_idle()
+        if cold:
+            clear_caches()
+        before = upstream.snapshot()
+        start = time.perf_counter()
+        response = client.open(url, method=method, **kwargs)
+        response.get_data()
+        latencies.append((time.perf_counter() - start) * 1000)
+        upstream.wait_idle()
+        used = upstream.snapshot() - before
+        calls.append(sum(used.values()))
+        by_service.update(used)
+        if response.status_code >= 400:
+            print(f"  {name}: HTTP {response.status_code}")
+    return latencies, calls, by_service
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--routes", help="쉼표로 구분한 라우트 이름 (기본: 전체)")
+    parser.add_argument("--latency", type=float, default=20, help="스텁 응답마다 더할 지연 (ms)")
+    parser.add_argument("--fixtures", default=FIXTURES_DIR)
+    parser.add_argument("--record", action="store_true", help="실제 서비스 응답을 --fixtures에 녹화")
+    parser.add_argument("--allow-synthetic", action="store_true",
+                        help="녹화된 fixture가 없으면 합성 응답으로 실행 (예산은 검사하지 않고 출력만)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    random.seed(args.seed)
+
+    upstream = Upstream(args.fixtures, record=args.record, latency=args.latency / 1000)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), upstream.handler())
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    cache_dir = tempfile.mkdtemp(prefix="bench_routes_")
+    base_url = f"http://127.0.0.1:{server.server_port}"
+    configure_env(base_url, cache_dir, args.fixtures, args.record)
+
+    import app  # 환경 변수 설정 후 import
+    import aws
+
+    # 네이트 뉴스 검색은 Chrome 대신 스텁 드라이버로 실행합니다.
+    aws.driver_pool = StubDriverPool(base_url)
+
+    # stub Rekognition 호출도 외부 호출로 셉니다.
+    rekognition = aws.get_rekognition_client()
+    recognize = rekognition.recognize_celebrities
+
+    def counted_recognize(**kwargs):
+        upstream.hit("rekognition")
+        return recognize(**kwargs)
+
+    rekognition.recognize_celebrities = counted_recognize
+
+    selected = args.routes.split(",") if args.routes else [route[0] for route in ROUTES]
+    unknown = set(selected) - {route[0] for route in ROUTES}
+    if unknown:
+        parser.error(f"알 수 없는 라우트: {', '.join(sorted(unknown))}")
+
+    over_budget = []
+    try:
+        warm_up(upstream)
+        client = app.app.test_client()
+        print(f"{'':>19} {'cold (ms)':>15} {'warm (ms)':>23} {'':>7} {'calls/req (cold / warm)':>25}")
+        print(f"{'route':>19} {'p50':>7} {'p95':>7} {'p50':>7} {'p95':>7} {'p99':>7} {'budget':>7} "
+              f"{'cold':>6} {'warm':>6} {'max':>4} {'budget':>6}  upstream (cold / warm)")
+        for route in ROUTES:
+            if route[0] not in selected:
+                continue
+            name, budget_ms, budget_calls = route[0], *route[5]
+            cold, cold_calls, cold_services = bench_route(client, upstream, route, args.repeat, cold=True)
+            warm, warm_calls, warm_services = bench_route(client, upstream, route, args.repeat, cold=False)
+            p50, p95, p99 = (percentile(warm, q) for q in (50, 95, 99))
+            max_calls = max(cold_calls + warm_calls)
+            over = []
+            if p95 > budget_ms:
+                over.append(f"warm p95 {p95:.0f} ms > {budget_ms} ms")
+            if max_calls > budget_calls:
+                over.append(f"calls {max_calls} > {budget_calls}")
+            if over:
+                over_budget.append(f"{name}: {', '.join(over)}")
+            services = " / ".join(" ".join(f"{s}={n}" for s, n in sorted(by_service.items())) or "-"
+                                  for by_service in (cold_services, warm_services))
+            print(f"{name:>19} {percentile(cold, 50):>7.1f} {percentile(cold, 95):>7.1f} "
+                  f"{p50:>7.1f} {p95:>7.1f} {p99:>7.1f} {budget_ms:>7} "
+                  f"{sum(cold_calls) / len(cold_calls):>6.1f} {sum(warm_calls) / len(warm_calls):>6.1f} "
+                  f"{max_calls:>4} {budget_calls:>6}  {services}{'  OVER BUDGET' if over else ''}")
+    finally:
+        server.shutdown()
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+    services = sorted({service for service, _ in upstream.sources})
+    print("\nupstream 응답 출처: " + (", ".join(
+        f"{service} recorded={upstream.sources[(service, 'recorded')]} "
+        f"synthetic={upstream.sources[(service, 'synthetic')]}" for service in services) or "-"))
+    synthetic = sum(n for (_, source), n in upstream.sources.items() if source == "synthetic")
+
+    if synthetic and args.allow_synthetic:
+        # 합성 응답으로 잰 값은 실제 서비스와 다르므로 예산은 참고용으로만 출력합니다.
+        if over_budget:
+            print("\n예산 초과 (합성 응답 포함, 검사하지 않음):")
+            for failure in over_budget:
+                print(f"  {failure}")
+        return
+    failures = over_budget
+    if synthetic:
+        failures.append(f"녹화된 fixture 없이 합성 응답 {synthetic}건 사용 "
+                        f"(--record로 녹화하거나 --allow-synthetic으로 실행)")
+    if failures:
+        print("\n실패:")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+# cache_store.py
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+class CacheStats:
+    """캐시 적중/미스/축출 카운터"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def incr(self, name, n=1):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + n)
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+
+
+class LRUCache:
+    """
+    프로세스 내 LRU 캐시. 항목마다 만료 시각(TTL)을 가지며,
+    maxsize를 넘으면 가장 오래 사용하지 않은 항목부터 축출합니다.
+    """
+
+    def __init__(self, maxsize=1024, default_ttl=600):
+        self.maxsize = maxsize
+        self.default_ttl = default_ttl
+        self.stats = CacheStats()
+        self._data = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        now = time.time()
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None and item[0] > now:
+                self._data.move_to_end(key)
+                self.stats.incr("hits")
+                return item[1]
+            if item is not None:
+                # 만료된 항목
+                del self._data[key]
+                self.stats.incr("evictions")
+        self.stats.incr("misses")
+        return default
+
+    def set(self, key, value, ttl=None):
+        ttl = self.default_ttl if ttl is None else ttl
+        with self._lock:
+            self._data[key] = (time.time() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.stats.incr("evictions")
+
+    def delete(self, key):
+        with self._lock:
+            return self._data.pop(key, None) is not None
+
+    def delete_prefix(self, prefix) -> int:
+        with self._lock:
+            keys = [k for k in self._data if str(k).startswith(prefix)]
+            for k in keys:
+                del self._data[k]
+        return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class DiskCache:
+    """
+    SQLite 파일 기반 캐시. 여러 워커 프로세스가 같은 파일을 공유할 수 있습니다.
+    값은 JSON으로 저장하며, 항목 수가 maxsize를 넘으면 만료가 가까운 순서로 축출합니다.
+    """
+
+    EVICT_EVERY = 100  # 쓰기 N회마다 한 번씩 만료/초과 항목 정리
+
+    def __init__(self, path, maxsize=50000):
+        self.path = path
+        self.maxsize = maxsize
+        self.stats = CacheStats()
+        self._writes = 0
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        conn = self._conn()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            " key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS cache_expires ON cache(expires_at)")
+        conn.commit()
+
+    def _conn(self):
+        # sqlite3 커넥션은 스레드마다 따로 엽니다.
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get_entry(self, key):
+        """(value, expires_at) 또는 None을 반환합니다."""
+        try:
+            row = self._conn().execute(
+                "SELECT value, expires_at FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+        except sqlite3.Error as e:
+            print(f"디스크 캐시 읽기 실패: {e}")
+            return None
+        if row is None or row[1] <= time.time():
+            self.stats.incr("misses")
+            return None
+        self.stats.incr("hits")
+        return json.loads(row[0]), row[1]
+
+    def get(self, key, default=None):
+        entry = self.get_entry(key)
+        return entry[0] if entry is not None else default
+
+    def set(self, key, value, ttl):
+        try:
+            conn = self._conn()
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value, ensure_ascii=False), time.time() + ttl),
+            )
+            conn.commit()
+            self._writes += 1
+            if self._writes % self.EVICT_EVERY == 0:
+                self._evict(conn)
+        except sqlite3.Error as e:
+            print(f"디스크 캐시 쓰기 실패: {e}")
+
+    def _evict(self, conn):
+        cur = conn.execute("DELETE FROM cache WHERE expires_at <= ?", (time.time(),))
+        evicted = cur.rowcount
+        (count,) = conn.execute("SELECT COUNT(*) FROM cache").fetchone()
+        if count > self.maxsize:
+            cur = conn.execute(
+                "DELETE FROM cache WHERE key IN ("
+                " SELECT key FROM cache ORDER BY expires_at LIMIT ?)",
+                (count - self.maxsize,),
+            )
+            evicted += cur.rowcount
+        conn.commit()
+        if evicted > 0:
+            self.stats.incr("evictions", evicted)
+
+    def delete(self, key):
+        conn = self._conn()
+        cur = conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+        conn.commit()
+        return cur.rowcount > 0
+
+    def delete_prefix(self, prefix) -> int:
+        conn = self._conn()
+        escaped = prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        cur = conn.execute("DELETE FROM cache WHERE key LIKE ? ESCAPE '\\'", (escaped + "%",))
+        conn.commit()
+        return cur.rowcount
+
+    def clear(self):
+        conn = self._conn()
+        conn.execute("DELETE FROM cache")
+        conn.commit()
+
+
+class TieredCache:
+    """
+    1차: 프로세스 내 LRUCache, 2차(선택): 프로세스 간 공유 DiskCache.
+    디스크에서 찾은 값은 남은 TTL만큼 메모리 캐시로 다시 올립니다.
+    """
+
+    def __init__(self, memory: LRUCache, disk: DiskCache = None):
+        self.memory = memory
+        self.disk = disk
+
+    def get(self, key, default=None):
+        value = self.memory.get(key)
+        if value is not None:
+            return value
+        if self.disk is not None:
+            entry = self.disk.get_entry(key)
+            if entry is not None:
+                value, expires_at = entry
+                self.memory.set(key, value, expires_at - time.time())
+                return value
+        return default
+
+    def set(self, key, value, ttl):
+        self.memory.set(key, value, ttl)
+        if self.disk is not None:
+            self.disk.set(key, value, ttl)
+
+    def invalidate(self, key=None, prefix=None) -> int:
+        """key 하나 또는 prefix로 시작하는 모든 항목을 두 계층에서 지웁니다."""
+        if key is None and prefix is None:
+            self.clear()
+            return 0
+        removed = 0
+        if key is not None:
+            removed += int(self.memory.delete(key))
+            if self.disk is not None:
+                removed += int(self.disk.delete(key))
+        if prefix is not None:
+            removed += self.memory.delete_prefix(prefix)
+            if self.disk is not None:
+                removed += self.disk.delete_prefix(prefix)
+        return removed
+
+    def clear(self):
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def stats(self) -> dict:
+        return {
+            "memory": dict(self.memory.stats.as_dict(), size=len(self.memory)),
+            "disk": self.disk.stats.as_dict() if self.disk is not None else None,
+        }
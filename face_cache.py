@@ -0,0 +1,130 @@
+# face_cache.py
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from io import BytesIO
+
+from PIL import Image
+
+from cache_store import DiskCache, LRUCache, TieredCache
+from metrics import observe
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+# FACE_CACHE=0이면 캐시를 끕니다.
+FACE_CACHE_ENABLED = os.getenv("FACE_CACHE", "1") != "0"
+FACE_CACHE_PATH = os.getenv("FACE_CACHE_PATH", os.path.join(BASE_DIR, ".cache", "face_cache.sqlite"))
+# 인식 결과와 TMDB 보강 결과를 보관하는 시간 (초). 뉴스는 저장하지 않고 응답할 때 news_lookup에서 붙입니다.
+FACE_CACHE_TTL = int(os.getenv("FACE_CACHE_TTL", str(6 * 60 * 60)))
+FACE_CACHE_SIZE = int(os.getenv("FACE_CACHE_SIZE", "1000"))  # 저장할 최대 이미지 수
+# 지각 해시(dHash) 근사 중복 계층 (기본 꺼짐, FACE_CACHE_NEAR_DUPLICATE=1로 켬).
+# 해밍 거리가 DHASH_MAX_DISTANCE 이하이면 같은 사진으로 봅니다.
+NEAR_DUPLICATE = os.getenv("FACE_CACHE_NEAR_DUPLICATE", "0") != "0"
+DHASH_MAX_DISTANCE = 4
+# 단색/그라데이션처럼 해시가 거의 0 또는 1로만 채워지는 이미지는 서로 구분되지 않으므로 근사 중복을 찾지 않습니다.
+DHASH_MIN_CONTRAST = 16  # 축소 이미지의 밝기 범위(최대-최소)가 이보다 작으면 제외
+DHASH_MIN_BITS = 8  # 1인 비트 수가 이보다 적거나 (64 - 이 값)보다 많으면 제외
+
+KINDS = ("recognition", "payload")
+
+
+def dhash(image_bytes: bytes, size: int = 8):
+    """64비트 difference hash. 디코딩할 수 없거나 거의 단색인 이미지면 None."""
+    try:
+        with Image.open(BytesIO(image_bytes)) as im:
+            im.draft("L", (size * 4, size * 4))
+            small = im.convert("L").resize((size + 1, size), Image.BILINEAR)
+            pixels = list(small.getdata())
+    except Exception:
+        return None
+    if max(pixels) - min(pixels) < DHASH_MIN_CONTRAST:
+        return None
+    value = 0
+    for row in range(size):
+        for col in range(size):
+            left = pixels[row * (size + 1) + col]
+            right = pixels[row * (size + 1) + col + 1]
+            value = (value << 1) | (left > right)
+    return value
+
+
+def _distinctive(value: int, bits: int = 64) -> bool:
+    """해시의 0/1 비율이 한쪽으로 치우치지 않아 근사 중복 비교에 쓸 만한지"""
+    ones = value.bit_count()
+    return DHASH_MIN_BITS <= ones <= bits - DHASH_MIN_BITS
+
+
+class FaceCache:
+    """
+    얼굴 인식 결과 캐시 (정규화된 이미지 바이트의 sha256을 키로 사용).
+    - "recognition": recognize_celebrities 결과, "payload": TMDB 보강까지 끝난 최종 응답
+    - 메모리 LRU + SQLite 파일 2계층, TTL과 최대 항목 수로 축출합니다.
+    - near_duplicate가 켜져 있으면 처음 보는 바이트라도 dHash가 가까운 이미지의 결과를 재사용합니다.
+      (dHash 목록은 메모리에만 두므로 재시작 후에는 정확히 같은 바이트만 적중합니다.
+       거의 단색이거나 해시가 한쪽으로 치우친 이미지는 정확히 같은 바이트만 적중합니다.)
+    """
+
+    def __init__(self, path=FACE_CACHE_PATH, ttl=FACE_CACHE_TTL, maxsize=FACE_CACHE_SIZE,
+                 near_duplicate=NEAR_DUPLICATE, max_distance=DHASH_MAX_DISTANCE):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.near_duplicate = near_duplicate
+        self.max_distance = max_distance
+        disk = DiskCache(path, maxsize=maxsize * len(KINDS)) if path else None
+        self.cache = TieredCache(LRUCache(maxsize=maxsize * len(KINDS), default_ttl=ttl), disk)
+        self._hashes = OrderedDict()  # sha256 -> dHash
+        self._lock = threading.Lock()
+
+    def key(self, image_bytes: bytes) -> str:
+        """이미지의 캐시 키. 근사 중복이 있으면 그 이미지의 키를 돌려줍니다."""
+        digest = hashlib.sha256(image_bytes).hexdigest()
+        if not self.near_duplicate or self.cache.get(f"recognition:{digest}") is not None:
+            return digest
+        value = dhash(image_bytes)
+        if value is None or not _distinctive(value):
+            return digest
+        with self._lock:
+            candidates = sorted(
+                ((value ^ other_value).bit_count(), other)
+                for other, other_value in self._hashes.items()
+                if other != digest and (value ^ other_value).bit_count() <= self.max_distance
+            )
+            self._hashes[digest] = value
+            self._trim()
+        for _, other in candidates:
+            if self.cache.get(f"recognition:{other}") is not None:
+                return other
+        return digest
+
+    def _trim(self):
+        while len(self._hashes) > self.maxsize:
+            self._hashes.popitem(last=False)
+
+    def get(self, key: str, kind: str):
+        start = time.perf_counter()
+        value = self.cache.get(f"{kind}:{key}")
+        if value is not None:
+            # Rekognition 호출을 건너뛴 캐시 적중으로 기록합니다.
+            observe("rekognition", "RecognizeCelebrities", time.perf_counter() - start, "cached", cache="hit")
+        return value
+
+    def set(self, key: str, kind: str, value):
+        self.cache.set(f"{kind}:{key}", value, self.ttl)
+        with self._lock:
+            if key in self._hashes:
+                self._hashes.move_to_end(key)
+
+    def invalidate(self, key: str = None) -> int:
+        if key is None:
+            self.cache.clear()
+            with self._lock:
+                self._hashes.clear()
+            return 0
+        return sum(self.cache.invalidate(key=f"{kind}:{key}") for kind in KINDS)
+
+    def stats(self) -> dict:
+        return dict(self.cache.stats(), hashes=len(self._hashes))
+
+
+face_cache = FaceCache() if FACE_CACHE_ENABLED else None
@@ -0,0 +1,106 @@
+# festival_cache.py
+import json
+import os
+import threading
+import time
+
+from background import start_periodic
+from festival_crawler import KOBIS_ENDPOINT, get_film_festivals
+from metrics import observe
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+FESTIVAL_CACHE_PATH = os.getenv("FESTIVAL_CACHE_PATH", os.path.join(BASE_DIR, ".cache", "festivals.json"))
+# 크롤링 주기 / 이 시간이 지나면 stale로 보고 백그라운드에서 다시 크롤링 (초)
+FESTIVAL_REFRESH_INTERVAL = int(os.getenv("FESTIVAL_REFRESH_INTERVAL", str(6 * 60 * 60)))
+# 크롤링이 실패하면 이 시간 동안은 다시 시도하지 않습니다. (초)
+RETRY_AFTER = 5 * 60
+
+
+class FestivalCache:
+    """
+    영화제 목록 캐시 (stale-while-revalidate).
+    - get()은 항상 메모리의 목록을 바로 돌려주고 절대 크롤링을 기다리지 않습니다.
+    - 목록이 max_age보다 오래됐으면 백그라운드 크롤링을 한 번만 시작합니다.
+    - 크롤링 결과는 JSON 파일로 저장해 재시작 후에도 바로 사용합니다.
+    """
+
+    def __init__(self, crawl, path=FESTIVAL_CACHE_PATH, max_age=FESTIVAL_REFRESH_INTERVAL):
+        self.crawl = crawl
+        self.path = path
+        self.max_age = max_age
+        self.festivals = []
+        self.fetched_at = 0.0
+        self.last_attempt = 0.0
+        self._refresh_lock = threading.Lock()
+
+    def load(self) -> bool:
+        """저장된 목록을 불러옵니다."""
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return False
+        except (OSError, ValueError) as e:
+            print(f"영화제 캐시 로드 실패: {e}")
+            return False
+        self.festivals = data.get("festivals", [])
+        self.fetched_at = data.get("fetched_at", 0.0)
+        return True
+
+    def save(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"fetched_at": self.fetched_at, "festivals": self.festivals}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def is_stale(self) -> bool:
+        return time.time() - self.fetched_at >= self.max_age
+
+    def is_refreshing(self) -> bool:
+        return self._refresh_lock.locked()
+
+    def _should_refresh(self) -> bool:
+        return self.is_stale() and time.time() - self.last_attempt >= RETRY_AFTER
+
+    def refresh(self) -> bool:
+        """크롤링해서 목록을 교체합니다. 이미 크롤링 중이면 바로 False를 반환합니다."""
+        if not self._refresh_lock.acquire(blocking=False):
+            return False
+        try:
+            self.last_attempt = time.time()
+            festivals = self.crawl()
+            if not festivals:
+                # 크롤링 실패 시 기존 목록을 유지합니다.
+                print("영화제 크롤링 결과가 없어 기존 캐시를 유지합니다.")
+                return False
+            self.festivals = festivals
+            self.fetched_at = time.time()
+            self.save()
+            return True
+        finally:
+            self._refresh_lock.release()
+
+    def refresh_if_stale(self):
+        if self._should_refresh():
+            self.refresh()
+
+    def refresh_async(self):
+        threading.Thread(target=self.refresh, name="festival-refresh", daemon=True).start()
+
+    def get(self) -> list:
+        """메모리의 목록을 반환하고, 오래됐으면 백그라운드 갱신을 시작합니다."""
+        if self._should_refresh() and not self.is_refreshing():
+            self.refresh_async()
+        if self.festivals:
+            observe("kobis", KOBIS_ENDPOINT, 0.0, "cached", cache="hit")
+        return self.festivals
+
+
+festival_cache = FestivalCache(get_film_festivals)
+
+
+def start_festival_refresh():
+    """저장된 목록을 불러오고, 주기적으로 영화제 목록을 다시 크롤링하는 백그라운드 작업을 시작합니다."""
+    festival_cache.load()
+    return start_periodic("festivals", festival_cache.refresh_if_stale, interval=10 * 60)
@@ -1,81 +1,170 @@
 # -*- coding: utf-8 -*-
-from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.service import Service as ChromeService
-from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
+from concurrent.futures import ThreadPoolExecutor
+import os
+import requests
 import time
 
-def get_film_festivals_with_selenium():
-    all_festivals = []
-    
-    # 웹 드라이버 설정 (ChromeDriver를 자동으로 설치하고 관리)
+from metrics import track
+from webdriver_pool import driver_pool
+
+KOBIS_FESTIVAL_URL = os.getenv(
+    "KOBIS_FESTIVAL_URL", "https://www.kobis.or.kr/kobis/business/mast/fest/searchUserFestInfoList.do"
+)
+# 크롤링할 최대 페이지 수
+MAX_PAGES = 2
+# 크롤러 엔진: "http" (브라우저 없이 요청) 또는 "selenium"
+CRAWLER_ENGINE = os.getenv("FESTIVAL_CRAWLER_ENGINE", "http")
+HTTP_WORKERS = 4
+HTTP_TIMEOUT = 10
+# 지표에 쓰는 엔드포인트 이름
+KOBIS_ENDPOINT = "/searchUserFestInfoList.do"
+
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = "lxml"
+except ImportError:
+    HTML_PARSER = "html.parser"
+
+
+def parse_festival_rows(html):
+    """KOBIS 영화제 목록 HTML에서 table.tbl_comm 행을 영화제 dict 목록으로 변환"""
+    # 목록 테이블만 파싱해서 페이지 전체를 트리로 만들지 않습니다.
+    soup = BeautifulSoup(html, HTML_PARSER, parse_only=SoupStrainer("table", class_="tbl_comm"))
+    festivals = []
+    # 원본 HTML에는 tbody가 없을 수 있으므로 tr을 직접 찾고, td가 부족한 행(헤더 등)은 건너뜁니다.
+    for row in soup.select('table.tbl_comm tr'):
+        cols = row.find_all('td')
+        if len(cols) >= 9:
+            website_link_tag = cols[7].find('a')
+            website = website_link_tag['href'] if website_link_tag else None
+
+            festivals.append({
+                'title': cols[0].get_text(strip=True),
+                'location': cols[3].get_text(strip=True),
+                'period': cols[4].get_text(strip=True),
+                'website': website,
+            })
+    return festivals
+
+
+def _search_form_fields(html):
+    """페이지 이동에 필요한 검색 폼의 hidden 값들(CSRFToken 등)을 가져옵니다."""
+    soup = BeautifulSoup(html, HTML_PARSER, parse_only=SoupStrainer("form"))
+    form = soup.find("form", id="searchForm") or soup.find("form")
+    if form is None:
+        return {}
+    return {
+        field["name"]: field.get("value", "")
+        for field in form.find_all("input", attrs={"type": "hidden"})
+        if field.get("name")
+    }
+
+
+def get_film_festivals_with_requests(max_pages=MAX_PAGES):
+    """
+    브라우저 없이 KOBIS 목록 엔드포인트를 직접 요청하는 크롤러.
+    1페이지를 GET으로 받아 세션 쿠키/폼 값을 얻은 뒤,
+    나머지 페이지는 curPage를 바꿔 POST로 동시에 요청합니다.
+    """
+    session = requests.Session()
+    session.headers.update({"User-Agent": "Mozilla/5.0 (compatible; MyCinema/1.0)"})
     try:
-        # 0821 modified / Compatible with Chrome in CLI mode
-        options = Options()
-        options.add_argument("--headless=new")
-        options.add_argument("--no-sandbox")
-        options.add_argument("--disable-dev-shm-usage")
-        options.add_argument("--remote-debugging-port=0")
-        options.add_argument("--user-data-dir=/tmp/selenium_profile")
-        options.add_argument("--window-size=1200,800")
-        driver = webdriver.Chrome(options=options)
-        
-    except Exception as e:
-        print(f"웹 드라이버 설정 중 오류 발생: {e}")
+        with track("kobis", KOBIS_ENDPOINT, cache="miss") as call:
+            first = session.get(KOBIS_FESTIVAL_URL, timeout=HTTP_TIMEOUT)
+            call.status = first.status_code
+            first.raise_for_status()
+    except requests.exceptions.RequestException as e:
+        print(f"영화제 목록 요청 실패: {e}")
+        return []
+
+    pages = [parse_festival_rows(first.text)]
+    if not pages[0]:
+        print("더 이상 데이터가 없습니다. 크롤링을 종료합니다.")
         return []
 
-    url = "https://www.kobis.or.kr/kobis/business/mast/fest/searchUserFestInfoList.do"
-    driver.maximize_window()  # modified in 0821_11xx
-    driver.get(url)
-    
-    # 크롤링할 최대 페이지 수 (예: 10페이지)
-    max_pages = 2 
-    
-    for page_num in range(1, max_pages + 1):
+    form = _search_form_fields(first.text)
+
+    def fetch_page(page_num):
         try:
-            print(f"크롤링 중... 페이지: {page_num}")
-            
-            # 현재 페이지의 HTML 소스를 가져옵니다.
-            soup = BeautifulSoup(driver.page_source, 'html.parser')
-            table_rows = soup.select('table.tbl_comm > tbody > tr')
-            
-            if not table_rows:
-                print("더 이상 데이터가 없습니다. 크롤링을 종료합니다.")
-                break
-            
-            for row in table_rows:
-                cols = row.find_all('td')
-                if len(cols) >= 9:
-                    website_link_tag = cols[7].find('a')
-                    website = website_link_tag['href'] if website_link_tag else None
-                    
-                    festival_info = {
-                        'title': cols[0].get_text(strip=True),
-                        'location': cols[3].get_text(strip=True),
-                        'period': cols[4].get_text(strip=True),
-                        'website': website,
-                    }
-                    all_festivals.append(festival_info)
-            
-            # 다음 페이지 버튼 클릭 (페이지네이션)
-            # 페이지 번호가 담긴 a 태그를 찾아서 클릭합니다.
-            if page_num < max_pages:
-                next_page_link = driver.find_element(By.LINK_TEXT, str(page_num + 1))
-                next_page_link.click()
-                time.sleep(2) # 페이지 로딩을 기다립니다.
-
-        except Exception as e:
+            with track("kobis", KOBIS_ENDPOINT, cache="miss") as call:
+                r = session.post(KOBIS_FESTIVAL_URL, data=dict(form, curPage=page_num), timeout=HTTP_TIMEOUT)
+                call.status = r.status_code
+                r.raise_for_status()
+            return parse_festival_rows(r.text)
+        except requests.exceptions.RequestException as e:
             print(f"페이지 {page_num} 크롤링 중 오류 발생: {e}")
+            return []
+
+    if max_pages > 1:
+        with ThreadPoolExecutor(max_workers=min(HTTP_WORKERS, max_pages - 1)) as pool:
+            pages.extend(pool.map(fetch_page, range(2, max_pages + 1)))
+
+    all_festivals = []
+    for rows in pages:
+        if not rows:
+            # 빈 페이지 이후는 존재하지 않는 페이지로 봅니다.
             break
+        all_festivals.extend(rows)
+    return all_festivals
+
+
+def get_film_festivals(engine=None, max_pages=MAX_PAGES):
+    """
+    설정된 엔진으로 영화제 목록을 가져옵니다.
+    http 엔진이 실패하거나 결과가 없으면 Selenium으로 다시 시도합니다.
+    """
+    engine = engine or CRAWLER_ENGINE
+    if engine == "http":
+        festivals = get_film_festivals_with_requests(max_pages)
+        if festivals:
+            return festivals
+        print("http 크롤러 결과가 없어 Selenium으로 다시 시도합니다.")
+    return get_film_festivals_with_selenium(max_pages)
+
+
+def get_film_festivals_with_selenium(max_pages=MAX_PAGES):
+    all_festivals = []
+
+    # 브라우저는 공용 WebDriver 풀에서 빌려 씁니다. (프로필 디렉터리는 드라이버마다 따로)
+    try:
+        with track("kobis", f"{KOBIS_ENDPOINT} (selenium)", cache="miss"), driver_pool.lease() as driver:
+            driver.maximize_window()  # 기존 크롤러와 같은 레이아웃 (돌려줄 때 풀이 창 크기를 되돌림)
+            driver.get(KOBIS_FESTIVAL_URL)
+
+            for page_num in range(1, max_pages + 1):
+                try:
+                    print(f"크롤링 중... 페이지: {page_num}")
+
+                    # 현재 페이지의 HTML 소스를 가져옵니다.
+                    festivals = parse_festival_rows(driver.page_source)
+
+                    if not festivals:
+                        print("더 이상 데이터가 없습니다. 크롤링을 종료합니다.")
+                        break
+
+                    all_festivals.extend(festivals)
+
+                    # 다음 페이지 버튼 클릭 (페이지네이션)
+                    # 페이지 번호가 담긴 a 태그를 찾아서 클릭합니다.
+                    if page_num < max_pages:
+                        next_page_link = driver.find_element(By.LINK_TEXT, str(page_num + 1))
+                        next_page_link.click()
+                        time.sleep(2) # 페이지 로딩을 기다립니다.
+
+                except Exception as e:
+                    print(f"페이지 {page_num} 크롤링 중 오류 발생: {e}")
+                    break
+    except Exception as e:
+        print(f"웹 드라이버 설정 중 오류 발생: {e}")
+        return []
 
-    driver.quit() # 작업이 끝나면 브라우저를 닫습니다.
     return all_festivals
 
 # 함수 테스트
 if __name__ == '__main__':
-    festival_list = get_film_festivals_with_selenium()
+    festival_list = get_film_festivals()
     if festival_list:
         print(f"총 {len(festival_list)}개의 영화제 정보를 성공적으로 가져왔습니다.")
     else:
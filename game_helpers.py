@@ -3,7 +3,11 @@ import random
 from collections import Counter
 from dotenv import load_dotenv
 from flask import jsonify, request, session
-from tmdb_helpers import tmdb_get
+from tmdb_client import tmdb_get
+from tmdb_helpers import tmdb_person_bundle
+from game_movie_pool import movie_pool, discover_game_movies, GAME_SIZE
+from movie_store import movie_store
+from game_state import game_states
 
 load_dotenv()
 
@@ -11,6 +15,7 @@ def get_popular_movies(page=None, country_code=None):
     """
     TMDB API로 인기 영화 목록을 가져오는 함수.
     대한민국 등급 기준 '청소년 관람불가' 영화를 제외합니다.
+    (웹 게임은 미리 채워 둔 movie_pool을 사용하고, 이 함수는 실시간 요청이 필요한 곳에서 씁니다.)
     """
     api_key = os.getenv("TMDB_API_KEY")
     if not api_key:
@@ -19,52 +24,24 @@ def get_popular_movies(page=None, country_code=None):
 
     request_page = page if page else random.randint(1, 10)
 
-    params = {
-        "api_key": api_key,
-        "language": "ko-KR",
-        "sort_by": "popularity.desc",
-        "page": request_page,
-        "include_adult": "false",
-        "certification_country": "KR",
-        "certification.lte": "15"
-    }
-    if country_code:
-        params.setdefault("with_origin_country", country_code)
-
-    data = tmdb_get('/discover/movie', **params).get('results', [])
-        
-    movies = []
-    for movie in data:
-        if movie.get('poster_path') and movie.get('release_date'):
-            movies.append({
-                'id': movie['id'],
-                'title': movie['title'],
-                'poster_path': movie['poster_path'],
-                'release_date': movie['release_date']
-            })
-        if len(movies) == 9:
-            break
+    movies = discover_game_movies(request_page, country_code)[:9]
     
     if len(movies) < 9:
         print(f"경고: 연령 등급 필터링 결과가 부족하여, 필터 없이 다시 요청합니다.")
-        params.pop("certification_country", None)
-        params.pop("certification.lte", None)
-        data_fallback = tmdb_get('/discover/movie', **params).get('results', [])
+        data_fallback = discover_game_movies(request_page, country_code, certified=False)
         
         existing_ids = {m['id'] for m in movies}
         for movie in data_fallback:
             if len(movies) >= 9: break
-            if movie.get('poster_path') and movie.get('release_date') and movie['id'] not in existing_ids:
-                movies.append({ 'id': movie['id'], 'title': movie['title'], 'poster_path': movie['poster_path'], 'release_date': movie['release_date'] })
+            if movie['id'] not in existing_ids:
+                movies.append(movie)
 
     return movies
 
 
 def search_person(name):
     """이름으로 배우/감독 검색"""
-    api_key = os.getenv("TMDB_API_KEY")
     params = {
-        "api_key": api_key,
         "language": "ko-KR",
         "query": name
     }
@@ -75,61 +52,43 @@ def search_person(name):
 
 def get_person_details(person_id):
     """사람 ID로 상세 정보(주요 분야 포함)와 영화 목록 전체를 반환합니다."""
-    api_key = os.getenv("TMDB_API_KEY")
-    
-    params = {
-        "api_key": api_key,
-        "language": "ko-KR",
-        "append_to_response": "movie_credits"
-    }
-
-    return tmdb_get(f"/person/{person_id}", **params)
+    return tmdb_person_bundle(person_id, parts=("movie_credits",), biography_fallback=False)
 
 
 def get_country_from_movies(movie_ids):
-    """다수의 영화 ID를 받아 가장 빈도가 높은 제작 국가 코드를 찾아냅니다."""
-    api_key = os.getenv("TMDB_API_KEY")
-    countries = []
-    for movie_id in movie_ids[:5]:
-        params = {
-            "api_key": api_key,
-            "language": "ko-KR"
-        }
-        data = tmdb_get(f"/movie/{movie_id}", **params)
-        if data.get('production_countries'):
-            countries.append(data['production_countries'][0]['iso_3166_1'])
+    """다수의 영화 ID를 받아 가장 빈도가 높은 제작 국가 코드를 찾아냅니다. (저장소에 없는 영화만 동시에 요청)"""
+    movies = movie_store.get_many(movie_ids[:5])
+    countries = [movies[movie_id]['countries'][0] for movie_id in movie_ids[:5]
+                 if movie_id in movies and movies[movie_id]['countries']]
             
     return Counter(countries).most_common(1)[0][0] if countries else None
 
 def get_detailed_movie_list(movies):
-    """기본 영화 정보 목록을 받아, 각 영화의 상세 정보를 TMDB에서 가져와 반환합니다."""
+    """기본 영화 정보 목록을 받아, 각 영화의 상세 정보를 영화 저장소(없으면 TMDB 동시 요청)에서 가져와 반환합니다."""
     api_key = os.getenv("TMDB_API_KEY")
+    movie_ids = [movie.get('id') for movie in movies if movie.get('id')] if api_key else []
+    records = movie_store.get_many(movie_ids)
     detailed_movies = []
-    for movie in movies:
-        movie_id = movie.get('id')
-        if not movie_id or not api_key: 
-            continue
-        params = {
-            "api_key": api_key,
-            "language": "ko-KR",
-            "append_to_response": "credits"
-        }
-        data = tmdb_get(f"/movie/{movie_id}", **params)
-        director = next((crew['name'] for crew in data.get('credits', {}).get('crew', []) if crew['job'] == 'Director'), "정보 없음")
-        cast = [actor['name'] for actor in data.get('credits', {}).get('cast', [])[:3]]
-        genres = [genre['name'] for genre in data.get('genres', [])]
-        detailed_movies.append({'title': data.get('title'),'poster_path': data.get('poster_path'),'release_date': data.get('release_date'),'overview': data.get('overview', '줄거리 정보가 없습니다.')[:100] + "...",'vote_average': round(data.get('vote_average', 0), 1),'director': director,'cast': cast,'genres': genres})
+    for movie_id in movie_ids:
+        data = records.get(movie_id, {})
+        overview = data.get('overview')
+        if overview is None:
+            overview = '줄거리 정보가 없습니다.'
+        detailed_movies.append({'title': data.get('title'),'poster_path': data.get('poster_path'),'release_date': data.get('release_date'),'overview': overview[:100] + "...",'vote_average': round(data.get('vote_average', 0), 1),'director': data.get('director') or "정보 없음",'cast': data.get('cast', [])[:3],'genres': data.get('genres', [])})
 
     return detailed_movies
 
 # --- 요청 처리 함수 ---
 
 def process_game_movies():
-    """Mode 1 요청 처리 및 세션에 정답 저장"""
-    movies = get_popular_movies()
+    """Mode 1 요청 처리 및 정답 저장 (미리 채워 둔 영화 풀에서 뽑으므로 TMDB 호출 없음)"""
+    movies = movie_pool.sample(GAME_SIZE)
     if movies:
         correct_answers = sorted(movies, key=lambda x: x['release_date'])
-        session['correct_answers'] = correct_answers
+        # 정답은 서버에 저장하고 세션에는 게임 id만 넣습니다.
+        session['game_id'] = game_states.create(correct_answers)
+        # 게임을 하는 동안 결과 화면에 쓸 상세 정보를 미리 가져옵니다.
+        movie_store.prefetch([m['id'] for m in correct_answers])
         return jsonify({"result": "success", "movies": movies})
     else:
         return jsonify({"result": "error", "message": "Failed to load movies"}), 500
@@ -172,18 +131,19 @@ def process_person_game_request(name, real_count=5):
     for movie in real_answers:
         movie['is_real'] = True
     
-    session['correct_answers'] = real_answers
+    session['game_id'] = game_states.create(real_answers)
+    movie_store.prefetch([m['id'] for m in real_answers])
 
-    fake_count = 9 - len(real_answers)
+    fake_count = GAME_SIZE - len(real_answers)
     if fake_count > 0:
-        fake_movies = get_popular_movies(page=random.randint(1, 10), country_code=origin_country)
+        # 오답 영화는 같은 제작 국가의 영화 풀에서 뽑습니다.
         real_movie_ids = {m['id'] for m in real_answers}
-        fake_movies_filtered = [m for m in fake_movies if m['id'] not in real_movie_ids] if fake_movies else []
-        for movie in fake_movies_filtered:
+        fake_movies = movie_pool.sample(fake_count, country_code=origin_country, exclude_ids=real_movie_ids)
+        for movie in fake_movies:
             movie['is_real'] = False
-        game_list = real_answers + fake_movies_filtered[:fake_count]
+        game_list = real_answers + fake_movies
     else:
-        game_list = real_answers[:9]
+        game_list = real_answers[:GAME_SIZE]
 
     random.shuffle(game_list)
     return jsonify({"result": "success", "movies": game_list, "person_name": name, "real_movie_count": len(real_answers)})
@@ -0,0 +1,153 @@
+# game_movie_pool.py
+import os
+import random
+import threading
+import time
+from metrics import ContextThreadPoolExecutor
+
+from background import start_periodic
+from tmdb_client import tmdb_get
+
+GAME_SIZE = 9  # 한 게임에 나오는 영화 수
+GAME_POOL_PAGES = 10  # 기존 게임이 무작위로 고르던 discover 페이지 범위 (1~10)
+# 이 시간이 지나면 백그라운드에서 다시 가져옵니다. (초)
+GAME_POOL_REFRESH = int(os.getenv("GAME_POOL_REFRESH", str(60 * 60)))
+# 앱 시작 시 미리 채워 둘 국가별 풀 (Mode 2 오답 영화용)
+GAME_POOL_COUNTRIES = tuple(c for c in os.getenv("GAME_POOL_COUNTRIES", "KR,US,JP").split(",") if c)
+PAGE_WORKERS = 10
+
+
+def compact_movie(movie: dict):
+    """게임에 필요한 필드만 남깁니다. 포스터나 개봉일이 없으면 None."""
+    if not movie.get('poster_path') or not movie.get('release_date'):
+        return None
+    return {
+        'id': movie['id'],
+        'title': movie['title'],
+        'poster_path': movie['poster_path'],
+        'release_date': movie['release_date'],
+    }
+
+
+def discover_game_movies(page, country_code=None, certified=True) -> list:
+    """
+    인기순 discover 한 페이지를 가져와 포스터/개봉일이 있는 영화만 돌려줍니다.
+    certified이면 대한민국 등급 기준 '청소년 관람불가' 영화를 제외합니다.
+    """
+    params = {
+        "language": "ko-KR",
+        "sort_by": "popularity.desc",
+        "page": page,
+        "include_adult": "false",
+    }
+    if certified:
+        params.update({"certification_country": "KR", "certification.lte": "15"})
+    if country_code:
+        params["with_origin_country"] = country_code
+
+    movies = []
+    for movie in tmdb_get('/discover/movie', **params).get('results', []):
+        movie = compact_movie(movie)
+        if movie:
+            movies.append(movie)
+    return movies
+
+
+class GameMoviePool:
+    """
+    게임용 인기 영화 풀 (전체 1개 + 국가별).
+    - discover 1~GAME_POOL_PAGES 페이지를 동시에 가져와 포스터/개봉일로 미리 거릅니다.
+    - sample()은 메모리의 풀에서 뽑기만 하며, 오래된 풀은 백그라운드에서 갱신합니다.
+    - 아직 한 번도 채우지 않은 국가는 처음 한 번만 그 자리에서 가져옵니다.
+    """
+
+    def __init__(self, pages=GAME_POOL_PAGES, max_age=GAME_POOL_REFRESH):
+        self.pages = pages
+        self.max_age = max_age
+        self._pools = {}  # country_code(전체는 None) -> (가져온 시각, 영화 목록)
+        self._refresh_locks = {}
+        self._lock = threading.Lock()
+
+    def fetch(self, country_code=None) -> list:
+        with ContextThreadPoolExecutor(max_workers=min(PAGE_WORKERS, self.pages)) as pool:
+            pages = list(pool.map(lambda p: discover_game_movies(p, country_code), range(1, self.pages + 1)))
+            movies = {m['id']: m for page in pages for m in page}
+            if len(movies) < GAME_SIZE * 2:
+                # 등급 필터 결과가 부족하면(작은 국가 등) 필터 없이 다시 채웁니다.
+                print(f"경고: 연령 등급 필터링 결과가 부족하여({country_code or '전체'}), 필터 없이 다시 요청합니다.")
+                pages = pool.map(lambda p: discover_game_movies(p, country_code, certified=False),
+                                 range(1, self.pages + 1))
+                for page in pages:
+                    for m in page:
+                        movies.setdefault(m['id'], m)
+        return list(movies.values())
+
+    def _refresh_lock(self, country_code):
+        with self._lock:
+            return self._refresh_locks.setdefault(country_code, threading.Lock())
+
+    def refresh(self, country_code=None, wait=False) -> bool:
+        """
+        풀을 다시 가져옵니다. 같은 풀을 이미 갱신 중이면 wait가 아니면 바로 False를,
+        wait이면 그 갱신이 끝나기를 기다립니다.
+        """
+        lock = self._refresh_lock(country_code)
+        if not lock.acquire(blocking=wait):
+            return False
+        try:
+            if wait and not self.is_stale(country_code):
+                return True  # 기다리는 동안 다른 스레드가 채움
+            movies = self.fetch(country_code)
+            if not movies:
+                # 실패하면 기존 풀을 유지합니다.
+                print(f"게임 영화 풀 갱신 실패: {country_code or '전체'}")
+                return False
+            with self._lock:
+                self._pools[country_code] = (time.time(), movies)
+            return True
+        finally:
+            lock.release()
+
+    def is_refreshing(self, country_code=None) -> bool:
+        return self._refresh_lock(country_code).locked()
+
+    def refresh_async(self, country_code=None):
+        threading.Thread(target=self.refresh, args=(country_code,), name="game-pool-refresh", daemon=True).start()
+
+    def is_stale(self, country_code=None) -> bool:
+        entry = self._pools.get(country_code)
+        return entry is None or time.time() - entry[0] >= self.max_age
+
+    def refresh_stale(self, countries=()):
+        """전체 풀과 countries, 그리고 이미 채운 국가 풀 중 오래된 것을 갱신합니다."""
+        for country_code in dict.fromkeys((None, *countries, *list(self._pools))):
+            if self.is_stale(country_code):
+                self.refresh(country_code)
+
+    def movies(self, country_code=None) -> list:
+        entry = self._pools.get(country_code)
+        if entry is None:
+            self.refresh(country_code, wait=True)
+            entry = self._pools.get(country_code)
+            return entry[1] if entry else []
+        if self.is_stale(country_code) and not self.is_refreshing(country_code):
+            self.refresh_async(country_code)
+        return entry[1]
+
+    def sample(self, k=GAME_SIZE, country_code=None, exclude_ids=()) -> list:
+        """풀에서 k편을 무작위로 뽑아 복사본으로 돌려줍니다. (exclude_ids의 영화는 제외)"""
+        exclude_ids = set(exclude_ids)
+        candidates = [m for m in self.movies(country_code) if m['id'] not in exclude_ids]
+        return [dict(m) for m in random.sample(candidates, min(k, len(candidates)))]
+
+    def __len__(self):
+        return sum(len(movies) for _, movies in self._pools.values())
+
+
+movie_pool = GameMoviePool()
+
+
+def start_game_pool_refresh():
+    """전체/주요 국가 풀을 미리 채우고, 주기적으로 오래된 풀을 갱신하는 백그라운드 작업을 시작합니다."""
+    return start_periodic("game-movie-pool", lambda: movie_pool.refresh_stale(GAME_POOL_COUNTRIES),
+                          interval=10 * 60)
@@ -0,0 +1,172 @@
+# game_state.py
+import abc
+import json
+import os
+import secrets
+import sqlite3
+import threading
+import time
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+# "sqlite"(기본, 여러 워커 프로세스가 공유) 또는 "memory"
+GAME_STATE_BACKEND = os.getenv("GAME_STATE_BACKEND", "sqlite")
+GAME_STATE_PATH = os.getenv("GAME_STATE_PATH", os.path.join(BASE_DIR, ".cache", "game_state.sqlite"))
+# 끝나지 않은 게임의 정답을 보관하는 시간 (초)
+GAME_STATE_TTL = int(os.getenv("GAME_STATE_TTL", str(2 * 60 * 60)))
+PURGE_EVERY = 100  # 게임 N개를 만들 때마다 만료된 게임 정리
+
+
+def new_game_id() -> str:
+    return secrets.token_urlsafe(6)  # 8글자
+
+
+def compact_answers(movies) -> list:
+    """정답 영화 목록을 [영화 id, 개봉일] 쌍으로 줄입니다. (상세 정보는 movie_store에서 조회)"""
+    return [[movie['id'], movie.get('release_date')] for movie in movies]
+
+
+def expand_answers(compact) -> list:
+    return [{'id': movie_id, 'release_date': release_date} for movie_id, release_date in compact]
+
+
+class GameStateStore(abc.ABC):
+    """
+    게임 id → 정답 목록 저장소 인터페이스.
+    쿠키 세션에는 짧은 게임 id만 넣고, 정답은 서버에 ttl 동안 보관합니다.
+    """
+
+    def __init__(self, ttl=GAME_STATE_TTL):
+        self.ttl = ttl
+        self._creates = 0
+
+    def create(self, answers) -> str:
+        """정답 영화 목록을 저장하고 새 게임 id를 반환합니다."""
+        game_id = new_game_id()
+        self._put(game_id, compact_answers(answers), time.time() + self.ttl)
+        self._creates += 1
+        if self._creates % PURGE_EVERY == 0:
+            self.purge()
+        return game_id
+
+    def get(self, game_id):
+        """정답 목록 [{'id', 'release_date'}, ...]. 없거나 만료됐으면 None."""
+        if not game_id:
+            return None
+        compact = self._get(game_id)
+        return expand_answers(compact) if compact is not None else None
+
+    def pop(self, game_id):
+        """정답 목록을 꺼내고 게임을 지웁니다."""
+        answers = self.get(game_id)
+        if answers is not None:
+            self.delete(game_id)
+        return answers
+
+    @abc.abstractmethod
+    def _put(self, game_id, compact, expires_at):
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def _get(self, game_id):
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def delete(self, game_id):
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def purge(self):
+        """만료된 게임을 지웁니다."""
+        raise NotImplementedError
+
+
+class MemoryGameStateStore(GameStateStore):
+    """프로세스 메모리 백엔드 (단일 프로세스 실행용)"""
+
+    def __init__(self, ttl=GAME_STATE_TTL):
+        super().__init__(ttl)
+        self._games = {}  # game_id -> (expires_at, compact)
+        self._lock = threading.Lock()
+
+    def _put(self, game_id, compact, expires_at):
+        with self._lock:
+            self._games[game_id] = (expires_at, compact)
+
+    def _get(self, game_id):
+        with self._lock:
+            entry = self._games.get(game_id)
+        if entry is None or entry[0] <= time.time():
+            return None
+        return entry[1]
+
+    def delete(self, game_id):
+        with self._lock:
+            self._games.pop(game_id, None)
+
+    def purge(self):
+        now = time.time()
+        with self._lock:
+            for game_id in [g for g, (expires_at, _) in self._games.items() if expires_at <= now]:
+                del self._games[game_id]
+
+    def __len__(self):
+        return len(self._games)
+
+
+class SQLiteGameStateStore(GameStateStore):
+    """SQLite 파일 백엔드 (여러 워커 프로세스가 같은 파일을 공유)"""
+
+    def __init__(self, path=GAME_STATE_PATH, ttl=GAME_STATE_TTL):
+        super().__init__(ttl)
+        self.path = path
+        self._local = threading.local()
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS game ("
+                " id TEXT PRIMARY KEY, answers TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            conn.commit()
+            self._local.conn = conn
+        return conn
+
+    def _put(self, game_id, compact, expires_at):
+        conn = self._conn()
+        conn.execute("INSERT OR REPLACE INTO game (id, answers, expires_at) VALUES (?, ?, ?)",
+                     (game_id, json.dumps(compact, separators=(",", ":")), expires_at))
+        conn.commit()
+
+    def _get(self, game_id):
+        row = self._conn().execute(
+            "SELECT answers FROM game WHERE id = ? AND expires_at > ?", (game_id, time.time())
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def delete(self, game_id):
+        conn = self._conn()
+        conn.execute("DELETE FROM game WHERE id = ?", (game_id,))
+        conn.commit()
+
+    def purge(self):
+        conn = self._conn()
+        conn.execute("DELETE FROM game WHERE expires_at <= ?", (time.time(),))
+        conn.commit()
+
+    def __len__(self):
+        return self._conn().execute("SELECT COUNT(*) FROM game").fetchone()[0]
+
+
+def create_game_state_store(backend=GAME_STATE_BACKEND) -> GameStateStore:
+    if backend == "memory":
+        return MemoryGameStateStore()
+    if backend == "sqlite":
+        return SQLiteGameStateStore()
+    raise ValueError(f"알 수 없는 GAME_STATE_BACKEND: {backend}")
+
+
+game_states = create_game_state_store()
@@ -0,0 +1,116 @@
+# image_cache.py
+import hashlib
+import os
+import threading
+
+import requests
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+TMDB_IMAGE_BASE = os.getenv("TMDB_IMAGE_BASE", "https://image.tmdb.org/t/p")
+POSTER_CACHE_DIR = os.getenv("POSTER_CACHE_DIR", os.path.join(BASE_DIR, ".cache", "posters"))
+# 디스크 캐시 최대 크기 (바이트)
+POSTER_CACHE_MAX_BYTES = int(os.getenv("POSTER_CACHE_MAX_BYTES", str(200 * 1024 * 1024)))
+IMAGE_TIMEOUT = 10
+
+
+class ImageDiskCache:
+    """
+    크기 제한이 있는 이미지 파일 캐시.
+    키(예: "w200/abc.jpg")의 sha1을 파일 이름으로 쓰고, 전체 크기가 max_bytes를 넘으면
+    가장 오래 사용하지 않은(mtime 기준) 파일부터 지웁니다. 읽을 때마다 mtime을 갱신합니다.
+    """
+
+    def __init__(self, directory=POSTER_CACHE_DIR, max_bytes=POSTER_CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._size = None  # 첫 쓰기 때 디렉터리를 훑어 계산
+
+    def _path(self, key) -> str:
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, digest[:2], digest)
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return data
+
+    def set(self, key, data: bytes):
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            old_size = os.path.getsize(path) if os.path.exists(path) else 0
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"이미지 캐시 저장 실패: {e}")
+            return
+        with self._lock:
+            if self._size is None:
+                self._size = self._scan()[1]
+            else:
+                self._size += len(data) - old_size
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _scan(self):
+        files, total = [], 0
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                if name.endswith(".tmp"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+        return files, total
+
+    def _evict(self):
+        # 최대 크기의 90%까지 줄여 매번 정리하지 않도록 합니다.
+        files, total = self._scan()
+        target = self.max_bytes * 0.9
+        for _, size, path in sorted(files):
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+        self._size = total
+
+    def size(self) -> int:
+        with self._lock:
+            if self._size is None:
+                self._size = self._scan()[1]
+            return self._size
+
+
+_session = requests.Session()
+poster_cache = ImageDiskCache()
+
+
+def fetch_tmdb_image(size, path, cache=poster_cache):
+    """TMDB 이미지(size 예: "w200", path 예: "/abc.jpg")를 캐시에서, 없으면 내려받아 바이트로 반환합니다."""
+    key = f"{size}{path}"
+    data = cache.get(key)
+    if data is not None:
+        return data
+    response = _session.get(f"{TMDB_IMAGE_BASE}/{size}{path}", timeout=IMAGE_TIMEOUT)
+    response.raise_for_status()
+    data = response.content
+    cache.set(key, data)
+    return data
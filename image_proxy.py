@@ -0,0 +1,102 @@
+# image_proxy.py
+import os
+import re
+import threading
+from contextlib import contextmanager
+from io import BytesIO
+
+from flask import Response, abort, redirect, request
+from PIL import Image, ImageOps
+
+from image_cache import BASE_DIR, TMDB_IMAGE_BASE, ImageDiskCache, fetch_tmdb_image
+
+# 템플릿에서 요청할 수 있는 크기 (TMDB 크기 이름 → 너비 px)
+ALLOWED_SIZES = {"w92": 92, "w154": 154, "w185": 185, "w200": 200, "w342": 342, "w500": 500, "w780": 780}
+# TMDB에서는 이미지마다 이 크기 하나만 받아 두고, 작은 크기는 여기서 줄여 만듭니다.
+SOURCE_SIZE = os.getenv("IMAGE_PROXY_SOURCE_SIZE", "w780")
+VARIANT_CACHE_DIR = os.getenv("IMAGE_VARIANT_CACHE_DIR", os.path.join(BASE_DIR, ".cache", "image_variants"))
+VARIANT_CACHE_MAX_BYTES = int(os.getenv("IMAGE_VARIANT_CACHE_MAX_BYTES", str(100 * 1024 * 1024)))
+WEBP_QUALITY = 80
+JPEG_QUALITY = 85
+# TMDB 이미지 경로는 내용이 바뀌지 않으므로 브라우저가 1년 동안 재사용합니다.
+CACHE_CONTROL = "public, max-age=31536000, immutable"
+# TMDB 이미지 파일 이름만 허용 (경로 이동 방지)
+FILENAME_RE = re.compile(r"^[A-Za-z0-9_-]+\.(jpg|jpeg|png|webp)$")
+
+variant_cache = ImageDiskCache(VARIANT_CACHE_DIR, VARIANT_CACHE_MAX_BYTES)
+_locks = {}  # 캐시 키 -> [Lock, 기다리는 호출 수] (같은 변형을 동시에 만들지 않도록)
+_locks_lock = threading.Lock()
+
+
+def image_url(size, path):
+    """TMDB 이미지 경로(예: "/abc.jpg")를 프록시 URL로 바꿉니다. 경로가 없으면 None."""
+    return f"/img/{size}{path}" if path else None
+
+
+def resize_image(data: bytes, width: int, fmt: str) -> bytes:
+    """이미지를 너비 width 이하로 줄여 fmt("webp" 또는 "jpeg")로 인코딩합니다. (확대하지 않음)"""
+    with Image.open(BytesIO(data)) as img:
+        img.draft("RGB", (width, width * 3))
+        img = ImageOps.exif_transpose(img)
+        if img.width > width:
+            height = max(1, round(img.height * width / img.width))
+            img = img.resize((width, height), Image.BICUBIC, reducing_gap=2.0)
+        if img.mode != "RGB":
+            img = img.convert("RGB")
+        buffer = BytesIO()
+        if fmt == "webp":
+            img.save(buffer, format="WEBP", quality=WEBP_QUALITY, method=4)
+        else:
+            img.save(buffer, format="JPEG", quality=JPEG_QUALITY, optimize=True, progressive=True)
+        return buffer.getvalue()
+
+
+@contextmanager
+def _key_lock(key):
+    """키별 Lock을 잡습니다. 마지막으로 기다리던 호출이 나갈 때만 항목을 지워, 모두 같은 Lock을 씁니다."""
+    with _locks_lock:
+        entry = _locks.setdefault(key, [threading.Lock(), 0])
+        entry[1] += 1
+    try:
+        with entry[0]:
+            yield
+    finally:
+        with _locks_lock:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del _locks[key]
+
+
+def get_variant(size, path, fmt) -> bytes:
+    """크기/포맷별 변형 이미지를 캐시에서, 없으면 원본(SOURCE_SIZE)을 받아 줄여서 반환합니다."""
+    key = f"{size}.{fmt}{path}"
+    data = variant_cache.get(key)
+    if data is not None:
+        return data
+    with _key_lock(key):
+        data = variant_cache.get(key)
+        if data is None:
+            source = fetch_tmdb_image(SOURCE_SIZE, path)
+            data = resize_image(source, ALLOWED_SIZES[size], fmt)
+            variant_cache.set(key, data)
+    return data
+
+
+def serve_tmdb_image(size, filename):
+    """/img/<size>/<filename> 요청 처리. 브라우저가 WebP를 받으면 WebP, 아니면 JPEG로 응답합니다."""
+    if size not in ALLOWED_SIZES or not FILENAME_RE.match(filename):
+        abort(404)
+    path = f"/{filename}"
+    fmt = "webp" if "image/webp" in request.headers.get("Accept", "") else "jpeg"
+    try:
+        data = get_variant(size, path, fmt)
+    except Exception as e:
+        print(f"이미지 프록시 실패 ({size}{path}): {e}")
+        # 프록시가 실패하면 TMDB 이미지로 바로 보냅니다.
+        return redirect(f"{TMDB_IMAGE_BASE}/{size}{path}")
+
+    response = Response(data, mimetype=f"image/{fmt}")
+    response.headers["Cache-Control"] = CACHE_CONTROL
+    response.headers["Vary"] = "Accept"
+    response.add_etag()
+    return response.make_conditional(request)
@@ -0,0 +1,166 @@
+# metrics.py
+import contextvars
+import re
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+# 지연 시간 히스토그램 구간 (초)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+_ID_SEGMENT = re.compile(r"/\d+(?=/|$)")
+
+# 현재 요청의 외부 호출 누적 {서비스: [호출 수, 합계 초]} (요청 밖에서는 None)
+_request_timings = contextvars.ContextVar("request_timings", default=None)
+
+
+def endpoint_template(path: str) -> str:
+    """경로의 숫자 id를 {id}로 바꿔 라벨 수가 늘어나지 않게 합니다. 예: /person/287/movie_credits → /person/{id}/movie_credits"""
+    return _ID_SEGMENT.sub("/{id}", path)
+
+
+class UpstreamMetrics:
+    """
+    외부 호출(TMDB, Wikidata, 네이트, Rekognition, KOBIS) 지표 저장소.
+    (서비스, 엔드포인트, 상태, 캐시) 별 호출 수와 (서비스, 엔드포인트, 캐시) 별 지연 시간 히스토그램을 보관하고
+    Prometheus 텍스트 형식으로 내보냅니다.
+    cache는 "hit"(캐시에서 응답), "miss"(캐시에 없어 호출), "none"(캐시 없는 호출) 중 하나입니다.
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._calls = defaultdict(int)  # (service, endpoint, status, cache) -> 호출 수
+        self._latency = {}  # (service, endpoint, cache) -> [버킷별 누적 수..., 합계 초, 전체 수]
+
+    def observe(self, service, endpoint, seconds, status="ok", cache="none"):
+        status = str(status)
+        with self._lock:
+            self._calls[(service, endpoint, status, cache)] += 1
+            histogram = self._latency.get((service, endpoint, cache))
+            if histogram is None:
+                histogram = self._latency[(service, endpoint, cache)] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    histogram[i] += 1
+            histogram[-2] += seconds
+            histogram[-1] += 1
+
+        # 요청 처리 중이면 Server-Timing용으로도 누적합니다. (캐시 적중은 외부 호출이 아니므로 제외)
+        timings = _request_timings.get()
+        if timings is not None and cache != "hit":
+            with timings["lock"]:
+                entry = timings["services"].setdefault(service, [0, 0.0])
+                entry[0] += 1
+                entry[1] += seconds
+
+    def render(self) -> str:
+        """Prometheus 텍스트 형식 (text/plain; version=0.0.4)"""
+        with self._lock:
+            calls = sorted(self._calls.items())
+            latency = sorted((key, list(values)) for key, values in self._latency.items())
+
+        lines = [
+            "# HELP upstream_requests_total Upstream calls by service, endpoint, status and cache result.",
+            "# TYPE upstream_requests_total counter",
+        ]
+        for (service, endpoint, status, cache), count in calls:
+            labels = _labels(service=service, endpoint=endpoint, status=status, cache=cache)
+            lines.append(f"upstream_requests_total{{{labels}}} {count}")
+
+        lines += [
+            "# HELP upstream_request_duration_seconds Upstream call latency in seconds.",
+            "# TYPE upstream_request_duration_seconds histogram",
+        ]
+        for (service, endpoint, cache), histogram in latency:
+            labels = _labels(service=service, endpoint=endpoint, cache=cache)
+            for bound, count in zip(self.buckets, histogram):
+                lines.append(f'upstream_request_duration_seconds_bucket{{{labels},le="{bound}"}} {count}')
+            lines.append(f'upstream_request_duration_seconds_bucket{{{labels},le="+Inf"}} {histogram[-1]}')
+            lines.append(f"upstream_request_duration_seconds_sum{{{labels}}} {histogram[-2]:.6f}")
+            lines.append(f"upstream_request_duration_seconds_count{{{labels}}} {histogram[-1]}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        with self._lock:
+            self._calls.clear()
+            self._latency.clear()
+
+
+def _labels(**labels) -> str:
+    def escape(value):
+        return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+    return ",".join(f'{name}="{escape(value)}"' for name, value in labels.items())
+
+
+upstream_metrics = UpstreamMetrics()
+
+
+def observe(service, endpoint, seconds, status="ok", cache="none"):
+    upstream_metrics.observe(service, endpoint, seconds, status, cache)
+
+
+class _Call:
+    status = "ok"
+
+
+@contextmanager
+def track(service, endpoint, cache="none"):
+    """
+    with 블록을 외부 호출 하나로 기록합니다. 블록 안에서 call.status를 HTTP 상태 코드 등으로 바꿀 수 있고,
+    예외가 나면 status가 "ok"인 경우 "error"로 기록합니다.
+
+        with track("wikidata", "wbgetentities", cache="miss") as call:
+            response = requests.get(...)
+            call.status = response.status_code
+    """
+    call = _Call()
+    start = time.perf_counter()
+    try:
+        yield call
+    except BaseException:
+        if call.status == "ok":
+            call.status = "error"
+        raise
+    finally:
+        observe(service, endpoint, time.perf_counter() - start, call.status, cache)
+
+
+# ---------------- Server-Timing ----------------
+
+def start_request():
+    """요청 시작 시 호출: 이 요청(과 ContextThreadPoolExecutor로 넘긴 작업)의 외부 호출을 모읍니다."""
+    _request_timings.set({"start": time.perf_counter(), "services": {}, "lock": threading.Lock()})
+
+
+def server_timing_header():
+    """
+    Server-Timing 헤더 값. 서비스별 외부 호출 시간 합계(동시 호출이면 전체 시간보다 클 수 있음)와 호출 수,
+    그리고 요청 전체 시간(total)을 담습니다. 요청 밖이면 None.
+    """
+    timings = _request_timings.get()
+    if timings is None:
+        return None
+    with timings["lock"]:
+        services = sorted(timings["services"].items())
+    parts = [f'{service};dur={seconds * 1000:.1f};desc="{count} call{"s" if count != 1 else ""}"'
+             for service, (count, seconds) in services]
+    parts.append(f"total;dur={(time.perf_counter() - timings['start']) * 1000:.1f}")
+    return ", ".join(parts)
+
+
+def submit_detached(executor, fn, *args, **kwargs):
+    """
+    요청 컨텍스트 없이(빈 contextvars.Context) 작업을 제출합니다.
+    응답을 보낸 뒤에도 이어질 수 있는 백그라운드 작업이 끝난 요청의 Server-Timing에 더해지지 않게 합니다.
+    """
+    return executor.submit(contextvars.Context().run, fn, *args, **kwargs)
+
+
+class ContextThreadPoolExecutor(ThreadPoolExecutor):
+    """제출한 스레드의 contextvars(요청별 Server-Timing 누적 포함)를 작업 스레드로 넘기는 ThreadPoolExecutor"""
+
+    def submit(self, fn, /, *args, **kwargs):
+        context = contextvars.copy_context()
+        return super().submit(context.run, fn, *args, **kwargs)
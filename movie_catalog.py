@@ -0,0 +1,225 @@
+# movie_catalog.py
+import math
+import os
+import threading
+import time
+import numpy as np
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CATALOG_PATH = os.getenv("MOVIE_CATALOG_PATH", os.path.join(BASE_DIR, ".cache", "movie_catalog.npz"))
+# 스냅샷 갱신 주기 / 이보다 오래된 스냅샷은 사용하지 않음 (초)
+REFRESH_INTERVAL = int(os.getenv("MOVIE_CATALOG_REFRESH", str(12 * 60 * 60)))
+MAX_AGE = 2 * REFRESH_INTERVAL
+
+# TMDB 영화 장르 ID -> 비트 위치 (genre_mask 컬럼)
+GENRE_BITS = {gid: bit for bit, gid in enumerate([
+    28, 12, 16, 35, 80, 99, 18, 10751, 14, 36,
+    27, 10402, 9648, 10749, 878, 10770, 53, 10752, 37,
+])}
+
+# recommend_movie.build_release_date_filter와 같은 개봉일 구간 (gte, lte)
+RELEASE_WINDOWS = {
+    1: (None, "1999-12-31"),
+    2: ("2000-01-01", "2010-12-31"),
+    3: ("2010-01-01", "2020-12-31"),
+    4: ("2021-01-01", None),
+}
+
+# 스냅샷 파일에서 컬럼이 아닌 항목
+SNAPSHOT_META = ("built_at", "slices", "complete_slices")
+
+STR_COLUMNS = ["title", "overview", "poster_path", "backdrop_path",
+               "release_date", "original_language", "genre_ids"]
+
+
+def genre_mask(genre_ids) -> int:
+    mask = 0
+    for gid in genre_ids or []:
+        bit = GENRE_BITS.get(int(gid))
+        if bit is not None:
+            mask |= 1 << bit
+    return mask
+
+
+def _slice_name(slice_) -> str:
+    lang, runtime_type = slice_
+    return f"{lang}:{runtime_type}"
+
+
+def _parse_slice(name) -> tuple:
+    lang, runtime_type = str(name).rsplit(":", 1)
+    return lang, int(runtime_type)
+
+
+class MovieCatalog:
+    """
+    discover 결과를 (언어 x 상영시간 구간) 단위로 모아 둔 컬럼형 스냅샷.
+    각 컬럼은 NumPy 배열이며, 추천 필터는 불리언 마스크 연산으로 처리합니다.
+    - 등급(KR 15세 이하)은 스냅샷을 만들 때 discover 파라미터로 이미 걸러져 있습니다.
+    - genre_ids는 원래 순서를 유지하기 위해 "28,12" 형태의 문자열로도 저장합니다.
+    - 구간마다 인기순 상위 몇 페이지만 보관하므로, 조건에 맞는 영화가 그 안에서 충분히 나올 때만
+      답합니다. (query 참고)
+    """
+
+    def __init__(self, path=CATALOG_PATH):
+        self.path = path
+        self.columns = None
+        self.built_at = 0.0
+        # 스냅샷에 담긴 (언어, 상영시간 구간) 구간과, 그중 끝 페이지까지 모두 담긴 구간
+        self.slices = set()
+        self.complete_slices = set()
+        self._lock = threading.Lock()
+
+    # --- 스냅샷 생성 / 저장 ---
+
+    def replace(self, rows, slices=(), complete_slices=()):
+        """
+        rows: (runtime_type, discover 결과 dict) 목록으로 스냅샷을 교체하고 파일로 저장합니다.
+        slices: 가져온 (언어, runtime_type) 구간, complete_slices: 그중 total_pages까지 모두 가져온 구간
+        """
+        rows = [(rt, m) for rt, m in rows if m.get("id") is not None]
+        columns = {
+            "id": np.array([m["id"] for _, m in rows], dtype=np.int64),
+            "runtime_type": np.array([rt for rt, _ in rows], dtype=np.int8),
+            "vote_average": np.array([float(m.get("vote_average") or 0) for _, m in rows], dtype=np.float64),
+            "vote_count": np.array([int(m.get("vote_count") or 0) for _, m in rows], dtype=np.int64),
+            "popularity": np.array([float(m.get("popularity") or 0) for _, m in rows], dtype=np.float64),
+            "genre_mask": np.array([genre_mask(m.get("genre_ids")) for _, m in rows], dtype=np.int64),
+        }
+        for col in STR_COLUMNS:
+            if col == "genre_ids":
+                values = [",".join(str(g) for g in (m.get("genre_ids") or [])) for _, m in rows]
+            else:
+                values = [m.get(col) or "" for _, m in rows]
+            columns[col] = np.array(values, dtype=str)
+        with self._lock:
+            self.columns = columns
+            self.built_at = time.time()
+            self.slices = set(slices)
+            self.complete_slices = set(complete_slices)
+        self.save()
+
+    def save(self):
+        with self._lock:
+            if self.columns is None:
+                return
+            columns, built_at = self.columns, self.built_at
+            slices = np.array([_slice_name(sl) for sl in sorted(self.slices)], dtype=str)
+            complete = np.array([_slice_name(sl) for sl in sorted(self.complete_slices)], dtype=str)
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez_compressed(f, built_at=np.array(built_at), slices=slices, complete_slices=complete, **columns)
+        os.replace(tmp_path, self.path)
+
+    def load(self) -> bool:
+        """저장된 스냅샷을 불러옵니다. 파일이 없거나 깨졌으면 False."""
+        if not os.path.exists(self.path):
+            return False
+        try:
+            with np.load(self.path, allow_pickle=False) as data:
+                columns = {k: data[k] for k in data.files if k not in SNAPSHOT_META}
+                built_at = float(data["built_at"])
+                # 이전 형식의 스냅샷에는 구간 정보가 없어 query가 항상 None을 돌려줍니다. (다음 갱신 때 교체)
+                slices = {_parse_slice(v) for v in data["slices"]} if "slices" in data.files else set()
+                complete = {_parse_slice(v) for v in data["complete_slices"]} if "complete_slices" in data.files else set()
+        except Exception as e:
+            print(f"영화 카탈로그 스냅샷 로드 실패: {e}")
+            return False
+        with self._lock:
+            self.columns = columns
+            self.built_at = built_at
+            self.slices = slices
+            self.complete_slices = complete
+        return True
+
+    def is_fresh(self) -> bool:
+        return self.columns is not None and time.time() - self.built_at < MAX_AGE
+
+    def __len__(self):
+        return 0 if self.columns is None else len(self.columns["id"])
+
+    # --- 조회 ---
+
+    def query(self, genre_id=None, genre_or=False, runtime_type=1, release_year_type_list=(0,),
+              rating=None, countries=("ko",), sample_size=21, pool_target=60):
+        """
+        추천 조건을 불리언 마스크로 평가해 DataFrame을 돌려줍니다.
+        스냅샷이 없거나 오래됐거나, 스냅샷에 없는 언어/구간이거나, 스냅샷으로 답할 수 없는 조건이거나,
+        결과가 sample_size보다 적으면 None(캐시 미스)을 반환합니다.
+
+        실시간 경로는 조건을 discover에 걸어 인기순 상위 약 pool_target개 후보에서 뽑습니다.
+        스냅샷은 구간마다 인기순 상위 페이지만 담고 있지만, 그 안에서 조건에 맞는 영화는
+        전체 조건 결과의 인기순 앞부분과 같습니다. 그래서 언어마다 인기순 상위
+        ceil(pool_target / 언어 수)개를 후보로 쓰고, 끝 페이지까지 담지 못한 구간에서 그만큼
+        나오지 않으면(조건이 좁아 스냅샷 밖의 덜 인기 있는 영화가 후보가 될 때) None을 반환합니다.
+        """
+        with self._lock:
+            if not self.is_fresh() or "popularity" not in self.columns:
+                return None
+            c = self.columns
+            slices, complete_slices = self.slices, self.complete_slices
+        countries = list(dict.fromkeys(countries))
+        if not countries or any((lang, runtime_type) not in slices for lang in countries):
+            return None
+
+        mask = c["runtime_type"] == runtime_type
+        mask &= np.isin(c["original_language"], list(countries))
+        if rating:
+            mask &= c["vote_average"] >= float(rating)
+
+        if genre_id:
+            ids = [int(g) for g in str(genre_id).replace("|", ",").split(",") if g]
+            if any(g not in GENRE_BITS for g in ids):
+                return None
+            want = genre_mask(ids)
+            if genre_or:
+                mask &= (c["genre_mask"] & want) != 0
+            else:
+                mask &= (c["genre_mask"] & want) == want
+
+        year_types = list(release_year_type_list)
+        if 0 not in year_types and len(year_types) != len(RELEASE_WINDOWS):
+            dates = c["release_date"]
+            date_mask = np.zeros(len(dates), dtype=bool)
+            for year_type in year_types:
+                gte, lte = RELEASE_WINDOWS.get(year_type, (None, None))
+                window = dates != ""
+                if gte:
+                    window &= dates >= gte
+                if lte:
+                    window &= dates <= lte
+                date_mask |= window
+            mask &= date_mask
+
+        # 언어별로 인기순 상위 quota개를 후보로 모읍니다.
+        quota = math.ceil(pool_target / len(countries))
+        pools = []
+        for lang in countries:
+            lang_idx = np.flatnonzero(mask & (c["original_language"] == lang))
+            if len(lang_idx) < quota and (lang, runtime_type) not in complete_slices:
+                return None
+            lang_idx = lang_idx[np.argsort(-c["popularity"][lang_idx], kind="stable")]
+            pools.append(lang_idx[:quota])
+        idx = np.concatenate(pools)
+        # 같은 영화가 여러 언어/구간에 걸쳐 있을 수 있으므로 id 기준으로 한 번 더 고유화
+        _, first = np.unique(c["id"][idx], return_index=True)
+        idx = idx[np.sort(first)]
+        if len(idx) < sample_size:
+            return None
+        idx = np.random.choice(idx, sample_size, replace=False)
+
+        df = pd.DataFrame({
+            "id": c["id"][idx],
+            "title": c["title"][idx],
+            "overview": c["overview"][idx],
+            "poster_path": c["poster_path"][idx],
+            "backdrop_path": c["backdrop_path"][idx],
+            "release_date": c["release_date"][idx],
+            "original_language": c["original_language"][idx],
+            "vote_average": c["vote_average"][idx],
+            "vote_count": c["vote_count"][idx],
+            "genre_ids": [[int(g) for g in s.split(",") if g] for s in c["genre_ids"][idx]],
+        })
+        return df
@@ -1,17 +1,81 @@
 import sys
 import random
 import time
-import requests
-from PyQt5.QtCore import Qt, QSize
+from concurrent.futures import ThreadPoolExecutor
+from PyQt5.QtCore import Qt, QSize, QObject, QRunnable, QThreadPool, pyqtSignal
 from PyQt5.QtWidgets import QApplication, QWidget, QPushButton, QLabel, QVBoxLayout, QGridLayout
 from PyQt5.QtGui import QFont, QPixmap, QIcon
 from game_helpers import get_popular_movies
+from image_cache import fetch_tmdb_image
+
+POSTER_SIZE = "w200"
+POSTER_WORKERS = 9
+
+
+class LoaderSignals(QObject):
+    """백그라운드 작업 → GUI 스레드 신호"""
+    poster_loaded = pyqtSignal(int, int, bytes)   # round_id, 버튼 번호, 이미지 바이트
+    poster_failed = pyqtSignal(int, int, str)     # round_id, 버튼 번호, 오류 메시지
+    movies_loaded = pyqtSignal(object)            # 영화 목록 (실패 시 None)
+
+
+class PosterLoader(QRunnable):
+    """포스터 한 장을 (디스크 캐시 또는 TMDB에서) 가져옵니다."""
+    def __init__(self, signals, round_id, index, poster_path):
+        super().__init__()
+        self.signals = signals
+        self.round_id = round_id
+        self.index = index
+        self.poster_path = poster_path
+
+    def run(self):
+        try:
+            data = fetch_tmdb_image(POSTER_SIZE, self.poster_path)
+        except Exception as e:
+            self.signals.poster_failed.emit(self.round_id, self.index, str(e))
+            return
+        self.signals.poster_loaded.emit(self.round_id, self.index, data)
+
+
+class RoundLoader(QRunnable):
+    """다음 라운드의 영화 목록을 가져오고, 포스터를 디스크 캐시에 미리 받아 둡니다."""
+    def __init__(self, signals):
+        super().__init__()
+        self.signals = signals
+
+    def run(self):
+        try:
+            movies = get_popular_movies()
+        except Exception as e:
+            print(f"영화 목록을 가져오지 못했습니다: {e}")
+            movies = None
+        if movies:
+            def warm(movie):
+                try:
+                    fetch_tmdb_image(POSTER_SIZE, movie['poster_path'])
+                except Exception as e:
+                    print(f"포스터 미리 받기 실패: {e}")
+            with ThreadPoolExecutor(max_workers=POSTER_WORKERS) as pool:
+                list(pool.map(warm, movies))
+        self.signals.movies_loaded.emit(movies)
+
 
 class MovieGameApp(QWidget):
     """PyQt5를 사용한 영화 퀴즈 게임 메인 클래스"""
     def __init__(self):
         super().__init__()
+        self.round_id = 0
+        self.next_movies = None       # 미리 받아 둔 다음 라운드
+        self.waiting_for_round = False
+        self.prefetching = False
+        self.pool = QThreadPool.globalInstance()
+        self.pool.setMaxThreadCount(max(self.pool.maxThreadCount(), POSTER_WORKERS + 1))
+        self.signals = LoaderSignals()
+        self.signals.poster_loaded.connect(self.poster_loaded)
+        self.signals.poster_failed.connect(self.poster_failed)
+        self.signals.movies_loaded.connect(self.movies_loaded)
         self.initUI()
+        self.prefetch_next_round()
 
     def initUI(self):
         """UI의 초기 레이아웃과 위젯을 설정합니다."""
@@ -54,38 +118,74 @@ class MovieGameApp(QWidget):
             if hasattr(btn, 'movie_data'):
                 delattr(btn, 'movie_data')
 
+    def prefetch_next_round(self):
+        """현재 라운드를 하는 동안 다음 라운드의 영화와 포스터를 백그라운드에서 받아 둡니다."""
+        self.next_movies = None
+        self.prefetching = True
+        self.pool.start(RoundLoader(self.signals))
+
+    def movies_loaded(self, movies):
+        self.prefetching = False
+        self.next_movies = movies
+        if self.waiting_for_round:
+            self.waiting_for_round = False
+            self.begin_round()
+
     def game_start(self):
-        """GAME START 버튼을 누르면 호출되는 함수"""
+        """GAME START 버튼을 누르면 호출되는 함수 (GUI 스레드에서 네트워크를 기다리지 않음)"""
+        self.btn_start.setEnabled(False)
+        if self.next_movies:
+            self.begin_round()
+            return
         self.ql_info.setText("Loading Movies...")
-        QApplication.processEvents()
+        self.waiting_for_round = True
+        if not self.prefetching:
+            # 이전 미리 받기가 실패했으면 다시 요청합니다.
+            self.prefetch_next_round()
 
-        movies = get_popular_movies()
+    def begin_round(self):
+        movies, self.next_movies = self.next_movies, None
+        self.btn_start.setEnabled(True)
         if not movies:
             self.ql_info.setText("Failed to load movies!")
+            self.prefetch_next_round()
             return
 
+        self.disable_all_buttons()
+        self.round_id += 1
         self.correct_sequence = sorted(movies, key=lambda x: x['release_date'])
         random.shuffle(movies)
         self.current_step = 0
+        # 기록은 기존처럼 라운드를 보여준 때부터 잽니다. (포스터 로딩을 기다리지 않음)
         self.start_time = time.time()
         self.ql_info.setText(f"Click the Oldest Movie! ({self.current_step + 1}/9)")
 
-        for btn, movie in zip(self.b_list, movies):
-            poster_url = f"https://image.tmdb.org/t/p/w200{movie['poster_path']}"
-            pixmap = QPixmap()
-            try:
-                response = requests.get(poster_url, stream=True)
-                response.raise_for_status()
-                image_data = response.content
-                pixmap.loadFromData(image_data)
-                btn.setIcon(QIcon(pixmap))
-                btn.setIconSize(QSize(120, 180))
-                btn.setEnabled(True)
-                btn.movie_data = movie
-            except requests.exceptions.RequestException as e:
-                print(f"이미지 다운로드에 실패했습니다: {e}")
-                btn.setText("Image\nError")
-                btn.setEnabled(False)
+        # 포스터는 백그라운드에서 동시에 받고, 도착하는 대로 버튼에 표시합니다.
+        for index, (btn, movie) in enumerate(zip(self.b_list, movies)):
+            btn.setText("Loading...")
+            btn.movie_data = movie
+            self.pool.start(PosterLoader(self.signals, self.round_id, index, movie['poster_path']))
+
+        self.prefetch_next_round()
+
+    def poster_loaded(self, round_id, index, image_data):
+        if round_id != self.round_id:
+            return  # 이전 라운드의 응답
+        btn = self.b_list[index]
+        pixmap = QPixmap()
+        pixmap.loadFromData(image_data)
+        btn.setText("")
+        btn.setIcon(QIcon(pixmap))
+        btn.setIconSize(QSize(120, 180))
+        btn.setEnabled(True)
+
+    def poster_failed(self, round_id, index, message):
+        if round_id != self.round_id:
+            return
+        print(f"이미지 다운로드에 실패했습니다: {message}")
+        btn = self.b_list[index]
+        btn.setText("Image\nError")
+        btn.setEnabled(False)
 
     def btn_clicked(self):
         """영화 포스터 버튼이 클릭되었을 때 호출되는 함수"""
@@ -0,0 +1,184 @@
+# movie_store.py
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import wait
+
+from metrics import ContextThreadPoolExecutor, submit_detached
+from tmdb_client import tmdb_get
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+MOVIE_STORE_PATH = os.getenv("MOVIE_STORE_PATH", os.path.join(BASE_DIR, ".cache", "movie_store.sqlite"))
+# 이 기간보다 오래된 항목은 다음에 요청될 때 다시 가져옵니다. (초)
+MOVIE_STORE_MAX_AGE = int(os.getenv("MOVIE_STORE_MAX_AGE", str(14 * 24 * 60 * 60)))
+FETCH_WORKERS = int(os.getenv("MOVIE_STORE_WORKERS", "8"))
+CAST_SIZE = 5
+
+
+def movie_record(data: dict) -> dict:
+    """/movie/{id}?append_to_response=credits 응답에서 저장할 필드만 추립니다."""
+    credits = data.get('credits', {})
+    return {
+        'id': data['id'],
+        'title': data.get('title'),
+        'poster_path': data.get('poster_path'),
+        'release_date': data.get('release_date'),
+        'overview': data.get('overview'),
+        'vote_average': data.get('vote_average', 0),
+        'runtime': data.get('runtime'),
+        'countries': [c['iso_3166_1'] for c in data.get('production_countries', [])],
+        'director': next((crew['name'] for crew in credits.get('crew', []) if crew.get('job') == 'Director'), None),
+        'cast': [actor['name'] for actor in credits.get('cast', [])[:CAST_SIZE]],
+        'genres': [genre['name'] for genre in data.get('genres', [])],
+    }
+
+
+def fetch_movie(movie_id):
+    data = tmdb_get(f"/movie/{movie_id}", language="ko-KR", append_to_response="credits")
+    return movie_record(data) if data.get('id') else None
+
+
+class MovieStore:
+    """
+    TMDB 영화 id를 키로 하는 메타데이터 저장소 (SQLite 파일 + 메모리 사본).
+    제작 국가, 상영시간, 감독, 장르와 결과 화면에 필요한 필드를 보관하며,
+    없는 영화는 get_many()가 한 번에 동시에 가져와 채웁니다.
+    prefetch()는 기다리지 않고 백그라운드에서 미리 채우며, 같은 영화를 가져오는 중이면
+    새로 요청하지 않고 그 요청이 끝나기를 기다립니다.
+    """
+
+    def __init__(self, path=MOVIE_STORE_PATH, max_age=MOVIE_STORE_MAX_AGE, fetch=fetch_movie):
+        self.path = path
+        self.max_age = max_age
+        self.fetch = fetch
+        self._movies = {}  # id -> (updated_at, record)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._loaded = False
+        self._inflight = {}  # id -> Future
+        self._executor = ContextThreadPoolExecutor(max_workers=FETCH_WORKERS, thread_name_prefix="movie-store")
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS movie ("
+                " id INTEGER PRIMARY KEY, record TEXT NOT NULL, updated_at REAL NOT NULL)"
+            )
+            conn.commit()
+            self._local.conn = conn
+        return conn
+
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            try:
+                rows = self._conn().execute("SELECT id, record, updated_at FROM movie").fetchall()
+            except sqlite3.Error as e:
+                print(f"영화 저장소 로드 실패: {e}")
+                rows = []
+            for movie_id, record, updated_at in rows:
+                self._movies[movie_id] = (updated_at, json.loads(record))
+            self._loaded = True
+
+    def get(self, movie_id):
+        """저장된 영화 정보 (없으면 None, 오래된 항목도 그대로 반환)"""
+        self._ensure_loaded()
+        entry = self._movies.get(movie_id)
+        return entry[1] if entry else None
+
+    def put_many(self, records):
+        now = time.time()
+        with self._lock:
+            for record in records:
+                self._movies[record['id']] = (now, record)
+        try:
+            conn = self._conn()
+            conn.executemany(
+                "INSERT OR REPLACE INTO movie (id, record, updated_at) VALUES (?, ?, ?)",
+                [(r['id'], json.dumps(r, ensure_ascii=False), now) for r in records],
+            )
+            conn.commit()
+        except sqlite3.Error as e:
+            print(f"영화 저장소 저장 실패: {e}")
+
+    def missing_ids(self, movie_ids):
+        """저장되지 않았거나 max_age보다 오래된 id 목록 (중복 제거, 순서 유지)"""
+        self._ensure_loaded()
+        cutoff = time.time() - self.max_age
+        return [movie_id for movie_id in dict.fromkeys(movie_ids)
+                if movie_id not in self._movies or self._movies[movie_id][0] < cutoff]
+
+    def _fetch_one(self, movie_id):
+        try:
+            record = self.fetch(movie_id)
+            if record:
+                self.put_many([record])
+            return record
+        finally:
+            with self._lock:
+                self._inflight.pop(movie_id, None)
+
+    def _submit(self, movie_ids, detached=False) -> list:
+        """
+        가져오는 중이 아닌 영화만 새로 요청하고, 모든 id의 Future 목록을 반환합니다.
+        detached면 요청 컨텍스트 없이 제출합니다. (기다리지 않는 prefetch가 Server-Timing에 섞이지 않도록)
+        """
+        futures = []
+        with self._lock:
+            for movie_id in movie_ids:
+                future = self._inflight.get(movie_id)
+                if future is None:
+                    if detached:
+                        future = submit_detached(self._executor, self._fetch_one, movie_id)
+                    else:
+                        future = self._executor.submit(self._fetch_one, movie_id)
+                    self._inflight[movie_id] = future
+                futures.append(future)
+        return futures
+
+    def fill(self, movie_ids) -> int:
+        """없는/오래된 영화를 동시에 가져와 저장합니다. 가져온 수를 반환합니다."""
+        futures = self._submit(self.missing_ids(movie_ids))
+        if not futures:
+            return 0
+        wait(futures)
+        return sum(1 for f in futures if f.exception() is None and f.result())
+
+    def prefetch(self, movie_ids):
+        """없는/오래된 영화를 백그라운드에서 미리 가져옵니다. (기다리지 않음)"""
+        self._submit(self.missing_ids(movie_ids), detached=True)
+
+    def get_many(self, movie_ids, fetch_missing=True) -> dict:
+        """{id: 영화 정보}. fetch_missing이면 없는 영화를 먼저 동시에 가져옵니다."""
+        if fetch_missing:
+            self.fill(movie_ids)
+        self._ensure_loaded()
+        return {movie_id: self._movies[movie_id][1] for movie_id in movie_ids if movie_id in self._movies}
+
+    def clear(self):
+        """저장된 영화를 모두 지웁니다. (메모리 사본 + SQLite)"""
+        with self._lock:
+            self._movies.clear()
+            self._loaded = True
+        try:
+            conn = self._conn()
+            conn.execute("DELETE FROM movie")
+            conn.commit()
+        except sqlite3.Error as e:
+            print(f"영화 저장소 비우기 실패: {e}")
+
+    def __len__(self):
+        self._ensure_loaded()
+        return len(self._movies)
+
+
+movie_store = MovieStore()
@@ -0,0 +1,134 @@
+# news_lookup.py
+import math
+import os
+import re
+import threading
+import time
+import unicodedata
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from cache_store import LRUCache
+from metrics import observe, submit_detached
+
+# 뉴스 결과를 새로 가져오지 않고 그대로 쓰는 시간 (초)
+NEWS_TTL = int(os.getenv("NEWS_CACHE_TTL", str(60 * 60)))
+# 결과가 없을 때(검색 실패 포함)는 짧게만 캐시합니다. (초)
+NEWS_EMPTY_TTL = 5 * 60
+# 만료된 결과도 이 시간까지는 시간 초과 시 대신 돌려줍니다. (초)
+NEWS_STALE_TTL = 7 * 24 * 60 * 60
+# 검색 한 건을 기다리는 최대 시간 (초)
+NEWS_DEADLINE = float(os.getenv("NEWS_LOOKUP_DEADLINE", "8"))
+NEWS_WORKERS = int(os.getenv("NEWS_WORKERS", "3"))
+NEWS_CACHE_SIZE = 512
+
+
+def normalize_name(name: str) -> str:
+    """캐시 키용 이름 정규화 (유니코드 정규화, 따옴표 제거, 공백 정리, 대소문자 무시)"""
+    name = unicodedata.normalize("NFKC", name or "")
+    name = name.replace('"', " ").replace("'", " ")
+    return re.sub(r"\s+", " ", name).strip().casefold()
+
+
+class NewsLookup:
+    """
+    유명인 이름별 뉴스 검색 서비스.
+    - 정규화한 이름별로 결과를 TTL 동안 캐시합니다.
+    - 여러 이름을 workers개씩 동시에 검색하고, 각 검색은 시작한 때부터 deadline초까지만 기다립니다.
+      (작업자보다 이름이 많아 줄을 선 검색도 자기 차례가 온 뒤 deadline초를 받습니다.)
+    - 시간 안에 끝나지 않으면 이전 결과(만료됐더라도) 또는 빈 목록을 돌려주고,
+      검색은 백그라운드에서 계속 진행돼 다음 요청부터 캐시로 응답합니다.
+    - 같은 이름에 대한 동시 검색은 하나로 합칩니다.
+    search(name)은 기사 dict 목록을 돌려주는 함수입니다.
+    """
+
+    def __init__(self, search, ttl=NEWS_TTL, deadline=NEWS_DEADLINE, workers=NEWS_WORKERS,
+                 cache_size=NEWS_CACHE_SIZE):
+        self.search = search
+        self.ttl = ttl
+        self.deadline = deadline
+        self.workers = workers
+        # 값: (가져온 시각, 기사 목록). 만료 판단은 ttl로 하고, 항목 자체는 NEWS_STALE_TTL까지 보관합니다.
+        self.cache = LRUCache(maxsize=cache_size, default_ttl=NEWS_STALE_TTL)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="news")
+        self._inflight = {}
+        self._started = {}  # 정규화한 이름 -> 검색을 시작한 시각 (time.monotonic)
+        self._lock = threading.Lock()
+
+    def _is_fresh(self, entry) -> bool:
+        fetched_at, articles = entry
+        ttl = self.ttl if articles else NEWS_EMPTY_TTL
+        return time.time() - fetched_at < ttl
+
+    def _fetch(self, key, name):
+        with self._lock:
+            self._started[key] = time.monotonic()
+        try:
+            articles = self.search(name) or []
+            self.cache.set(key, (time.time(), articles))
+            return articles
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+                self._started.pop(key, None)
+
+    def _submit(self, key, name):
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is None:
+                # 시간 초과 후에도 백그라운드에서 이어지므로 요청 컨텍스트를 넘기지 않습니다.
+                future = submit_detached(self._executor, self._fetch, key, name)
+                self._inflight[key] = future
+            return future
+
+    def lookup_many(self, names, deadline=None) -> list:
+        """names 순서대로 기사 목록의 리스트를 돌려줍니다. 최대 deadline초만 기다립니다."""
+        deadline = self.deadline if deadline is None else deadline
+        keys = [normalize_name(name) for name in names]
+        results = [None] * len(names)
+        pending = {}
+        for i, (key, name) in enumerate(zip(keys, names)):
+            entry = self.cache.get(key)
+            if entry is not None and self._is_fresh(entry):
+                observe("nate", "/search", 0.0, "cached", cache="hit")
+                results[i] = entry[1]
+            else:
+                pending[i] = self._submit(key, name)
+
+        if pending:
+            self._wait(pending, keys, deadline)
+            for i, future in pending.items():
+                if future.done() and future.exception() is None:
+                    results[i] = future.result()
+                    continue
+                if future.done():
+                    print(f"뉴스 검색 실패 ({names[i]}): {future.exception()}")
+                else:
+                    print(f"뉴스 검색 시간 초과 ({names[i]}), 캐시된 결과를 사용합니다.")
+                entry = self.cache.get(keys[i])
+                results[i] = entry[1] if entry is not None else []
+        return results
+
+    def _wait(self, pending, keys, deadline):
+        """
+        각 검색이 시작한 때부터 deadline초가 지나거나 끝날 때까지 기다립니다.
+        아직 시작하지 못한 검색은 작업자 수로 나눈 차례만큼의 시간(deadline × 차례 수)까지만 기다립니다.
+        """
+        limit = time.monotonic() + deadline * math.ceil(len(pending) / self.workers)
+        while True:
+            now = time.monotonic()
+            expiries = []
+            for i, future in pending.items():
+                if future.done():
+                    continue
+                with self._lock:
+                    started = self._started.get(keys[i])
+                expires_at = limit if started is None else min(started + deadline, limit)
+                if expires_at > now:
+                    expiries.append((expires_at, future))
+            if not expiries:
+                return
+            wait([future for _, future in expiries],
+                 timeout=min(expires_at for expires_at, _ in expiries) - now, return_when=FIRST_COMPLETED)
+
+    def lookup(self, name, deadline=None) -> list:
+        return self.lookup_many([name], deadline)[0]
@@ -0,0 +1,167 @@
+# person_index.py
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+PERSON_INDEX_PATH = os.getenv("PERSON_INDEX_PATH", os.path.join(BASE_DIR, ".cache", "person_index.sqlite"))
+# 이 기간보다 오래된 항목은 백그라운드에서 다시 가져옵니다. (초)
+REFRESH_AGE = int(os.getenv("PERSON_INDEX_REFRESH_AGE", str(7 * 24 * 60 * 60)))
+# 최근에 기록한 항목은 같은 내용으로 다시 쓰지 않습니다. (초)
+RECORD_DEBOUNCE = 60 * 60
+GENRE_AFFINITY_TOP = 5
+
+
+def debut_year(credits):
+    """출연작 목록에서 가장 이른 개봉/방영 연도를 찾습니다."""
+    dates = [c.get("release_date") or c.get("first_air_date") for c in credits or []]
+    dates = [d for d in dates if d and len(d) >= 4]
+    return int(min(dates)[:4]) if dates else None
+
+
+def genre_affinity(credits, top=GENRE_AFFINITY_TOP):
+    """출연작 장르 빈도 상위 top개 {genre_id: count}"""
+    counts = Counter(gid for c in credits or [] for gid in c.get("genre_ids") or [])
+    return {str(gid): n for gid, n in counts.most_common(top)}
+
+
+class PersonIndex:
+    """
+    TMDB 인물 id를 키로 하는 속성 인덱스 (SQLite 파일 + 메모리 사본).
+    성별, 생년월일, 데뷔 연도, 주요 분야, 장르 선호도를 저장하며,
+    인물 정보를 가져올 때마다 record()로 조금씩 채워집니다.
+    credits_known이 False인 항목은 출연작을 아직 보지 못해 데뷔 연도/장르 정보가 없습니다.
+    """
+
+    FIELDS = ("id", "name", "gender", "birthday", "debut_year", "department",
+              "genre_affinity", "credits_known", "updated_at")
+
+    def __init__(self, path=PERSON_INDEX_PATH):
+        self.path = path
+        self._people = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._loaded = False
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS person ("
+                " id INTEGER PRIMARY KEY, name TEXT, gender INTEGER, birthday TEXT,"
+                " debut_year INTEGER, department TEXT, genre_affinity TEXT,"
+                " credits_known INTEGER NOT NULL DEFAULT 0, updated_at REAL NOT NULL)"
+            )
+            conn.commit()
+            self._local.conn = conn
+        return conn
+
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            try:
+                rows = self._conn().execute(f"SELECT {', '.join(self.FIELDS)} FROM person").fetchall()
+            except sqlite3.Error as e:
+                print(f"인물 인덱스 로드 실패: {e}")
+                rows = []
+            for row in rows:
+                entry = dict(zip(self.FIELDS, row))
+                entry["genre_affinity"] = json.loads(entry["genre_affinity"] or "{}")
+                entry["credits_known"] = bool(entry["credits_known"])
+                self._people[entry["id"]] = entry
+            self._loaded = True
+
+    def get(self, person_id):
+        self._ensure_loaded()
+        return self._people.get(person_id)
+
+    def record(self, details: dict, force=False):
+        """
+        /person/{id} 응답(append_to_response 포함 가능)으로 항목을 추가/갱신합니다.
+        combined_credits가 없으면 기존 데뷔 연도/장르 정보는 그대로 둡니다.
+        force가 아니면 최근(RECORD_DEBOUNCE 이내)에 기록한 항목은 다시 쓰지 않습니다.
+        """
+        person_id = details.get("id") if details else None
+        if not person_id:
+            return
+        self._ensure_loaded()
+        has_credits = "combined_credits" in details
+        with self._lock:
+            current = self._people.get(person_id)
+            if (not force and current and time.time() - current["updated_at"] < RECORD_DEBOUNCE
+                    and (current["credits_known"] or not has_credits)):
+                return
+            entry = dict(current or {"id": person_id, "debut_year": None,
+                                     "genre_affinity": {}, "credits_known": False})
+            entry.update({
+                "name": details.get("name"),
+                "gender": details.get("gender"),
+                "birthday": details.get("birthday"),
+                "department": details.get("known_for_department"),
+                "updated_at": time.time(),
+            })
+            if has_credits:
+                credits = details["combined_credits"].get("cast", [])
+                entry["debut_year"] = debut_year(credits)
+                entry["genre_affinity"] = genre_affinity(credits)
+                entry["credits_known"] = True
+            self._people[person_id] = entry
+        try:
+            conn = self._conn()
+            conn.execute(
+                f"INSERT OR REPLACE INTO person ({', '.join(self.FIELDS)})"
+                f" VALUES ({', '.join('?' * len(self.FIELDS))})",
+                tuple(json.dumps(entry[f]) if f == "genre_affinity" else entry[f] for f in self.FIELDS),
+            )
+            conn.commit()
+        except sqlite3.Error as e:
+            print(f"인물 인덱스 저장 실패: {e}")
+
+    def stale_ids(self, max_age=REFRESH_AGE, limit=50):
+        """updated_at이 오래된 순으로 max_age보다 오래된 인물 id 목록"""
+        self._ensure_loaded()
+        cutoff = time.time() - max_age
+        with self._lock:
+            stale = sorted((e["updated_at"], pid) for pid, e in self._people.items() if e["updated_at"] < cutoff)
+        return [pid for _, pid in stale[:limit]]
+
+    def refresh_stale(self, fetch, max_age=REFRESH_AGE, limit=50):
+        """
+        오래된 항목을 fetch(person_id)로 다시 가져와 기록합니다.
+        fetch는 combined_credits를 포함한 /person/{id} 응답을 돌려줘야 합니다.
+        """
+        refreshed = 0
+        for person_id in self.stale_ids(max_age, limit):
+            details = fetch(person_id)
+            if details:
+                self.record(details, force=True)
+                refreshed += 1
+        return refreshed
+
+    def clear(self):
+        """인덱스를 모두 지웁니다. (메모리 사본 + SQLite)"""
+        with self._lock:
+            self._people.clear()
+            self._loaded = True
+        try:
+            conn = self._conn()
+            conn.execute("DELETE FROM person")
+            conn.commit()
+        except sqlite3.Error as e:
+            print(f"인물 인덱스 비우기 실패: {e}")
+
+    def __len__(self):
+        self._ensure_loaded()
+        return len(self._people)
+
+
+person_index = PersonIndex()
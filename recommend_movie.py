@@ -1,9 +1,40 @@
 # recommend_movie.py
+import numpy as np
 import pandas as pd
 from flask import render_template, request
-from tmdb_helpers import tmdb_get
+from tmdb_client import tmdb_get
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from metrics import ContextThreadPoolExecutor
+from movie_catalog import MovieCatalog, REFRESH_INTERVAL
+from background import start_periodic
+import time
 import random
 
+# 추천 결과로 보여줄 영화 수
+SAMPLE_SIZE = 21
+# 이 정도 후보가 모이면 나머지 페이지 요청을 중단합니다.
+POOL_TARGET = 60
+# discover 페이지 동시 요청 수 제한
+PAGE_WORKERS = 8
+
+# get_data 포맷팅용 매핑
+# 카드 크기에 맞춘 포스터 (image_proxy가 줄여서 캐시)
+IMG_BASE_URL = "/img/w342"
+GENRE_DICT = {
+    "28": "액션", "12": "모험", "16": "애니메이션", "35": "코미디",
+    "80": "범죄", "99": "다큐멘터리", "18": "드라마", "10751": "가족",
+    "27": "공포", "10749": "로맨스", "878": "SF", "53": "스릴러",
+    "10752": "전쟁", "37": "서부", "14": "판타지", "36": "역사",
+    "10402": "음악", "9648": "미스터리"
+}
+LANG_MAP = {'ko': '한국어', 'en': '영어', 'ja': '일본어'}
+
+# 로컬 카탈로그 스냅샷: (언어 x 상영시간 구간)별로 discover 결과를 CATALOG_PAGES 페이지까지 보관
+CATALOG_LANGUAGES = ("ko", "en", "ja")
+CATALOG_RUNTIME_TYPES = (1, 2, 3)
+CATALOG_PAGES = 10
+catalog = MovieCatalog()
+
 
 def build_release_date_filter(year_type: int) -> dict:
     """
@@ -63,16 +94,22 @@ def get_movies(
         runtime_type=None, 
         release_year_type_list=[0], 
         rating=None, 
-        country='ko') -> pd.DataFrame:
+        country='ko',
+        sample_size=SAMPLE_SIZE) -> pd.DataFrame:
     
     """
     paras: genre_id, genre_or, runtime_type, release_year_type_list, rating, country
     :return: DataFrame of recommended movies
     설정한 조건의 영화 목록을 페이지 범위로 가져오는 함수
+
+    (개봉연도 x 언어) 조합별 1페이지를 먼저 동시에 요청하고,
+    후보가 부족할 때만 total_pages 안에서 나머지 페이지를 동시에 요청합니다.
+    중복 제거된 후보가 POOL_TARGET개 이상 모이면 남은 요청은 취소합니다.
     """
 
     #### Modify page range here ####
     page_range = 5
+    pool_target = max(sample_size * 2, POOL_TARGET)
 
     all_movies = []
     ###################
@@ -85,32 +122,72 @@ def get_movies(
     if len(release_year_type_list) == 4:    
         release_year_type_list = [0]
 
+    # 로컬 카탈로그로 답할 수 있으면 TMDB를 호출하지 않습니다. (카탈로그에 없는 언어가 섞이면 실시간 호출)
+    if set(countries) <= set(CATALOG_LANGUAGES):
+        cached = catalog.query(
+            genre_id=genre_id,
+            genre_or=genre_or,
+            runtime_type=runtime_type,
+            release_year_type_list=release_year_type_list,
+            rating=rating,
+            countries=countries,
+            sample_size=sample_size,
+            pool_target=pool_target,
+        )
+        if cached is not None:
+            return cached
+
     # genre_id AND OR Logic
-    genre_id = genre_id.replace(",", "|") if genre_or else genre_id
-
-    for release_year_type in release_year_type_list:
-        for country in countries:
-            for page_num in range(1, page_range + 1):    
-                params = build_params(
-                    genre_id=genre_id,
-                    runtime_type=runtime_type,
-                    release_year_type=release_year_type,
-                    rating=rating,
-                    country=country
-                ) 
-                movies_data = tmdb_get('/discover/movie', **params)
-                movies = movies_data.get('results', [])
-                if not movies:
-                    print(f"{page_num} 페이지에서 영화를 찾을 수 없습니다.")
+    genre_id = genre_id.replace(",", "|") if genre_or and genre_id else genre_id
+
+    combos = [(year_type, lang) for year_type in release_year_type_list for lang in countries]
+
+    def fetch_page(combo, page_num):
+        release_year_type, lang = combo
+        params = build_params(
+            genre_id=genre_id,
+            runtime_type=runtime_type,
+            release_year_type=release_year_type,
+            rating=rating,
+            country=lang
+        )
+        params["page"] = page_num
+        return tmdb_get('/discover/movie', **params)
+
+    def add_movies(movies):
+        # 중복 제거 : id 기준으로 중복되는 것 제거
+        for m in movies:
+            mid = m.get('id')
+            if mid is None:
+                continue
+            if mid not in seen_ids:
+                seen_ids.add(mid)
+                all_movies.append(m)
+
+    pool = ContextThreadPoolExecutor(max_workers=min(PAGE_WORKERS, page_range * len(combos)))
+    try:
+        # 1) 조합별 1페이지 (한 번의 왕복)
+        next_pages = []
+        for combo, movies_data in zip(combos, pool.map(lambda c: fetch_page(c, 1), combos)):
+            movies = movies_data.get('results', [])
+            if not movies:
+                print(f"{combo} 조건의 1 페이지에서 영화를 찾을 수 없습니다.")
+                continue
+            add_movies(movies)
+            last_page = min(page_range, movies_data.get('total_pages') or 1)
+            next_pages.extend((page_num, combo) for page_num in range(2, last_page + 1))
+
+        # 2) 후보가 부족할 때만 존재하는 나머지 페이지를 동시에 요청
+        if len(all_movies) < pool_target and next_pages:
+            futures = [pool.submit(fetch_page, combo, page_num) for page_num, combo in sorted(next_pages)]
+            for future in as_completed(futures):
+                add_movies(future.result().get('results', []))
+                if len(all_movies) >= pool_target:
                     break
-                # 중복 제거 : id 기준으로 중복되는 것 제거
-                for m in movies:
-                    mid = m.get('id')
-                    if mid is None:
-                        continue
-                    if mid not in seen_ids:
-                        seen_ids.add(mid)
-                        all_movies.append(m)
+    finally:
+        # 충분히 모였으면 대기 중인 요청은 취소하고 기다리지 않습니다.
+        pool.shutdown(wait=False, cancel_futures=True)
+
     # 예비 중복 방지 코드 : 혹시 중복이 섞이더라도 id 기준으로 한번 더 고유화
     unique_by_id = {}
     for m in all_movies:
@@ -118,88 +195,104 @@ def get_movies(
     all_movies = list(unique_by_id.values())
 
     #
-    if len(all_movies) > 21:
-        all_movies = random.sample(all_movies, 21)
+    if len(all_movies) > sample_size:
+        all_movies = random.sample(all_movies, sample_size)
     
     return pd.DataFrame(all_movies)
 
 
+def refresh_catalog():
+    """(언어 x 상영시간 구간)별 discover 결과를 모아 카탈로그 스냅샷을 새로 만드는 함수"""
+    slices = [(lang, rt) for lang in CATALOG_LANGUAGES for rt in CATALOG_RUNTIME_TYPES]
+
+    def fetch_page(slice_, page_num):
+        lang, rt = slice_
+        params = build_params(runtime_type=rt, country=lang)
+        params["page"] = page_num
+        return tmdb_get('/discover/movie', **params)
+
+    rows = []
+    complete_slices = []
+    with ThreadPoolExecutor(max_workers=PAGE_WORKERS) as pool:
+        first_pages = list(pool.map(lambda sl: fetch_page(sl, 1), slices))
+        if not any(data.get('results') for data in first_pages):
+            # TMDB 장애 시 기존 스냅샷을 유지합니다.
+            print("카탈로그 갱신 실패: discover 결과가 없습니다.")
+            return
+        jobs = []
+        for sl, data in zip(slices, first_pages):
+            rows.extend((sl[1], m) for m in data.get('results', []))
+            total_pages = data.get('total_pages') or 1
+            if total_pages <= CATALOG_PAGES:
+                complete_slices.append(sl)
+            last_page = min(CATALOG_PAGES, total_pages)
+            jobs.extend((sl, page_num) for page_num in range(2, last_page + 1))
+        for (sl, _), data in zip(jobs, pool.map(lambda job: fetch_page(*job), jobs)):
+            rows.extend((sl[1], m) for m in data.get('results', []))
+
+    catalog.replace(rows, slices=slices, complete_slices=complete_slices)
+    print(f"영화 카탈로그 갱신 완료: {len(catalog)}건")
+
+
+def _refresh_catalog_if_stale():
+    if time.time() - catalog.built_at >= REFRESH_INTERVAL:
+        refresh_catalog()
+
+
+def start_catalog_refresh():
+    """저장된 스냅샷을 불러오고, 주기적으로 카탈로그를 갱신하는 백그라운드 작업을 시작합니다."""
+    catalog.load()
+    return start_periodic("movie-catalog", _refresh_catalog_if_stale, interval=10 * 60)
+
+
 def get_data(df: pd.DataFrame)-> list:
     """
     DataFrame에서 필요한 컬럼을 추출하고, 형식을 맞춰서 영화 정보를 반환하는 함수
+    (행 단위 apply/iterrows 없이 컬럼 단위 연산으로 처리)
     """
-    col_list = [
-    'backdrop_path',        # concatenated with 'https://image.tmdb.org/t/p/w1280' (string)
-    'genre_ids',            # list of genre name which in genre_dict (list of string, e.g., ['판타지', '역사', '액션'])
-    'original_language',    # e.g., 'ko' for Korean (string)
-    'overview',             # movie overview or synopsis (string)
-    'poster_path',          # concatenated with 'https://image.tmdb.org/t/p/w1280' (string)
-    'release_date',         # release date in 'YYYY-MM-DD' format (string)
-    'title',                # movie title in Korean (string)
-    'vote_average',         # average rating (0-10 scale) (string with 2 decimal places)
-    'vote_count',           # total number of votes (int)
-    'id'                    # movie ID (numpy.int64)
-    ]
-    # Drop columns not in col_list
-    df = df.drop(columns=[col for col in df.columns if col not in col_list])
-    # print(df)
-
     ## Fill missing values and format columns
-    # Concatenate base URL for backdrop_path
-    base_url = "https://image.tmdb.org/t/p/w1280"
-    df['backdrop_path'] = df['backdrop_path'].apply(
-        lambda x: base_url + x if x else "/no_image.png"
-    )
-    # Map genre IDs to names using genre_dict
-    genre_dict = {
-    "28": "액션", "12": "모험", "16": "애니메이션", "35": "코미디",
-    "80": "범죄", "99": "다큐멘터리", "18": "드라마", "10751": "가족",
-    "27": "공포", "10749": "로맨스", "878": "SF", "53": "스릴러",
-    "10752": "전쟁", "37": "서부", "14": "판타지", "36": "역사",
-    "10402": "음악", "9648": "미스터리"
-    }
-    df['genre_ids'] = df['genre_ids'].apply(
-        lambda lst: [genre_dict.get(str(gid)) for gid in lst if str(gid) in genre_dict]
-    )
+    # Map genre IDs to names using GENRE_DICT
+    # 장르 id 목록을 행별로 펼쳐서 이름으로 매핑한 뒤 원래 순서대로 다시 ", "로 묶습니다.
+    genre_ids = df['genre_ids'].reset_index(drop=True)
+    exploded = genre_ids.explode()
+    genre_names = exploded.astype(str).map(GENRE_DICT).dropna()
+    genres = ((genre_names + ", ").groupby(level=0).sum().str[:-2]
+              .reindex(genre_ids.index, fill_value=""))
+
     # Map original_language codes to Korean names
-    lang_map = {'ko': '한국어', 'en': '영어', 'ja': '일본어'}
-    df['original_language'] = (df['original_language']
-                            .fillna("N/A")
-                            .map(lang_map)
-    )
-    # Fill overview with default text if empty or NaN
-    df['overview'] = (df['overview']
-                    .replace("", "줄거리가 없습니다.")
-                    .fillna("줄거리가 없습니다.")
-                    .apply(lambda x: x[:200] + "..." if len(x) > 200 else x))   # up to 200 characters
+    languages = df['original_language'].fillna("N/A").map(LANG_MAP)
+
+    # Fill overview with default text if empty or NaN, up to 200 characters
+    overview = df['overview'].replace("", "줄거리가 없습니다.").fillna("줄거리가 없습니다.")
+    overview = overview.where(overview.str.len() <= 200, overview.str.slice(0, 200) + "...")
+
     # Concatenate base URL for poster_path
-    df['poster_path'] = df['poster_path'].apply(
-        lambda x: base_url + x if x else "/no_image.png"
-    )
-    # Format release_date to 'YYYY-MM-DD' or 'N/A'
-    df['release_date'] = df['release_date'].fillna("N/A")
-    # Format title, vote_average, and vote_count
-    df['title'] = df['title'].replace("", "제목이 없습니다.").fillna("제목이 없습니다.")
-    df['vote_average'] = df['vote_average'].apply(lambda x: f"{float(x):.2f}" if x else "N/A")
-    df['vote_count'] = df['vote_count'].apply(lambda x: int(x) if x else "N/A")
+    poster = df['poster_path']
+    has_poster = poster.notna() & (poster != "")
+    poster_url = (IMG_BASE_URL + poster.where(has_poster, "").astype(str)).where(has_poster, "/no_image.png")
+
+    # Format title, vote_average
+    title = df['title'].replace("", "제목이 없습니다.").fillna("제목이 없습니다.")
+    vote = df['vote_average'].astype(float)
+    rating = pd.Series(np.char.mod("%.2f", vote.to_numpy()), index=vote.index).where(vote != 0, "N/A")
+
     # Convert id to string and add TMDB URL
-    df['id'] = 'https://www.themoviedb.org/movie/' + df['id'].astype(str)
-
-    # Convert DataFrame to list of dictionaries
-    movies = []
-    for _, row in df.iterrows():
-        movie = {
-            "id": row['id'],
-            "title": row['title'],
-            "genre": ", ".join(row['genre_ids']),
-            "rating": row['vote_average'],
-            # "runtime": row.get('runtime', 'N/A'),  # runtime may not be in the original data
-            "language": row['original_language'],
-            "poster_url": row['poster_path'],
-            "overview": row['overview']
-        }
-        movies.append(movie)
-    return movies
+    movie_url = 'https://www.themoviedb.org/movie/' + df['id'].astype(str)
+
+    # Convert columns to list of dictionaries in one pass
+    columns = {
+        "id": movie_url,
+        "title": title,
+        "genre": genres,
+        "rating": rating,
+        # "runtime": row.get('runtime', 'N/A'),  # runtime may not be in the original data
+        "language": languages,
+        "poster_url": poster_url,
+        "overview": overview,
+    }
+    keys = list(columns)
+    values = [col.to_numpy().tolist() for col in columns.values()]
+    return [dict(zip(keys, row)) for row in zip(*values)]
 
 def get_recommendations():
     """
@@ -2,7 +2,13 @@
 
 from flask import request, jsonify, render_template
 from datetime import datetime
-from tmdb_helpers import tmdb_get, tmdb_person_details, tmdb_person_combined_credits, tmdb_person_external_ids
+from collections import deque
+from concurrent.futures import wait, FIRST_COMPLETED
+from metrics import ContextThreadPoolExecutor
+from tmdb_client import tmdb_get
+from tmdb_helpers import tmdb_person_bundle
+from person_index import person_index, debut_year
+from background import start_periodic
 
 # --- Helper Functions ---
 
@@ -17,88 +23,164 @@ def _calculate_age(birthdate_str):
     except (ValueError, TypeError):
         return None
 
+def _age_matches(age, age_range):
+    """나이가 선택한 연령대에 속하는지 확인"""
+    if age is None:
+        return False
+    if age_range == "10s": return 10 <= age < 20
+    if age_range == "20s": return 20 <= age < 30
+    if age_range == "30s": return 30 <= age < 40
+    if age_range == "40s": return 40 <= age < 50
+    if age_range == "50s_over": return age >= 50
+    return True
+
+def _debut_matches(first_work_year, debut_year_range):
+    """데뷔 연도가 선택한 연대에 속하는지 확인"""
+    if first_work_year is None:
+        return False
+    if debut_year_range == "2020s": return 2020 <= first_work_year <= 2029
+    if debut_year_range == "2010s": return 2010 <= first_work_year <= 2019
+    if debut_year_range == "2000s": return 2000 <= first_work_year <= 2009
+    if debut_year_range == "1990s": return 1990 <= first_work_year <= 1999
+    if debut_year_range == "pre_1990s": return first_work_year < 1990
+    return True
+
+def _person_attrs(details):
+    """인물 상세 응답에서 필터에 쓰는 속성만 뽑아 인덱스 항목과 같은 모양으로 만듭니다."""
+    return {
+        "gender": details.get("gender"),
+        "birthday": details.get("birthday"),
+        "debut_year": debut_year(details.get("combined_credits", {}).get("cast", [])),
+        "department": details.get("known_for_department", "N/A"),
+    }
+
+def _actor_result(person, department):
+    return {
+        "id": person.get("id"),
+        "name": person.get("name"),
+        "profile_path": person.get("profile_path"),
+        "known_for_department": department
+    }
+
 # --- Core Logic ---
 
-def search_and_filter_actors(name, gender, age_range, debut_year_range, genre_id):
-    """배우 검색 및 서버 사이드 필터링을 수행하는 메인 함수"""
-    
-    initial_actors = {} 
-
-    if name:
-        results = tmdb_get("/search/person", query=name, language="ko-KR").get("results", [])
-        for person in results:
-            if person.get("id"):
-                initial_actors[person["id"]] = person
-    else:
-        discover_params = {
-            "language": "ko-KR",
-            "sort_by": "popularity.desc",
-            "with_genres": genre_id if genre_id else ""
-        }
-        for page in range(1, 3):
-            discover_params["page"] = page
-            movies = tmdb_get("/discover/movie", **discover_params).get("results", [])
-            for movie in movies:
-                movie_id = movie.get("id")
-                if not movie_id: continue
-                
-                credits = tmdb_get(f"/movie/{movie_id}/credits").get("cast", [])
-                for person in credits[:5]:
-                    if person.get("id") and person["id"] not in initial_actors:
-                        initial_actors[person["id"]] = person
-
-    filtered_actors = []
-    
-    for person in initial_actors.values():
-        if len(filtered_actors) >= 20:
-            break
+SEARCH_WORKERS = 8   # 동시에 진행하는 TMDB 요청 수
+MAX_RESULTS = 20     # 이만큼 찾으면 남은 작업은 모두 중단
+CAST_PER_MOVIE = 5   # 영화별로 후보로 삼을 출연진 수
 
+def search_and_filter_actors(name, gender, age_range, debut_year_range, genre_id):
+    """
+    배우 검색 및 서버 사이드 필터링을 수행하는 메인 함수
+
+    후보 수집(검색/discover → 영화별 크레딧)과 필터링을 하나의 스트리밍 파이프라인으로 처리합니다.
+    - 성별은 검색/크레딧 응답에 이미 들어 있으므로 추가 요청 없이 먼저 거릅니다.
+    - 나이/데뷔 연도 필터는 인물 인덱스(person_index)에 있는 인물이면 요청 없이 평가하고,
+      없는 인물만 상세(+출연작)를 요청합니다. 가져온 정보는 인덱스에 기록됩니다.
+    - SEARCH_WORKERS개까지 동시에 요청하고, MAX_RESULTS명을 찾으면 남은 요청은 취소합니다.
+    """
+    gender = int(gender) if gender else None
+    needs_details = bool(age_range or debut_year_range)
+
+    candidates = deque()   # (순서 키, person) - 필터 대기 중인 후보
+    movies = deque()       # (영화 순서, movie_id) - 크레딧 요청 대기 중인 영화
+    seen_people = set()
+    matched = []           # (순서 키, 결과)
+
+    def evaluate(person, attrs):
+        """인덱스 항목 또는 상세 응답의 속성으로 필터를 평가합니다."""
+        if gender is not None and attrs.get("gender") != gender:
+            return None
+        if age_range and not _age_matches(_calculate_age(attrs.get("birthday")), age_range):
+            return None
+        if debut_year_range and not _debut_matches(attrs.get("debut_year"), debut_year_range):
+            return None
+        return _actor_result(person, attrs.get("department"))
+
+    def add_candidate(order, person):
         person_id = person.get("id")
-        if not person_id: continue
-            
-        details = tmdb_person_details(person_id)
-        
-        if gender and details.get("gender") != int(gender):
-            continue
-        
-        if age_range:
-            age = _calculate_age(details.get("birthday"))
-            if age is None: continue
-            
-            if age_range == "10s" and not (10 <= age < 20): continue
-            if age_range == "20s" and not (20 <= age < 30): continue
-            if age_range == "30s" and not (30 <= age < 40): continue
-            if age_range == "40s" and not (40 <= age < 50): continue
-            if age_range == "50s_over" and not (age >= 50): continue
-
-        if debut_year_range:
-            credits = tmdb_person_combined_credits(person_id)
-            if not credits: continue
-
-            valid_credits = [c for c in credits if c.get("release_date") or c.get("first_air_date")]
-            if not valid_credits: continue
-
-            valid_credits.sort(key=lambda x: x.get("release_date") or x.get("first_air_date"))
-            first_work_date = valid_credits[0].get("release_date") or valid_credits[0].get("first_air_date")
-            
-            if not first_work_date or len(first_work_date) < 4: continue
-            
-            first_work_year = int(first_work_date[:4])
-
-            if debut_year_range == "2020s" and not (2020 <= first_work_year <= 2029): continue
-            if debut_year_range == "2010s" and not (2010 <= first_work_year <= 2019): continue
-            if debut_year_range == "2000s" and not (2000 <= first_work_year <= 2009): continue
-            if debut_year_range == "1990s" and not (1990 <= first_work_year <= 1999): continue
-            if debut_year_range == "pre_1990s" and not (first_work_year < 1990): continue
-        
-        filtered_actors.append({
-            "id": person.get("id"),
-            "name": person.get("name"),
-            "profile_path": person.get("profile_path"),
-            "known_for_department": details.get("known_for_department", "N/A")
-        })
-
-    return filtered_actors
+        if not person_id or person_id in seen_people:
+            return
+        seen_people.add(person_id)
+        # 값싼 필터 먼저: 응답에 들어 있는 성별로 거르기
+        if gender is not None and person.get("gender") is not None and person.get("gender") != gender:
+            return
+        if not needs_details and (gender is None or person.get("gender") is not None):
+            matched.append((order, _actor_result(person, person.get("known_for_department", "N/A"))))
+            return
+        # 인덱스에 있는 인물은 요청 없이 평가
+        entry = person_index.get(person_id)
+        if entry and (entry["credits_known"] or not debut_year_range):
+            result = evaluate(person, entry)
+            if result:
+                matched.append((order, result))
+            return
+        candidates.append((order, person))
+
+    def check_candidate(person):
+        # 인덱스를 채우기 위해 출연작도 함께 가져오고, 소개글은 필요 없으므로 영어 소개 요청은 생략합니다.
+        details = tmdb_person_bundle(person["id"], parts=("combined_credits",), biography_fallback=False)
+        if not details:
+            return None
+        return evaluate(person, _person_attrs(details))
+
+    def fetch_credits(movie_id):
+        return tmdb_get(f"/movie/{movie_id}/credits").get("cast", [])
+
+    pool = ContextThreadPoolExecutor(max_workers=SEARCH_WORKERS)
+    try:
+        if name:
+            results = tmdb_get("/search/person", query=name, language="ko-KR").get("results", [])
+            for i, person in enumerate(results):
+                add_candidate((i,), person)
+        else:
+            discover_params = {
+                "language": "ko-KR",
+                "sort_by": "popularity.desc",
+                "with_genres": genre_id if genre_id else ""
+            }
+            pages = pool.map(lambda page: tmdb_get("/discover/movie", **dict(discover_params, page=page)), range(1, 3))
+            movie_ids = [m.get("id") for data in pages for m in data.get("results", []) if m.get("id")]
+            movies.extend(enumerate(movie_ids))
+
+        in_flight = {}  # future -> ("check", 순서 키, person) | ("credits", 영화 순서)
+        while len(matched) < MAX_RESULTS and (candidates or movies or in_flight):
+            # 필터 작업을 우선 배정하고, 남는 자리에 크레딧 요청을 채웁니다.
+            while len(in_flight) < SEARCH_WORKERS and (candidates or movies):
+                if candidates:
+                    order, person = candidates.popleft()
+                    in_flight[pool.submit(check_candidate, person)] = ("check", order, person)
+                else:
+                    movie_order, movie_id = movies.popleft()
+                    in_flight[pool.submit(fetch_credits, movie_id)] = ("credits", movie_order)
+            if not in_flight:
+                break
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                job = in_flight.pop(future)
+                if job[0] == "check":
+                    result = future.result()
+                    if result:
+                        matched.append((job[1], result))
+                else:
+                    for cast_order, person in enumerate(future.result()[:CAST_PER_MOVIE]):
+                        add_candidate((job[1], cast_order), person)
+    finally:
+        # 결과를 다 모았으면 대기 중인 요청은 취소하고 기다리지 않습니다.
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    matched.sort(key=lambda item: item[0])
+    return [actor for _, actor in matched[:MAX_RESULTS]]
+
+def _fetch_person_for_index(person_id):
+    return tmdb_get(f"/person/{person_id}", language="ko-KR", append_to_response="combined_credits")
+
+def start_person_index_refresh():
+    """오래된 인물 인덱스 항목을 주기적으로 다시 가져오는 백그라운드 작업을 시작합니다."""
+    return start_periodic(
+        "person-index",
+        lambda: person_index.refresh_stale(_fetch_person_for_index),
+        interval=60 * 60,
+    )
 
 # --- Request Handlers ---
 
@@ -117,9 +199,9 @@ def process_actor_search():
 def get_actor_details(actor_id):
     """배우 상세 정보 페이지를 위한 데이터를 처리하고 렌더링합니다."""
     
-    details = tmdb_person_details(actor_id)
-    credits = tmdb_person_combined_credits(actor_id)
-    external_ids = tmdb_person_external_ids(actor_id)
+    details = tmdb_person_bundle(actor_id, parts=("combined_credits", "external_ids"))
+    credits = details.pop("combined_credits", {}).get("cast", [])
+    external_ids = details.pop("external_ids", {})
 
     valid_credits = [c for c in credits if c.get("release_date") or c.get("first_air_date")]
     sorted_credits = sorted(
@@ -0,0 +1,8 @@
+# tests/conftest.py
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# 앱 모듈(저장소 최상위)과 벤치마크의 KOBIS 스텁 서버를 import할 수 있게 합니다.
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
@@ -0,0 +1,110 @@
+# tests/test_festival_crawler.py
+"""benchmarks/fixtures/kobis의 KOBIS 목록 페이지로 festival_crawler의 파싱과 페이지 이동을 검사합니다."""
+import threading
+from contextlib import contextmanager
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+import festival_crawler
+from bench_festival_crawler import EMPTY_PAGE, FIXTURES_DIR, load_pages, make_handler
+
+PAGES, EXPECTED = load_pages(FIXTURES_DIR)
+
+
+@pytest.fixture
+def kobis(monkeypatch):
+    """fixture 페이지를 돌려주는 스텁 KOBIS 서버. 받은 요청 목록 (method, curPage, status)을 돌려줍니다."""
+    log = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(PAGES, log))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setattr(festival_crawler, "KOBIS_FESTIVAL_URL",
+                        f"http://127.0.0.1:{server.server_port}/searchUserFestInfoList.do")
+    yield log
+    server.shutdown()
+    server.server_close()
+
+
+def expected_rows(max_pages):
+    return [row for page_num in range(1, max_pages + 1) for row in EXPECTED.get(page_num, [])]
+
+
+@pytest.mark.parametrize("page_num", sorted(EXPECTED))
+def test_parse_festival_rows_matches_expected(page_num):
+    assert festival_crawler.parse_festival_rows(PAGES(page_num)) == EXPECTED[page_num]
+
+
+def test_parse_festival_rows_skips_header_and_empty_rows():
+    assert festival_crawler.parse_festival_rows(EMPTY_PAGE) == []
+
+
+def test_parse_festival_rows_without_website_link():
+    rows = festival_crawler.parse_festival_rows(PAGES(1))
+    assert any(row["website"] is None for row in rows)
+
+
+def test_search_form_fields_reads_hidden_inputs():
+    fields = festival_crawler._search_form_fields(PAGES(1))
+    assert fields["CSRFToken"]
+    assert fields["curPage"] == "1"
+    assert "sFestNm" not in fields  # hidden이 아닌 입력은 제외
+
+
+def test_requests_engine_gets_first_page_and_posts_the_rest(kobis):
+    rows = festival_crawler.get_film_festivals_with_requests(2)
+
+    assert rows == expected_rows(2)
+    assert [entry for entry in kobis if entry[0] == "GET"] == [("GET", 1, 200)]
+    assert [entry for entry in kobis if entry[0] == "POST"] == [("POST", 2, 200)]
+
+
+def test_requests_engine_stops_at_empty_page(kobis):
+    rows = festival_crawler.get_film_festivals_with_requests(4)
+
+    assert rows == expected_rows(2)
+    assert sorted(page for method, page, _ in kobis if method == "POST") == [2, 3, 4]
+
+
+def test_requests_engine_needs_search_form_token(kobis, monkeypatch):
+    # CSRFToken 없이 POST하면 KOBIS(스텁)가 거절하므로 1페이지만 남습니다.
+    monkeypatch.setattr(festival_crawler, "_search_form_fields", lambda html: {})
+
+    rows = festival_crawler.get_film_festivals_with_requests(2)
+
+    assert rows == EXPECTED[1]
+    assert ("POST", 2, 403) in kobis
+
+
+class FakeDriver:
+    """페이지 번호 링크를 누르면 해당 fixture 페이지를 보여주는 WebDriver 대역"""
+
+    def __init__(self):
+        self.page_source = ""
+
+    def maximize_window(self):
+        pass
+
+    def get(self, url):
+        self.page_source = PAGES(1)
+
+    def find_element(self, by, value):
+        driver = self
+
+        class Link:
+            def click(self):
+                driver.page_source = PAGES(int(value))
+
+        return Link()
+
+
+class FakePool:
+    @contextmanager
+    def lease(self):
+        yield FakeDriver()
+
+
+def test_selenium_engine_matches_requests_engine(kobis, monkeypatch):
+    monkeypatch.setattr(festival_crawler, "driver_pool", FakePool())
+    monkeypatch.setattr(festival_crawler.time, "sleep", lambda seconds: None)
+
+    assert festival_crawler.get_film_festivals_with_selenium(2) == festival_crawler.get_film_festivals_with_requests(2)
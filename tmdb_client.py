@@ -0,0 +1,197 @@
+# tmdb_client.py
+import copy
+import os
+import threading
+import time
+from urllib.parse import urlencode
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from cache_store import LRUCache, DiskCache, TieredCache
+from metrics import endpoint_template, observe, track
+
+# TMDB 기본 URL 및 커넥션 풀 설정
+BASE = os.getenv("TMDB_API_BASE", "https://api.themoviedb.org/3")
+POOL_SIZE = int(os.getenv("TMDB_POOL_SIZE", "16"))
+MAX_RETRIES = int(os.getenv("TMDB_MAX_RETRIES", "3"))
+BACKOFF_FACTOR = float(os.getenv("TMDB_BACKOFF_FACTOR", "0.5"))
+TIMEOUT = 10
+
+# 응답 캐시 설정: 1차 프로세스 내 LRU, 2차(선택) 워커 간 공유 SQLite 파일
+# TMDB_CACHE_PATH를 지정하면 디스크 계층이 켜집니다. TMDB_CACHE=0이면 캐시를 끕니다.
+CACHE_ENABLED = os.getenv("TMDB_CACHE", "1") != "0"
+CACHE_SIZE = int(os.getenv("TMDB_CACHE_SIZE", "2048"))
+CACHE_PATH = os.getenv("TMDB_CACHE_PATH")
+
+HOUR = 60 * 60
+# 엔드포인트 종류별 TTL(초). 앞에서부터 처음 일치하는 prefix를 사용합니다.
+CACHE_TTLS = [
+    ("/person/", 6 * HOUR),
+    ("/movie/", 12 * HOUR),
+    ("/genre/", 24 * HOUR),
+    ("/configuration", 24 * HOUR),
+    ("/search/", 1 * HOUR),
+    ("/discover/", 10 * 60),
+]
+DEFAULT_TTL = 10 * 60
+
+
+class TMDBClient:
+    """
+    하나의 requests.Session을 공유하는 TMDB 클라이언트.
+    keep-alive 커넥션 풀을 재사용하고, 429/5xx 응답은 백오프 후 재시도합니다.
+    (429 응답의 Retry-After 헤더를 따릅니다.)
+    """
+
+    def __init__(self, base=BASE, api_key=None, pool_size=POOL_SIZE,
+                 max_retries=MAX_RETRIES, backoff_factor=BACKOFF_FACTOR, timeout=TIMEOUT):
+        self.base = base
+        self.api_key = api_key
+        self.timeout = timeout
+        retry = Retry(
+            total=max_retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset(["GET"]),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        self.adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size,
+                                   max_retries=retry, pool_block=True)
+        self.session = requests.Session()
+        self.session.headers.update({"Accept": "application/json", "Connection": "keep-alive"})
+        self.session.mount("https://", self.adapter)
+        self.session.mount("http://", self.adapter)
+
+    def get(self, path, **params):
+        """TMDB GET 요청. 실패 시 requests 예외를 그대로 올립니다."""
+        params.setdefault("api_key", self.api_key or os.getenv("TMDB_API_KEY"))
+        r = self.session.get(f"{self.base}{path}", params=params, timeout=self.timeout)
+        r.raise_for_status()
+        return r.json()
+
+    def connection_stats(self) -> dict:
+        """
+        풀에서 새로 연 커넥션 수와 재사용한 커넥션 수를 반환합니다.
+        urllib3 ConnectionPool의 num_connections / num_requests 카운터를 합산합니다.
+        """
+        opened = requests_sent = 0
+        pools = self.adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            opened += pool.num_connections
+            requests_sent += pool.num_requests
+        return {
+            "requests": requests_sent,
+            "opened": opened,
+            "reused": max(requests_sent - opened, 0),
+        }
+
+    def close(self):
+        self.session.close()
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> TMDBClient:
+    """프로세스 전체에서 공유하는 TMDBClient를 반환합니다."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = TMDBClient()
+    return _client
+
+
+def connection_stats() -> dict:
+    return get_client().connection_stats()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    """TMDB 응답 캐시(TieredCache)를 반환합니다. 캐시가 꺼져 있으면 None."""
+    global _cache
+    if not CACHE_ENABLED:
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                disk = DiskCache(CACHE_PATH) if CACHE_PATH else None
+                _cache = TieredCache(LRUCache(maxsize=CACHE_SIZE, default_ttl=DEFAULT_TTL), disk)
+    return _cache
+
+
+def ttl_for(path: str) -> int:
+    for prefix, ttl in CACHE_TTLS:
+        if path.startswith(prefix):
+            return ttl
+    return DEFAULT_TTL
+
+
+def cache_key(path, params) -> str:
+    """경로 + 정렬된 파라미터(api_key 제외)로 캐시 키를 만듭니다."""
+    items = sorted((k, str(v)) for k, v in params.items() if k != "api_key" and v is not None)
+    return f"{path}?{urlencode(items)}" if items else path
+
+
+def invalidate_cache(path=None, prefix=None) -> int:
+    """
+    캐시 무효화 API.
+    - path만 주면 해당 경로의 모든 파라미터 조합을 지웁니다. (예: "/person/287")
+    - prefix를 주면 그 prefix로 시작하는 모든 키를 지웁니다. (예: "/discover/")
+    - 둘 다 없으면 전체를 비웁니다.
+    """
+    cache = get_cache()
+    if cache is None:
+        return 0
+    if path is None and prefix is None:
+        cache.clear()
+        return 0
+    removed = 0
+    if path is not None:
+        removed += cache.invalidate(key=path)
+        removed += cache.invalidate(prefix=path + "?")
+    if prefix is not None:
+        removed += cache.invalidate(prefix=prefix)
+    return removed
+
+
+def cache_stats() -> dict:
+    cache = get_cache()
+    return cache.stats() if cache is not None else {}
+
+
+def tmdb_get(path, **params):
+    """TMDB API 요청을 위한 기본 함수 (공유 클라이언트 + 응답 캐시 사용)"""
+    cache = get_cache()
+    key = cache_key(path, params) if cache is not None else None
+    endpoint = endpoint_template(path)
+    if cache is not None:
+        start = time.perf_counter()
+        cached = cache.get(key)
+        if cached is not None:
+            observe("tmdb", endpoint, time.perf_counter() - start, "cached", cache="hit")
+            # 호출한 쪽에서 결과를 수정해도 캐시가 오염되지 않도록 복사본을 돌려줍니다.
+            return copy.deepcopy(cached)
+    try:
+        with track("tmdb", endpoint, cache="miss" if cache is not None else "none") as call:
+            try:
+                data = get_client().get(path, **params)
+                call.status = 200
+            except requests.exceptions.HTTPError as e:
+                call.status = e.response.status_code if e.response is not None else "error"
+                raise
+    except requests.exceptions.RequestException as e:
+        print(f"TMDB API 요청 실패: {e}")
+        return {}
+    if cache is not None and data:
+        cache.set(key, data, ttl_for(path))
+        return copy.deepcopy(data)
+    return data
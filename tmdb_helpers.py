@@ -1,27 +1,30 @@
 # tmdb_helpers.py
 import os
-import requests
-from flask import request, jsonify
-from aws import recognize_celebrities
-from werkzeug.utils import secure_filename
+import json
+from flask import request, jsonify, Response
+from aws import recognize_celebrities, detect_celebrities, get_wikidata_images, news_lookup, wikidata_id_from_urls
 from typing import Optional, List, Dict, Any
-from PIL import Image
-import datetime
+from io import BytesIO
+from PIL import Image, ImageOps
+from concurrent.futures import as_completed
+from metrics import ContextThreadPoolExecutor
+from tmdb_client import tmdb_get
+from person_index import person_index
+from face_cache import face_cache
 
 # TMDB API 키와 기본 URL 설정
+# (요청은 tmdb_client의 공유 세션을 통해 전송됩니다)
 TMDB_API_KEY = os.getenv("TMDB_API_KEY")
-BASE = "https://api.themoviedb.org/3"
 
-def tmdb_get(path, **params):
-    """TMDB API 요청을 위한 기본 함수"""
-    params.setdefault("api_key", TMDB_API_KEY)
-    try:
-        r = requests.get(f"{BASE}{path}", params=params, timeout=10)
-        r.raise_for_status()
-        return r.json()
-    except requests.exceptions.RequestException as e:
-        print(f"TMDB API 요청 실패: {e}")
-        return {}
+# Rekognition에 보낼 이미지의 최대 가로/세로 (이보다 크면 인식률은 그대로고 전송량만 늘어남)
+REKOGNITION_MAX_DIM = int(os.getenv("REKOGNITION_MAX_DIM", "1920"))
+REKOGNITION_JPEG_QUALITY = 90
+
+# 얼굴 인식 결과 보강 시 유명인 단위 동시성 제한
+CELEB_WORKERS = int(os.getenv("CELEB_WORKERS", "4"))
+
+# tmdb_person_bundle에서 기본으로 함께 가져오는 부가 정보
+PERSON_PARTS = ("external_ids", "movie_credits", "tv_credits", "combined_credits")
 
 def tmdb_search_person_id(name: str):
     """이름으로 TMDB에서 인물 ID를 검색하는 함수"""
@@ -32,17 +35,31 @@ def tmdb_search_person_id(name: str):
     person = results[0]
     return person.get("id"), person
 
+def tmdb_person_bundle(person_id: int, parts=PERSON_PARTS, language="ko-KR", biography_fallback=True):
+    """
+    TMDB append_to_response로 인물 상세와 부가 정보(parts)를 한 번의 요청으로 가져오는 함수.
+    parts 예: ("external_ids", "movie_credits", "tv_credits", "combined_credits")
+    각 part는 응답의 같은 이름 키로 들어옵니다. (예: bundle["movie_credits"]["cast"])
+    한국어 소개가 비어 있을 때만 영어 소개를 두 번째 요청으로 가져옵니다.
+    """
+    params = {"language": language}
+    if parts:
+        params["append_to_response"] = ",".join(parts)
+    bundle = tmdb_get(f"/person/{person_id}", **params)
+    # 가져온 인물 속성은 검색 필터용 인덱스에 기록합니다.
+    person_index.record(bundle)
+    if biography_fallback and bundle and not bundle.get('biography'):
+        details_en = tmdb_get(f"/person/{person_id}")
+        if details_en and details_en.get('biography'):
+            bundle['biography'] = details_en['biography']
+    return bundle
+
 def tmdb_person_details(person_id: int):
     """
     TMDB에서 배우의 상세 정보를 가져오는 함수.
     한국어 소개가 없으면 영어 소개를 대신 가져옵니다.
     """
-    details_ko = tmdb_get(f"/person/{person_id}", language="ko-KR")
-    if details_ko and not details_ko.get('biography'):
-        details_en = tmdb_get(f"/person/{person_id}")
-        if details_en and details_en.get('biography'):
-            details_ko['biography'] = details_en['biography']
-    return details_ko
+    return tmdb_person_bundle(person_id, parts=())
 
 # ▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼
 # 배우의 소셜 미디어 ID (인스타그램, 트위터 등)를 가져오는 함수를 새로 추가합니다.
@@ -52,18 +69,28 @@ def tmdb_person_external_ids(person_id: int):
 # ▲▲▲▲▲▲▲▲▲▲▲▲▲▲▲▲▲▲▲▲▲▲▲▲▲▲▲▲▲▲▲▲▲▲▲▲▲▲▲▲▲▲▲▲▲▲▲▲▲▲
 
 # 1. 파일이 업로드 됐는지 체크
-def _normalize_to_rgb_jpeg(path: str) -> str:
-    """업로드 이미지를 RGB JPEG로 정규화 (HEIC/CMYK 대비). 실패하면 원본 경로 반환."""
+def _normalize_to_rgb_jpeg(data: bytes, max_dim: int = REKOGNITION_MAX_DIM) -> bytes:
+    """
+    업로드 이미지 바이트를 메모리에서 RGB JPEG로 정규화 (HEIC/CMYK 대비, 파일 저장 없음).
+    JPEG는 draft로 축소 디코딩하고, max_dim보다 크면 reduce + 리샘플링으로 줄인 뒤 한 번만 인코딩합니다.
+    실패하면 원본 바이트를 반환합니다.
+    """
     try:
-        out_path = path.split(".")[0] + "_processing.jpg"
-        with Image.open(path) as im:
+        with Image.open(BytesIO(data)) as im:
+            # JPEG는 DCT 단계에서 1/2~1/8로 줄여 디코딩합니다. (다른 형식은 무시됨)
+            scale = min(1.0, max_dim / max(im.size))
+            im.draft("RGB", (int(im.width * scale), int(im.height * scale)))
+            im = ImageOps.exif_transpose(im)  # EXIF는 버리므로 방향을 픽셀에 반영
+            if max(im.size) > max_dim:
+                im.thumbnail((max_dim, max_dim), Image.BICUBIC, reducing_gap=2.0)
             if im.mode != "RGB":
                 im = im.convert("RGB")
-            im.save(out_path, format="JPEG", quality=92)
-        return out_path
+            buffer = BytesIO()
+            im.save(buffer, format="JPEG", quality=REKOGNITION_JPEG_QUALITY)
+        return buffer.getvalue()
     except Exception:
-        # Pillow 미설치/변환 실패 시 원본 사용
-        return path
+        # 변환 실패 시 원본 사용
+        return data
 
 
 def process_celeb_face():
@@ -75,77 +102,216 @@ def process_celeb_face():
     if not file1 or file1.filename.strip() == "":
         return jsonify({"result": "error", "message": "파일 이름이 없습니다."}), 400
 
-    # 2) 저장 + 정규화
-    os.makedirs("static", exist_ok=True)
-    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-    file1_filename = timestamp + secure_filename(file1.filename)
-    save_path = os.path.join("static", file1_filename)
-    file1.save(save_path)
-    save_path_rgb = _normalize_to_rgb_jpeg(save_path)  # 실패 시 원본 경로 반환
+    # 2) 메모리에서 정규화 (디스크에 저장하지 않음)
+    image_bytes = _normalize_to_rgb_jpeg(file1.read())
+    if not image_bytes:
+        return jsonify({"result": "error", "message": "빈 파일입니다."}), 400
+
+    # 같은(또는 거의 같은) 이미지는 이전 결과를 그대로 돌려줍니다.
+    cache_key = face_cache.key(image_bytes) if face_cache else None
+    if _wants_stream():
+        return _stream_celeb_face(image_bytes, cache_key)
+    if cache_key:
+        payload = face_cache.get(cache_key, "payload")
+        if payload is not None:
+            return jsonify(dict(payload, celebrities=_with_news(payload["celebrities"]))), 200
 
     # 3) AWS Rekognition 유명인 인식
-    try:
-        celeb_info_from_aws = recognize_celebrities(save_path)
-        # remove the saved file after processing
-        if os.path.exists(save_path):
-            os.remove(save_path)
-            os.remove(save_path_rgb)
+    celeb_info_from_aws = face_cache.get(cache_key, "recognition") if cache_key else None
+    if celeb_info_from_aws is not None and celeb_info_from_aws.get("result") == "success":
+        celeb_info_from_aws = dict(celeb_info_from_aws, celebrities=_with_news(celeb_info_from_aws["celebrities"]))
+    elif celeb_info_from_aws is None:
+        try:
+            celeb_info_from_aws = recognize_celebrities(image_bytes)
+        except Exception as e:
+            return jsonify({"result": "error", "message": f"recognize_celebrities crashed: {e}"}), 500
 
-    except Exception as e:
-        return jsonify({"result": "error", "message": f"recognize_celebrities crashed: {e}"}), 500
+        if not isinstance(celeb_info_from_aws, dict):
+            return jsonify({"result": "error", "message": "AWS returned non-dict response"}), 502
 
-    if not isinstance(celeb_info_from_aws, dict):
-        return jsonify({"result": "error", "message": "AWS returned non-dict response"}), 502
+        if cache_key and "error" not in celeb_info_from_aws:
+            face_cache.set(cache_key, "recognition", _without_news(celeb_info_from_aws))
 
     if celeb_info_from_aws.get("result") != "success":
         # "empty" 또는 "error"면 그대로 클라이언트에 알림
         return jsonify(celeb_info_from_aws), 200
 
-    # 4) TMDB 상세 + 외부ID + 필모그래피(영화/TV 표) 구성
-    celebrities_with_details = []
-    for celeb in celeb_info_from_aws.get("celebrities", []):
-        name = celeb.get("name")
-        person_id, _ = tmdb_search_person_id(name) if name else (None, None)
-
-        if person_id:
-            details = tmdb_person_details(person_id)
-            external_ids = tmdb_person_external_ids(person_id)
-
-            # 필모그래피: 영화/TV 크레딧 → 표 데이터
-            movie_credits = tmdb_person_movie_credits(person_id)
-            tv_credits = tmdb_person_tv_credits(person_id)
-            movie_table = build_movie_table(movie_credits)  # 평점 desc, 인기도 desc 정렬됨
-            tv_table = build_tv_table(tv_credits)
-
-            celeb.update({
-                "birthday": details.get("birthday") or "정보 없음",
-                "place_of_birth": details.get("place_of_birth") or "정보 없음",
-                "known_for_department": details.get("known_for_department") or "정보 없음",
-                "biography": details.get("biography") or "",
-                "external_ids": external_ids or {},
-                "filmography": {
-                    "movies": movie_table, 
-                    "tv": tv_table           
-                }
-            })
-        else:
-            celeb.update({
-                "birthday": "정보 없음",
-                "place_of_birth": "정보 없음",
-                "known_for_department": "정보 없음",
-                "biography": "",
-                "external_ids": {},
-                "filmography": {"movies": [], "tv": []}
-            })
-
-        celebrities_with_details.append(celeb)
+    # 4) TMDB 상세 + 외부ID + 필모그래피(영화/TV 표) 구성 (유명인별로 동시에 처리)
+    celebrities_with_details = enrich_celebrities(celeb_info_from_aws.get("celebrities", []))
 
     # 5) 최종 응답
-    return jsonify({
+    payload = {
         "result": "success",
         "count": len(celebrities_with_details),
         "celebrities": celebrities_with_details
-    }), 200
+    }
+    if cache_key:
+        face_cache.set(cache_key, "payload", _without_news(payload))
+    return jsonify(payload), 200
+
+
+def _wants_stream() -> bool:
+    """?stream=1 이거나 Accept가 application/x-ndjson이면 결과를 NDJSON으로 스트리밍합니다."""
+    return request.args.get("stream") == "1" or "application/x-ndjson" in request.headers.get("Accept", "")
+
+
+def _ndjson(event: dict) -> str:
+    return json.dumps(event, ensure_ascii=False) + "\n"
+
+
+# 캐시에 저장하는 인식 결과(recognize_celebrities 출력)의 필드.
+# 뉴스는 얼굴 캐시(FACE_CACHE_TTL)보다 짧은 NEWS_CACHE_TTL을 따르도록 저장하지 않고 news_lookup에서 다시 붙입니다.
+RECOGNITION_FIELDS = ("name", "gender", "urls", "image_url")
+
+
+def _without_news(info: dict) -> dict:
+    """얼굴 캐시에 저장할 결과: 유명인별 news를 뺀 사본"""
+    if "celebrities" not in info:
+        return info
+    return dict(info, celebrities=[{k: v for k, v in c.items() if k != "news"} for c in info["celebrities"]])
+
+
+def _with_news(celebrities: list) -> list:
+    """캐시에서 꺼낸 유명인 목록의 사본에 news_lookup의 뉴스를 붙입니다."""
+    celebrities = [dict(c) for c in celebrities]
+    for celeb, news in zip(celebrities, news_lookup.lookup_many([c["name"] for c in celebrities])):
+        celeb["news"] = news
+    return celebrities
+
+
+def _complete_celeb(celeb: dict, images_future, news_future) -> dict:
+    """스트리밍용: 이미지/뉴스가 없으면 채우고 TMDB 정보로 보강합니다."""
+    _enrich_celeb(celeb)
+    if "image_url" not in celeb:
+        wikidata_id = wikidata_id_from_urls(celeb.get("urls", []))
+        celeb["image_url"] = images_future.result().get(wikidata_id) if wikidata_id else None
+    if "news" not in celeb:
+        celeb["news"] = news_future.result()
+    return celeb
+
+
+def _stream_celeb_face(image_bytes: bytes, cache_key: Optional[str]):
+    """
+    얼굴 인식 결과를 NDJSON 이벤트로 스트리밍합니다.
+    {"event": "recognition", ...} → 유명인마다 {"event": "celebrity", "index": i, ...} (끝난 순서) → {"event": "done", ...}
+    첫 이벤트는 Rekognition 호출 한 번이면 전송되고, 이미지/뉴스/TMDB 보강은 유명인별로 동시에 진행됩니다.
+    """
+    def generate():
+        payload = face_cache.get(cache_key, "payload") if cache_key else None
+        if payload is not None:
+            celebrities = _with_news(payload["celebrities"])
+            yield _ndjson({"event": "recognition", "result": "success", "count": len(celebrities),
+                           "celebrities": [{k: c.get(k) for k in ("name", "gender", "urls")} for c in celebrities]})
+            for index, celeb in enumerate(celebrities):
+                yield _ndjson({"event": "celebrity", "index": index, "celebrity": celeb})
+            yield _ndjson({"event": "done", "result": "success", "count": len(celebrities)})
+            return
+
+        celeb_info = face_cache.get(cache_key, "recognition") if cache_key else None
+        if celeb_info is None:
+            try:
+                celeb_info = detect_celebrities(image_bytes)
+            except Exception as e:
+                yield _ndjson({"event": "done", "result": "error", "message": f"recognize_celebrities crashed: {e}"})
+                return
+            if not isinstance(celeb_info, dict):
+                yield _ndjson({"event": "done", "result": "error", "message": "AWS returned non-dict response"})
+                return
+            if celeb_info.get("result") != "success" and cache_key and "error" not in celeb_info:
+                face_cache.set(cache_key, "recognition", celeb_info)
+
+        if celeb_info.get("result") != "success":
+            yield _ndjson(dict(celeb_info, event="done"))
+            return
+
+        celebrities = [dict(celeb) for celeb in celeb_info.get("celebrities", [])]
+        count = len(celebrities)
+        yield _ndjson({"event": "recognition", "result": "success", "count": count,
+                       "celebrities": [{k: c.get(k) for k in ("name", "gender", "urls")} for c in celebrities]})
+
+        results = [None] * count
+        failed = False
+        # 이미지 1 + 뉴스 n + 보강 n 작업. 보강 작업은 먼저 제출된 이미지/뉴스 작업만 기다리므로 교착되지 않습니다.
+        with ContextThreadPoolExecutor(max_workers=min(2 * count + 1, 2 * CELEB_WORKERS + 1)) as pool:
+            images_future = pool.submit(
+                get_wikidata_images, [wikidata_id_from_urls(c.get("urls", [])) for c in celebrities])
+            news_futures = [pool.submit(news_lookup.lookup, c["name"]) for c in celebrities]
+            futures = {
+                pool.submit(_complete_celeb, celeb, images_future, news_future): index
+                for index, (celeb, news_future) in enumerate(zip(celebrities, news_futures))
+            }
+            for future in as_completed(futures):
+                index = futures[future]
+                try:
+                    results[index] = future.result()
+                except Exception as e:
+                    failed = True
+                    yield _ndjson({"event": "error", "index": index, "message": str(e)})
+                    continue
+                yield _ndjson({"event": "celebrity", "index": index, "celebrity": results[index]})
+
+        if cache_key and not failed:
+            face_cache.set(cache_key, "recognition", {
+                "result": "success",
+                "celebrities": [{k: c.get(k) for k in RECOGNITION_FIELDS} for c in results],
+            })
+            face_cache.set(cache_key, "payload",
+                           _without_news({"result": "success", "count": count, "celebrities": results}))
+        yield _ndjson({"event": "done", "result": "success", "count": count})
+
+    return Response(generate(), mimetype="application/x-ndjson",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+def _enrich_celeb(celeb: dict) -> dict:
+    """유명인 한 명에 대해 TMDB 상세/외부ID/필모그래피를 조회해 celeb에 채웁니다."""
+    name = celeb.get("name")
+    person_id, _ = tmdb_search_person_id(name) if name else (None, None)
+
+    if person_id:
+        # 상세 + 외부ID + 영화/TV 크레딧을 한 번의 요청으로 가져옵니다.
+        details = tmdb_person_bundle(person_id, parts=("external_ids", "movie_credits", "tv_credits"))
+        external_ids = details.get("external_ids")
+        movie_credits = details.get("movie_credits")
+        tv_credits = details.get("tv_credits")
+
+        # 필모그래피: 영화/TV 크레딧 → 표 데이터
+        movie_table = build_movie_table(movie_credits)  # 평점 desc, 인기도 desc 정렬됨
+        tv_table = build_tv_table(tv_credits)
+
+        celeb.update({
+            "birthday": details.get("birthday") or "정보 없음",
+            "place_of_birth": details.get("place_of_birth") or "정보 없음",
+            "known_for_department": details.get("known_for_department") or "정보 없음",
+            "biography": details.get("biography") or "",
+            "external_ids": external_ids or {},
+            "filmography": {
+                "movies": movie_table, 
+                "tv": tv_table           
+            }
+        })
+    else:
+        celeb.update({
+            "birthday": "정보 없음",
+            "place_of_birth": "정보 없음",
+            "known_for_department": "정보 없음",
+            "biography": "",
+            "external_ids": {},
+            "filmography": {"movies": [], "tv": []}
+        })
+    return celeb
+
+
+def enrich_celebrities(celebrities: List[dict]) -> List[dict]:
+    """
+    인식된 유명인 목록을 동시에 TMDB 정보로 보강합니다.
+    유명인 단위(CELEB_WORKERS)로 동시성을 제한하며, 결과 순서는 입력 순서를 유지합니다.
+    입력(캐시된 인식 결과일 수 있음)은 바꾸지 않고 복사본을 보강합니다.
+    """
+    if not celebrities:
+        return []
+    with ContextThreadPoolExecutor(max_workers=min(CELEB_WORKERS, len(celebrities))) as pool:
+        return list(pool.map(_enrich_celeb, [dict(celeb) for celeb in celebrities]))
 
 
 # 배우의 필모그래피 데이터 받아오기
@@ -174,7 +340,7 @@ def _role_type_tv(order: Optional[int], ep_count: Optional[int]) -> str:
     return "조연"
 
 
-IMG_BASE = "https://image.tmdb.org/t/p/w154"
+IMG_BASE = "/img/w154"  # image_proxy
 
 def _year(date_str: Optional[str]) -> str:
     return (date_str or "")[:4] or "-"
@@ -0,0 +1,187 @@
+# webdriver_pool.py
+import atexit
+import os
+import shutil
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+
+# 풀 설정
+POOL_MAX_SIZE = int(os.getenv("WEBDRIVER_POOL_SIZE", "3"))      # 동시에 띄울 수 있는 최대 브라우저 수
+POOL_WARM_SIZE = int(os.getenv("WEBDRIVER_POOL_WARM", "1"))     # 미리 띄워 둘 브라우저 수
+POOL_MAX_USES = int(os.getenv("WEBDRIVER_MAX_USES", "50"))      # 이만큼 사용하면 브라우저를 새로 띄움
+CHECKOUT_TIMEOUT = 30
+# 모든 드라이버의 기본 창 크기 (사용 후 reset에서 되돌림)
+WINDOW_SIZE = (1200, 800)
+
+
+def build_chrome_options(profile_dir):
+    """Chrome 옵션을 설정하는 함수 (세션마다 다른 프로필 디렉터리 사용)"""
+    options = Options()
+    options.add_argument("--headless=new")  # 새로운 headless 모드 사용
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--remote-debugging-port=0")
+    options.add_argument(f"--user-data-dir={profile_dir}")
+    options.add_argument(f"--window-size={WINDOW_SIZE[0]},{WINDOW_SIZE[1]}")
+    options.add_argument("--disable-gpu")  # GPU 가속 비활성화
+    return options
+
+
+class PooledDriver:
+    """풀에서 관리하는 WebDriver와 그 프로필 디렉터리, 사용 횟수"""
+
+    def __init__(self):
+        self.profile_dir = tempfile.mkdtemp(prefix="selenium_profile_")
+        try:
+            self.driver = webdriver.Chrome(options=build_chrome_options(self.profile_dir))
+        except Exception:
+            shutil.rmtree(self.profile_dir, ignore_errors=True)
+            raise
+        self.uses = 0
+        self.created_at = time.time()
+
+    def is_healthy(self) -> bool:
+        try:
+            self.driver.execute_script("return 1")
+            return True
+        except Exception:
+            return False
+
+    def reset(self):
+        """다음 사용자를 위해 쿠키를 지우고 창 크기를 되돌린 뒤 빈 페이지로 이동합니다."""
+        self.driver.delete_all_cookies()
+        self.driver.set_window_size(*WINDOW_SIZE)
+        self.driver.get("about:blank")
+
+    def quit(self):
+        try:
+            self.driver.quit()
+        except Exception:
+            pass
+        shutil.rmtree(self.profile_dir, ignore_errors=True)
+
+
+class WebDriverPool:
+    """
+    미리 띄워 둔 headless Chrome 드라이버 풀.
+    - lease()로 빌려 쓰고 돌려주며, 최대 max_size개까지만 동시에 띄웁니다.
+    - 빌려줄 때 상태를 확인하고, 응답이 없는 드라이버는 버리고 새로 띄웁니다.
+    - max_uses번 사용한 드라이버는 종료하고 교체합니다. (메모리 누수 방지)
+    - 드라이버마다 고유한 --user-data-dir을 사용하므로 동시 세션끼리 충돌하지 않습니다.
+    """
+
+    def __init__(self, max_size=POOL_MAX_SIZE, warm_size=POOL_WARM_SIZE, max_uses=POOL_MAX_USES):
+        self.max_size = max_size
+        self.warm_size = min(warm_size, max_size)
+        self.max_uses = max_uses
+        self._idle = []
+        self._size = 0  # 생성했거나 생성 중인 드라이버 수
+        self._cond = threading.Condition()
+        self._closed = False
+
+    def _create(self):
+        try:
+            return PooledDriver()
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+
+    def checkout(self, timeout=CHECKOUT_TIMEOUT) -> PooledDriver:
+        deadline = time.time() + timeout
+        while True:
+            with self._cond:
+                if self._closed:
+                    raise RuntimeError("WebDriver 풀이 종료되었습니다.")
+                if self._idle:
+                    pooled = self._idle.pop()
+                elif self._size < self.max_size:
+                    self._size += 1
+                    pooled = None
+                else:
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        raise TimeoutError("사용 가능한 WebDriver가 없습니다.")
+                    self._cond.wait(remaining)
+                    continue
+            if pooled is None:
+                return self._create()
+            if pooled.is_healthy():
+                return pooled
+            self._discard(pooled)
+
+    def checkin(self, pooled: PooledDriver):
+        pooled.uses += 1
+        with self._cond:
+            closed = self._closed
+        if closed or pooled.uses >= self.max_uses or not pooled.is_healthy():
+            self._discard(pooled)
+            self.warm()
+            return
+        try:
+            pooled.reset()
+        except Exception:
+            # WebDriverException 외에도 죽은 chromedriver의 연결 오류(urllib3, OSError 등)가 날 수 있습니다.
+            # 어떤 오류든 버려야 _size가 줄어 다음 checkout이 막히지 않습니다.
+            self._discard(pooled)
+            return
+        with self._cond:
+            self._idle.append(pooled)
+            self._cond.notify()
+
+    def _discard(self, pooled: PooledDriver):
+        pooled.quit()
+        with self._cond:
+            self._size -= 1
+            self._cond.notify()
+
+    @contextmanager
+    def lease(self, timeout=CHECKOUT_TIMEOUT):
+        """with driver_pool.lease() as driver: ... 형태로 드라이버를 빌려 씁니다."""
+        pooled = self.checkout(timeout)
+        try:
+            yield pooled.driver
+        finally:
+            self.checkin(pooled)
+
+    def warm(self):
+        """idle 드라이버가 warm_size개가 되도록 백그라운드에서 미리 띄웁니다."""
+        with self._cond:
+            missing = min(self.warm_size - len(self._idle), self.max_size - self._size)
+            if self._closed or missing <= 0:
+                return
+            self._size += missing
+
+        def start():
+            try:
+                pooled = self._create()
+            except Exception as e:
+                print(f"WebDriver 미리 띄우기 실패: {e}")
+                return
+            with self._cond:
+                self._idle.append(pooled)
+                self._cond.notify()
+
+        for _ in range(missing):
+            threading.Thread(target=start, name="webdriver-warm", daemon=True).start()
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {"size": self._size, "idle": len(self._idle), "max_size": self.max_size}
+
+    def shutdown(self):
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for pooled in idle:
+            self._discard(pooled)
+
+
+driver_pool = WebDriverPool()
+atexit.register(driver_pool.shutdown)